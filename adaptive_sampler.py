@@ -0,0 +1,130 @@
+"""
+Adaptive Sampler Module
+Decides which sampled interview frames are worth a full confidence analysis
+Handles: Perceptual hash (dHash) dedup, Denser sampling during motion, Analyzed-frames-per-minute cap
+
+Interview video is mostly a static talking head, so consecutive samples
+usually look the same. Each sample's 64-bit difference hash is computed on
+the small grayscale frame that face_tracker.FrameBuffers already produced;
+when it is within dedup_distance bits of the last analyzed frame, the
+landmark and emotion work is skipped and that frame's result is counted
+again. A forced refresh every refresh_seconds keeps slow changes (a smile
+building up) from being missed.
+
+When consecutive samples differ by motion_distance bits or more, the
+source TimeSampler is switched to burst_rate for burst_seconds, then back
+to its base rate. Frame sources without a settable interval (the shared
+MediaStream decode) only get the dedup. No more than max_per_minute frames
+are analyzed in any minute of video; beyond that, results are reused.
+
+Burst samples are closer together, so each one stands for less video:
+weight is the share of a base-rate sample the current frame represents
+(0.25 at 4/s over a 1/s base). ConfidenceAnalyzer counts every sample
+with its weight, so motion gets finer resolution, not more influence on
+the scores.
+"""
+import os
+from collections import deque
+from typing import Optional
+
+cv2 = None
+try:
+    import cv2 as cv2_module
+    cv2 = cv2_module
+except ImportError:
+    pass
+
+np = None
+try:
+    import numpy as np_module
+    np = np_module
+except ImportError:
+    pass
+
+ADAPTIVE_SAMPLING = os.environ.get('CONFIDENCE_ADAPTIVE_SAMPLING', 'true').lower() == 'true'
+DEDUP_DISTANCE = int(os.environ.get('CONFIDENCE_DEDUP_DISTANCE') or 4)
+MOTION_DISTANCE = int(os.environ.get('CONFIDENCE_MOTION_DISTANCE') or 12)
+BURST_SAMPLES_PER_SECOND = float(os.environ.get('CONFIDENCE_BURST_SAMPLES_PER_SECOND') or 4.0)
+BURST_SECONDS = float(os.environ.get('CONFIDENCE_BURST_SECONDS') or 2.0)
+MAX_FRAMES_PER_MINUTE = int(os.environ.get('CONFIDENCE_MAX_FRAMES_PER_MINUTE') or 120)
+REFRESH_SECONDS = float(os.environ.get('CONFIDENCE_REFRESH_SECONDS') or 5.0)
+
+
+def dhash(gray) -> int:
+    """64-bit difference hash: is each pixel of a 9x8 thumbnail brighter than its left neighbour"""
+    thumb = cv2.resize(gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = thumb[:, 1:] > thumb[:, :-1]
+    return int.from_bytes(np.packbits(bits).tobytes(), 'big')
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count('1')
+
+
+class AdaptiveSampler:
+    """
+    Per-video gate in front of ConfidenceAnalyzer's frame analysis.
+
+    should_analyze() is called once per sampled frame, in order; False means
+    "reuse the last analyzed frame's result".
+    """
+
+    def __init__(self, source=None, dedup_distance: int = DEDUP_DISTANCE, motion_distance: int = MOTION_DISTANCE,
+                 burst_rate: float = BURST_SAMPLES_PER_SECOND, burst_seconds: float = BURST_SECONDS,
+                 max_per_minute: int = MAX_FRAMES_PER_MINUTE, refresh_seconds: float = REFRESH_SECONDS,
+                 fallback_interval: float = 1.0):
+        self.source = source
+        self.base_interval = getattr(source, 'interval', None)
+        self.burst_interval = min(self.base_interval, 1.0 / burst_rate) if self.base_interval and burst_rate > 0 else None
+        self.fallback_interval = self.base_interval or fallback_interval
+        self.dedup_distance = dedup_distance
+        self.motion_distance = motion_distance
+        self.burst_seconds = burst_seconds
+        self.max_per_minute = max_per_minute
+        self.refresh_seconds = refresh_seconds
+        self.previous_hash: Optional[int] = None
+        self.analyzed_hash: Optional[int] = None
+        self.analyzed_at = 0.0
+        self.recent = deque()  # Timestamps of analyzed frames within the last minute
+        self.burst_until = -1.0
+        self.weight = 1.0  # Of the frame passed to the last should_analyze()
+        self.stats = {'samples': 0, 'analyzed': 0, 'reused': 0, 'capped': 0, 'bursts': 0}
+
+    def _set_interval(self, interval: Optional[float]):
+        if interval and self.source is not None and getattr(self.source, 'interval', None) != interval:
+            self.source.interval = interval
+
+    def should_analyze(self, gray, timestamp: Optional[float] = None) -> bool:
+        now = timestamp if timestamp is not None else self.stats['samples'] * self.fallback_interval
+        self.stats['samples'] += 1
+        # This frame was sampled at the interval in effect before this call
+        interval = getattr(self.source, 'interval', None)
+        self.weight = min(1.0, interval / self.base_interval) if interval and self.base_interval else 1.0
+        frame_hash = dhash(gray)
+
+        while self.recent and now - self.recent[0] >= 60.0:
+            self.recent.popleft()
+        capped = self.max_per_minute > 0 and len(self.recent) >= self.max_per_minute
+
+        # Motion between consecutive samples drives the sampling density
+        if self.previous_hash is not None and hamming(frame_hash, self.previous_hash) >= self.motion_distance:
+            if now >= self.burst_until and self.burst_interval:
+                self.stats['bursts'] += 1
+            self.burst_until = now + self.burst_seconds
+        self.previous_hash = frame_hash
+        bursting = now < self.burst_until and not capped
+        self._set_interval(self.burst_interval if bursting else self.base_interval)
+
+        if self.analyzed_hash is not None:
+            unchanged = hamming(frame_hash, self.analyzed_hash) <= self.dedup_distance
+            stale = now - self.analyzed_at >= self.refresh_seconds
+            if capped or (unchanged and not stale):
+                self.stats['reused'] += 1
+                self.stats['capped'] += 1 if capped else 0
+                return False
+
+        self.analyzed_hash = frame_hash
+        self.analyzed_at = now
+        self.recent.append(now)
+        self.stats['analyzed'] += 1
+        return True
@@ -5,8 +5,10 @@ Handles: Resume Parsing, Scoring, Question Generation, and Answer Analysis
 import os
 import re
 import json
+import threading
 import fitz  # PyMuPDF
-from groq import Groq
+from llm_gateway import get_gateway
+from text_matcher import get_matcher, normalize_term
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import nltk
@@ -69,12 +71,9 @@ class ResumeParser:
                 'communication', 'leadership', 'teamwork', 'problem solving'
             ]
         
-        text_lower = text.lower()
-        found_skills = []
-        for skill in skill_keywords:
-            if skill.lower() in text_lower:
-                found_skills.append(skill)
-        return found_skills
+        # Whole words only ("go" is not in "good"), one pass for the whole list
+        found = get_matcher(skill_keywords).found(text)
+        return [skill for skill in skill_keywords if normalize_term(skill) in found]
     
     @staticmethod
     def extract_experience_years(text):
@@ -226,27 +225,16 @@ class GroqAIEngine:
     
     def __init__(self, api_key=None):
         self.api_key = api_key or os.environ.get('GROQ_API_KEY')
-        self.client = Groq(api_key=self.api_key) if self.api_key else None
-        # Using llama-3.3-70b-versatile (latest model as of 2026)
-        # Old model llama3-70b-8192 was decommissioned
-        self.model = 'llama-3.3-70b-versatile'
+        # Shared pooled client; the model comes from Config.GROQ_MODEL (see llm_gateway.py)
+        self.gateway = get_gateway(self.api_key)
     
     def _make_request(self, system_prompt, user_prompt, max_tokens=2000, temperature=0.7):
-        """Make a request to Groq API"""
-        if not self.client:
+        """Make a request to Groq API (through the shared gateway and cache)"""
+        if not self.gateway:
             raise ValueError("Groq API key not configured")
         
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                max_tokens=max_tokens,
-                temperature=temperature
-            )
-            return response.choices[0].message.content
+            return self.gateway.complete(system_prompt, user_prompt, max_tokens=max_tokens, temperature=temperature)
         except Exception as e:
             print(f"Groq API Error: {e}")
             raise
@@ -410,9 +398,9 @@ Return ONLY valid JSON."""
         
         # Fallback: Simple keyword matching
         keywords = expected_keywords.split(',') if isinstance(expected_keywords, str) else expected_keywords
-        answer_lower = answer_transcript.lower()
-        matched = [kw.strip() for kw in keywords if kw.strip().lower() in answer_lower]
-        missed = [kw.strip() for kw in keywords if kw.strip().lower() not in answer_lower]
+        found = get_matcher(keywords, plurals=True).found(answer_transcript)
+        matched = [kw.strip() for kw in keywords if normalize_term(kw) in found]
+        missed = [kw.strip() for kw in keywords if normalize_term(kw) not in found]
         score = (len(matched) / len(keywords)) * 100 if keywords else 50
         
         return {
@@ -612,8 +600,19 @@ class AIEngine:
         return self.groq.analyze_answer(question, transcript, expected_keywords)
 
 
-# Module-level instance for import (used by routes.py)
-ai_engine = AIEngine()
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def get_ai_engine(api_key=None):
+    """Shared AIEngine per API key, so bulk routes don't rebuild parsers/vectorizers per candidate"""
+    engine = _engines.get(api_key)
+    if engine is None:
+        with _engines_lock:
+            engine = _engines.get(api_key)
+            if engine is None:
+                engine = _engines[api_key] = AIEngine(api_key)
+    return engine
 
 # Utility function for testing
 def test_ai_engine():
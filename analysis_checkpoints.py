@@ -0,0 +1,157 @@
+"""
+Analysis Checkpoints Module
+Stores each pipeline stage's output so re-analysis only redoes what changed
+Handles: Per-stage input hashes, Loading valid checkpoints, Saving stage outputs as nodes finish
+
+A re-run of process_interview_analysis (retry after a crash, a worker
+restart, a knowledge re-score after questions were edited) used to repeat
+decoding, transcription and confidence analysis from scratch. Every stage
+now has an input hash; when an AnalysisCheckpoint with the same hash
+exists, build_interview_pipeline returns the stored output instead of
+running the stage, and the media decode only produces what is still needed.
+
+    transcript     video content
+    confidence     video content + sampling/tracking/landmark settings
+    communication  video content (derived from the transcript)
+    knowledge      video content + questions/keywords/answer windows + LLM model
+
+Bump STAGE_VERSIONS when an analyzer's output changes meaning so stored
+results are recomputed.
+"""
+import os
+import json
+import hashlib
+from typing import Any, Dict, List, Optional
+
+from models import db, AnalysisCheckpoint
+
+CHECKPOINT_STAGES = ('transcript', 'confidence', 'communication', 'knowledge')
+# confidence 2: time-based sampling, downscaled face tracking, adaptive sampling with weighted bursts, landmark engine
+# confidence 3: emotion crops from landmark boxes padded to Haar-like squares
+# communication 2: shared-document readability, whole-word filler counting
+# knowledge 2: whole-word keyword matching with plurals and nested terms
+STAGE_VERSIONS = {'transcript': 1, 'confidence': 3, 'communication': 2, 'knowledge': 2}
+SAMPLE_BYTES = 1024 * 1024  # Head and tail of the video that go into its fingerprint
+
+
+def video_fingerprint(video_path: str) -> str:
+    """
+    Cheap content hash of a video: size plus the first and last MiB.
+
+    Hashing multi-hundred-MB recordings on every run would cost more than
+    some stages; a re-recorded or re-assembled upload changes the size or
+    the container header/trailer.
+    """
+    digest = hashlib.sha256()
+    size = os.path.getsize(video_path)
+    digest.update(str(size).encode())
+    with open(video_path, 'rb') as f:
+        digest.update(f.read(SAMPLE_BYTES))
+        if size > SAMPLE_BYTES:
+            f.seek(max(SAMPLE_BYTES, size - SAMPLE_BYTES))
+            digest.update(f.read(SAMPLE_BYTES))
+    return digest.hexdigest()
+
+
+def _hash(*parts: Any) -> str:
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def stage_hashes(video_path: str, question_list: List[Dict], sample_rate: int = 30,
+                 api_key: Optional[str] = None, model: Optional[str] = None) -> Dict[str, str]:
+    """Input hash for every checkpointed stage of one interview"""
+    video = video_fingerprint(video_path)
+    questions = [
+        [q.get('question_text', ''), q.get('expected_keywords', ''), q.get('answer_start'), q.get('answer_end')]
+        for q in question_list
+    ]
+    # Knowledge scores depend on whether (and which) LLM graded them
+    model = (model or 'default') if api_key else None
+    # Imported here: only the analysis run needs the video analyzers
+    from confidence_analyzer import analysis_settings
+    return {
+        'transcript': _hash('transcript', STAGE_VERSIONS['transcript'], video),
+        'confidence': _hash('confidence', STAGE_VERSIONS['confidence'], video, sample_rate, analysis_settings()),
+        'communication': _hash('communication', STAGE_VERSIONS['communication'], video),
+        'knowledge': _hash('knowledge', STAGE_VERSIONS['knowledge'], video, questions, model),
+    }
+
+
+def load_checkpoints(interview_id: int, hashes: Dict[str, str]) -> Dict[str, Any]:
+    """Stored outputs whose input hash still matches, keyed by stage"""
+    outputs = {}
+    for checkpoint in AnalysisCheckpoint.query.filter_by(interview_id=interview_id).all():
+        if hashes.get(checkpoint.stage) != checkpoint.input_hash:
+            continue
+        try:
+            outputs[checkpoint.stage] = json.loads(checkpoint.output)
+        except ValueError:
+            print(f"   ⚠️ [CHECKPOINT] Ignoring unreadable {checkpoint.stage} checkpoint for interview {interview_id}")
+    return outputs
+
+
+def _json_default(value):
+    # numpy scalars from the video analyzers
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+def save_checkpoint(interview_id: int, stage: str, input_hash: str, output: Any, commit: bool = True):
+    checkpoint = AnalysisCheckpoint.query.filter_by(interview_id=interview_id, stage=stage).first()
+    if checkpoint is None:
+        checkpoint = AnalysisCheckpoint(interview_id=interview_id, stage=stage)
+        db.session.add(checkpoint)
+    checkpoint.input_hash = input_hash
+    checkpoint.output = json.dumps(output, default=_json_default)
+    if commit:
+        db.session.commit()
+
+
+def clear_checkpoints(interview_id: int, commit: bool = True):
+    """Force a full re-analysis of an interview"""
+    AnalysisCheckpoint.query.filter_by(interview_id=interview_id).delete()
+    if commit:
+        db.session.commit()
+
+
+def is_reusable(stage: str, output: Any) -> bool:
+    """
+    Only results that a re-run would reproduce are stored.
+
+    Failed analyzers are retried, and a knowledge score that fell back to
+    keyword matching because the LLM was down is not frozen in.
+    """
+    if not isinstance(output, dict):
+        return False
+    if stage == 'transcript':
+        return output.get('status') == 'success'
+    if output.get('status') != 'success':
+        return False
+    if stage == 'knowledge':
+        return output.get('ai_complete', True)
+    return True
+
+
+class CheckpointRecorder:
+    """on_event callback for AnalysisPipeline that saves stage outputs as nodes finish"""
+
+    def __init__(self, interview_id: int, hashes: Dict[str, str], cached: Optional[Dict[str, Any]] = None):
+        self.interview_id = interview_id
+        self.hashes = hashes
+        self.cached = cached or {}
+        self.saved: List[str] = []
+
+    def __call__(self, name: str, event: str, result):
+        if event != 'finished' or name not in self.hashes or name in self.cached:
+            return
+        output = result.get(name)
+        if not is_reusable(name, output):
+            return
+        try:
+            save_checkpoint(self.interview_id, name, self.hashes[name], output)
+            self.saved.append(name)
+        except Exception as e:
+            db.session.rollback()
+            print(f"   ⚠️ [CHECKPOINT] Could not save {name} for interview {self.interview_id}: {e}")
@@ -0,0 +1,468 @@
+"""
+Analysis Pipeline Module
+Runs the interview analysis pillars as a dependency graph (DAG)
+Handles: Node scheduling, Parallel execution, Per-node timing, Failure propagation
+
+Graph used for interviews (see build_interview_pipeline):
+
+    media ──► audio ──► transcript ──► communication
+      │                           └──► knowledge
+      └─────► confidence
+
+"media" is a single ffmpeg decode (media_pipeline.py) that feeds both the
+audio branch and the confidence branch's downsampled frames.
+
+Independent branches run at the same time, so wall-clock time is roughly
+max(audio + transcription + text analysis, confidence) instead of the sum.
+
+Every node can have a latency budget and the whole run an overall deadline
+(Config.ANALYSIS_STAGE_BUDGETS / ANALYSIS_SLO_SECONDS). A node past its
+budget is recorded as timed out and its cancel event is set: the
+confidence analyzer stops between frames and kills its shard processes,
+so one slow provider call or pathological video bounds the analysis
+instead of stalling it or keeping the worker busy.
+"""
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+NodeFunc = Callable[[Dict[str, Any], threading.Event], Any]
+
+
+class AnalysisCancelled(Exception):
+    """Raised by work that noticed its node's cancel event (budget or deadline expired)"""
+
+
+class PipelineNode:
+    """
+    A single unit of work: func receives a dict of its dependencies' outputs
+    and a threading.Event that is set once the node has run out of time
+    """
+
+    def __init__(self, name: str, func: NodeFunc, deps: Sequence[str] = ()):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+
+    def __repr__(self):
+        return f'<PipelineNode {self.name} deps={list(self.deps)}>'
+
+
+class PipelineResult:
+    """Outputs, errors and timings of a pipeline run"""
+
+    def __init__(self):
+        self.outputs: Dict[str, Any] = {}
+        self.errors: Dict[str, str] = {}
+        self.skipped: List[str] = []
+        self.timed_out: List[str] = []  # Ran past a budget, or skipped because of one that did
+        self.timings: Dict[str, Dict[str, float]] = {}
+        self.wall_seconds = 0.0
+
+    def ok(self, name: str) -> bool:
+        return name in self.outputs
+
+    def is_timed_out(self, name: str) -> bool:
+        return name in self.timed_out
+
+    def get(self, name: str, default=None):
+        return self.outputs.get(name, default)
+
+    def timing_summary(self) -> Dict:
+        """Per-node durations plus wall-clock vs. serial time (for analysis_detail/logging)"""
+        serial = sum(t['duration'] for t in self.timings.values())
+        return {
+            'nodes': {name: round(t['duration'], 3) for name, t in self.timings.items()},
+            'wall_seconds': round(self.wall_seconds, 3),
+            'serial_seconds': round(serial, 3),
+            'speedup': round(serial / self.wall_seconds, 2) if self.wall_seconds > 0 else 1.0,
+            'timed_out': list(self.timed_out)
+        }
+
+
+class AnalysisPipeline:
+    """
+    Minimal DAG executor on a thread pool.
+
+    Node functions run in worker threads and must not touch the database
+    session; the caller reads PipelineResult in its own thread and does the
+    DB work there. A failed node marks all of its dependents as skipped.
+
+    on_event(name, event, result) is called from the thread that called run()
+    whenever a node is 'started', 'finished', 'failed', 'timed_out' or
+    'skipped', so it may safely record progress in the database.
+
+    budgets maps node name → seconds from submission; deadline_seconds caps
+    the whole run. Python threads cannot be killed, so a timed-out node is
+    abandoned and its cancel event set; node functions check the event in
+    their long loops and give up early (AnalysisCancelled). Whatever the
+    thread still returns is discarded. Timed-out nodes also appear in
+    errors, so dependents skip.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None,
+                 on_event: Optional[Callable[[str, str, PipelineResult], None]] = None,
+                 budgets: Optional[Dict[str, float]] = None, deadline_seconds: Optional[float] = None):
+        self.nodes: Dict[str, PipelineNode] = {}
+        self.max_workers = max_workers
+        self.cleanups: List[Callable[[], None]] = []
+        self.on_event = on_event
+        self.budgets = {name: seconds for name, seconds in (budgets or {}).items() if seconds and seconds > 0}
+        self.deadline_seconds = deadline_seconds if deadline_seconds and deadline_seconds > 0 else None
+
+    def add(self, name: str, func: NodeFunc, deps: Sequence[str] = ()) -> 'AnalysisPipeline':
+        if name in self.nodes:
+            raise ValueError(f'Duplicate pipeline node: {name}')
+        self.nodes[name] = PipelineNode(name, func, deps)
+        return self
+
+    def add_cleanup(self, func: Callable[[], None]) -> 'AnalysisPipeline':
+        """Register a callback that runs after every node has finished (e.g. temp files)"""
+        self.cleanups.append(func)
+        return self
+
+    def _validate(self):
+        """Reject unknown dependencies and cycles before anything runs"""
+        for node in self.nodes.values():
+            for dep in node.deps:
+                if dep not in self.nodes:
+                    raise ValueError(f'Node {node.name} depends on unknown node {dep}')
+
+        visiting, done = set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f'Cycle detected at pipeline node {name}')
+            visiting.add(name)
+            for dep in self.nodes[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.nodes:
+            visit(name)
+
+    def _emit(self, name: str, event: str, result: PipelineResult):
+        if self.on_event is None:
+            return
+        try:
+            self.on_event(name, event, result)
+        except Exception as e:
+            print(f"   ⚠️ [PIPELINE] Progress callback error: {e}")
+
+    def _run_node(self, node: PipelineNode, inputs: Dict[str, Any], cancel: threading.Event):
+        started = time.perf_counter()
+        try:
+            return node.func(inputs, cancel), None, started, time.perf_counter()
+        except Exception as e:
+            return None, f'{type(e).__name__}: {e}', started, time.perf_counter()
+
+    def run(self) -> PipelineResult:
+        self._validate()
+        result = PipelineResult()
+        run_started = time.perf_counter()
+        run_deadline = run_started + self.deadline_seconds if self.deadline_seconds else None
+
+        pending = dict(self.nodes)
+        running = {}
+        expires = {}  # future → (perf_counter() time its node runs out of budget, which limit, submitted at)
+        cancels = {}  # future → the node's cancel event
+        workers = self.max_workers or max(1, len(self.nodes))
+
+        # Not a with-block: leaving it would wait for abandoned (timed-out) nodes
+        pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='analysis')
+        try:
+            while pending or running:
+                # Skip nodes whose dependencies failed
+                for name in list(pending):
+                    node = pending[name]
+                    if any(dep in result.errors or dep in result.skipped for dep in node.deps):
+                        result.skipped.append(name)
+                        if any(dep in result.timed_out for dep in node.deps):
+                            result.timed_out.append(name)
+                        del pending[name]
+                        print(f"   ⏭️ [PIPELINE] {name} skipped (dependency failed)")
+                        self._emit(name, 'skipped', result)
+
+                # Submit every node whose dependencies are all satisfied
+                for name in list(pending):
+                    node = pending[name]
+                    if all(dep in result.outputs for dep in node.deps):
+                        inputs = {dep: result.outputs[dep] for dep in node.deps}
+                        cancel = threading.Event()
+                        future = pool.submit(self._run_node, node, inputs, cancel)
+                        running[future] = name
+                        cancels[future] = cancel
+                        submitted = time.perf_counter()
+                        limits = []
+                        if run_deadline is not None:
+                            limits.append((run_deadline, f'analysis deadline of {self.deadline_seconds:g}s'))
+                        if name in self.budgets:
+                            limits.append((submitted + self.budgets[name], f'budget of {self.budgets[name]:g}s'))
+                        expiry, reason = min(limits) if limits else (None, None)
+                        expires[future] = (expiry, reason, submitted)
+                        del pending[name]
+                        self._emit(name, 'started', result)
+
+                if not running:
+                    break
+
+                next_expiry = min((t for t, _, _ in expires.values() if t is not None), default=None)
+                timeout = max(0.0, next_expiry - time.perf_counter()) if next_expiry is not None else None
+                finished, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    expires.pop(future, None)
+                    cancels.pop(future, None)
+                    value, error, started, ended = future.result()
+                    result.timings[name] = {
+                        'start': started - run_started,
+                        'end': ended - run_started,
+                        'duration': ended - started
+                    }
+                    if error is None:
+                        result.outputs[name] = value
+                        print(f"   ⏱️ [PIPELINE] {name} finished in {ended - started:.2f}s")
+                        self._emit(name, 'finished', result)
+                    else:
+                        result.errors[name] = error
+                        print(f"   ❌ [PIPELINE] {name} failed after {ended - started:.2f}s: {error}")
+                        self._emit(name, 'failed', result)
+
+                now = time.perf_counter()
+                for future, name in list(running.items()):
+                    expiry, reason, submitted = expires[future]
+                    if expiry is None or now < expiry:
+                        continue
+                    del running[future]
+                    del expires[future]
+                    future.cancel()  # Only helps if it never started
+                    cancels.pop(future).set()  # Otherwise the node stops at its next check
+                    result.errors[name] = f'TimeoutError: exceeded {reason}'
+                    result.timed_out.append(name)
+                    result.timings[name] = {
+                        'start': submitted - run_started,
+                        'end': now - run_started,
+                        'duration': now - submitted
+                    }
+                    print(f"   ⌛ [PIPELINE] {name} timed out ({reason}), continuing without it")
+                    self._emit(name, 'timed_out', result)
+
+                if run_deadline is not None and now >= run_deadline:
+                    for name in list(pending):
+                        result.skipped.append(name)
+                        result.timed_out.append(name)
+                        del pending[name]
+                        print(f"   ⏭️ [PIPELINE] {name} skipped (analysis deadline reached)")
+                        self._emit(name, 'skipped', result)
+        finally:
+            for cancel in cancels.values():
+                cancel.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        for cleanup in self.cleanups:
+            try:
+                cleanup()
+            except Exception as e:
+                print(f"   ⚠️ [PIPELINE] Cleanup error: {e}")
+
+        result.wall_seconds = time.perf_counter() - run_started
+        return result
+
+
+def build_interview_pipeline(video_path: str, question_list: List[Dict], api_key: Optional[str],
+                             max_workers: Optional[int] = None, partial: Optional[Dict] = None,
+                             on_event: Optional[Callable[[str, str, PipelineResult], None]] = None,
+                             checkpoints: Optional[Dict[str, Any]] = None,
+                             budgets: Optional[Dict[str, float]] = None,
+                             deadline_seconds: Optional[float] = None) -> AnalysisPipeline:
+    """
+    Declare the interview analysis graph.
+
+    Each node returns the raw analyzer result dict; interpreting scores and
+    storing them stays with the caller (routes.process_interview_analysis).
+
+    partial is incremental state from chunked uploads (incremental_analysis.py):
+    only the tail after partial['processed_until'] is decoded, and the stored
+    transcript windows and confidence counters are merged in.
+
+    checkpoints maps stage name → output stored by an earlier run with the
+    same inputs (analysis_checkpoints.py). Those nodes return the stored
+    output, and the decode skips audio and/or frames nobody needs. Long
+    videos (without partial state) also skip frames in the shared decode:
+    confidence analysis is sharded across processes instead (plan_shards).
+
+    budgets / deadline_seconds bound each node and the whole run (see
+    AnalysisPipeline); the caller scores only the pillars that finished.
+    """
+    import incremental_analysis
+    import media_pipeline
+    from video_processor import get_processor
+    from confidence_analyzer import (analyze_confidence, analyze_confidence_stream, plan_shards, probe_duration,
+                                     DEFAULT_SAMPLES_PER_SECOND)
+    from face_tracker import DETECTION_WIDTH
+    from communication_analyzer import analyze_communication
+    from answer_analyzer import evaluate_knowledge
+    from answer_segmenter import segment_answers
+
+    processor = get_processor()
+    checkpoints = checkpoints or {}
+    streams = []
+    tail_start = partial['processed_until'] if partial else 0.0
+
+    def media_node(_inputs, _cancel):
+        # None means "no shared decode": consumers fall back to opening the file themselves
+        want_audio = 'transcript' not in checkpoints
+        want_frames = 'confidence' not in checkpoints
+        if want_frames and not partial and len(plan_shards(probe_duration(video_path), DEFAULT_SAMPLES_PER_SECOND)) > 1:
+            # Long video: confidence runs sharded across processes, each decoding its own time range
+            want_frames = False
+        if not media_pipeline.is_available() or not (want_audio or want_frames):
+            return None
+        try:
+            # Frames are spooled at the size the analyzer works on (FrameBuffers would downscale them anyway)
+            stream = media_pipeline.MediaStream(video_path, samples_per_second=DEFAULT_SAMPLES_PER_SECOND,
+                                                frame_width=DETECTION_WIDTH, start_seconds=tail_start,
+                                                want_frames=want_frames, want_audio=want_audio).start()
+        except Exception as e:
+            print(f"   ⚠️ [PIPELINE] Shared decode unavailable ({e}), using per-module decoding")
+            return None
+        streams.append(stream)
+        return stream
+
+    def audio_node(inputs, _cancel):
+        if 'transcript' in checkpoints:
+            return None
+        stream = inputs['media']
+        if stream is not None and stream.want_audio:
+            audio_result = stream.wait()
+            offset = tail_start
+        else:
+            audio_result = processor.extract_audio_single_pass(video_path)
+            offset = 0.0
+        if audio_result['status'] != 'success':
+            raise RuntimeError(audio_result.get('error') or 'Audio extraction failed')
+        return {'audio_path': audio_result['audio_path'], 'video_duration': audio_result.get('duration', 0),
+                'offset': offset}
+
+    def transcript_node(inputs, _cancel):
+        if 'transcript' in checkpoints:
+            return checkpoints['transcript']
+        audio = inputs['audio']
+        try:
+            if audio['offset'] > 0 and audio['video_duration'] < 0.5:
+                # Everything was already transcribed incrementally
+                transcript_result = {'status': 'success', 'transcript': '', 'segments': []}
+            else:
+                transcript_result = processor.transcribe_audio(audio['audio_path'])
+        finally:
+            if audio['audio_path'] and os.path.exists(audio['audio_path']):
+                try:
+                    os.remove(audio['audio_path'])
+                except OSError:
+                    pass
+        if transcript_result['status'] != 'success':
+            raise RuntimeError(transcript_result.get('error') or 'Transcription failed')
+
+        transcript_result['video_duration'] = audio['offset'] + audio['video_duration']
+        if audio['offset'] > 0:
+            # Prepend the windows processed while the upload was still arriving
+            done_text, done_segments = incremental_analysis.merged_transcript(partial)
+            tail_segments = [
+                dict(seg, start=seg.get('start', 0) + audio['offset'], end=seg.get('end', 0) + audio['offset'])
+                for seg in transcript_result.get('segments', [])
+            ]
+            transcript_result['transcript'] = ' '.join(
+                t for t in (done_text, transcript_result['transcript'].strip()) if t
+            )
+            transcript_result['segments'] = done_segments + tail_segments
+        return transcript_result
+
+    def confidence_node(inputs, cancel):
+        if 'confidence' in checkpoints:
+            return checkpoints['confidence']
+        stream = inputs['media']
+        if stream is not None and stream.want_frames:
+            base_stats = incremental_analysis.merged_confidence_stats(partial) if partial else None
+            conf_result = analyze_confidence_stream(stream, base_stats, cancel=cancel)
+            if conf_result['status'] == 'success' or not stream.wait().get('error'):
+                return conf_result
+            print("   ⚠️ [PIPELINE] Shared decode failed, re-reading video for confidence")
+        return analyze_confidence(video_path, sample_rate=30, cancel=cancel)
+
+    def communication_node(inputs, _cancel):
+        if 'communication' in checkpoints:
+            return checkpoints['communication']
+        transcript = inputs['transcript']['transcript']
+        if not transcript or len(transcript) <= 20:
+            return {'status': 'error', 'score': 0, 'error': 'No transcript available'}
+        return analyze_communication(transcript, inputs['transcript']['video_duration'])
+
+    def knowledge_node(inputs, _cancel):
+        if 'knowledge' in checkpoints:
+            return checkpoints['knowledge']
+        transcript = inputs['transcript']['transcript']
+        if not transcript or len(transcript) <= 20 or not question_list:
+            return {'status': 'error', 'score': 0, 'error': 'No transcript or questions available'}
+
+        # Score each question only against its own slice of the recording
+        answers = segment_answers(inputs['transcript'].get('segments', []), question_list,
+                                  inputs['transcript'].get('video_duration', 0))
+        questions = question_list
+        if answers is not None:
+            questions = [dict(q, answer_text=answer) for q, answer in zip(question_list, answers)]
+            print(f"   ✂️ [PIPELINE] Segmented transcript into {len(answers)} answers")
+
+        knowledge_result = evaluate_knowledge(questions, transcript, api_key)
+        knowledge_result['answers'] = answers
+        return knowledge_result
+
+    pipeline = AnalysisPipeline(max_workers=max_workers, on_event=on_event,
+                                budgets=budgets, deadline_seconds=deadline_seconds)
+    pipeline.add('media', media_node)
+    pipeline.add('audio', audio_node, deps=['media'])
+    pipeline.add('transcript', transcript_node, deps=['audio'])
+    pipeline.add('confidence', confidence_node, deps=['media'])
+    pipeline.add('communication', communication_node, deps=['transcript'])
+    pipeline.add('knowledge', knowledge_node, deps=['transcript'])
+    pipeline.add_cleanup(lambda: [stream.close() for stream in streams])
+    return pipeline
+
+
+if __name__ == "__main__":
+    print("Analysis Pipeline Module - Test")
+    print("=" * 50)
+
+    def sleeper(seconds, value):
+        def func(_inputs, cancel):
+            # Like collect_stats: give up as soon as the node is cancelled
+            if cancel.wait(seconds):
+                raise AnalysisCancelled(f'{value} cancelled')
+            return value
+        return func
+
+    demo = AnalysisPipeline()
+    demo.add('audio', sleeper(0.2, 'audio'))
+    demo.add('transcript', sleeper(0.5, 'text'), deps=['audio'])
+    demo.add('confidence', sleeper(0.8, 80))
+    demo.add('communication', sleeper(0.1, 70), deps=['transcript'])
+    demo.add('knowledge', sleeper(0.2, 60), deps=['transcript'])
+    demo_result = demo.run()
+    print(f"\nOutputs: {demo_result.outputs}")
+    print(f"Timings: {demo_result.timing_summary()}")
+
+    # Same graph with a confidence budget it cannot meet
+    budgeted = AnalysisPipeline(budgets={'confidence': 0.3})
+    for node in demo.nodes.values():
+        budgeted.add(node.name, node.func, node.deps)
+    budgeted_result = budgeted.run()
+    print(f"\nWith budget: outputs {sorted(budgeted_result.outputs)}, timed out {budgeted_result.timed_out}, "
+          f"wall {budgeted_result.wall_seconds:.2f}s")
+    time.sleep(0.05)
+    analysis_threads = [t.name for t in threading.enumerate() if t.name.startswith('analysis')]
+    print(f"Analysis threads still running after the timeout: {analysis_threads or 'none'}")
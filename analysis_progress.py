@@ -0,0 +1,123 @@
+"""
+Analysis Progress Module
+Records where an interview's analysis currently is
+Handles: Stage + percent per interview, Pipeline node timings, Queued/running/done/failed lifecycle
+
+One AnalysisProgress row per interview, updated by the process doing the
+work (web request or worker.py) and read by /api/analysis-status (JSON and
+server-sent events). Pipeline nodes map to user-facing stages; percent is
+the share of pipeline work finished, weighted by typical node cost.
+"""
+import json
+from datetime import datetime
+from typing import Dict, Optional
+
+from models import db, AnalysisProgress
+
+STATUS_QUEUED = 'queued'
+STATUS_RUNNING = 'running'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+# Pipeline node → (stage shown to users, relative cost)
+NODE_STAGES = {
+    'media': ('decoding', 5),
+    'audio': ('extracting_audio', 10),
+    'transcript': ('transcribing', 35),
+    'confidence': ('analyzing_video', 25),
+    'communication': ('scoring', 10),
+    'knowledge': ('scoring', 15),
+}
+PIPELINE_PERCENT = 90  # Remaining 10%: starting + saving results
+
+
+def _get_or_create(interview_id: int) -> AnalysisProgress:
+    progress = AnalysisProgress.query.filter_by(interview_id=interview_id).first()
+    if progress is None:
+        progress = AnalysisProgress(interview_id=interview_id)
+        db.session.add(progress)
+    return progress
+
+
+def record_progress(interview_id: int, stage: str, percent: Optional[int] = None,
+                    status: Optional[str] = None, error: Optional[str] = None,
+                    running: Optional[list] = None, timings: Optional[Dict] = None,
+                    commit: bool = True) -> AnalysisProgress:
+    """
+    Update the progress row for an interview.
+
+    With commit=False the change joins the caller's transaction (used when
+    queueing, so progress and job become visible together).
+    """
+    progress = _get_or_create(interview_id)
+    progress.stage = stage
+    if percent is not None:
+        progress.percent = max(0, min(100, int(percent)))
+    if status is not None:
+        progress.status = status
+        if status == STATUS_RUNNING and progress.started_at is None:
+            progress.started_at = datetime.utcnow()
+        if status in (STATUS_DONE, STATUS_FAILED):
+            progress.finished_at = datetime.utcnow()
+        elif status == STATUS_QUEUED:
+            progress.started_at = None
+            progress.finished_at = None
+    if error is not None or status in (STATUS_QUEUED, STATUS_RUNNING):
+        progress.error = error
+    if running is not None:
+        progress.running_nodes = json.dumps(running)
+    if timings is not None:
+        progress.stage_timings = json.dumps(timings)
+    progress.updated_at = datetime.utcnow()
+    if commit:
+        db.session.commit()
+    return progress
+
+
+def mark_queued(interview_id: int, commit: bool = False):
+    record_progress(interview_id, 'queued', 0, STATUS_QUEUED, running=[], timings={}, commit=commit)
+
+
+def mark_failed(interview_id: int, error: str):
+    """Record a failure outside the failed transaction"""
+    try:
+        db.session.rollback()
+        record_progress(interview_id, 'failed', status=STATUS_FAILED, error=error[:2000], running=[])
+    except Exception as e:
+        db.session.rollback()
+        print(f"   ⚠️ [PROGRESS] Could not record failure for interview {interview_id}: {e}")
+
+
+def mark_attempt_failed(interview_id: int, error: str, will_retry: bool):
+    """Worker view of a failed job: a retry is pending, or the job is dead-lettered"""
+    if will_retry:
+        record_progress(interview_id, 'retry_scheduled', status=STATUS_QUEUED, error=error[:2000], running=[])
+    else:
+        record_progress(interview_id, 'failed', status=STATUS_FAILED, error=error[:2000], running=[])
+
+
+class PipelineProgress:
+    """on_event callback for AnalysisPipeline that writes stage/percent as nodes run"""
+
+    def __init__(self, interview_id: int, start_percent: int = 5):
+        self.interview_id = interview_id
+        self.start_percent = start_percent
+        self.total_weight = sum(weight for _, weight in NODE_STAGES.values())
+        self.in_flight = set()
+
+    def percent(self, result) -> int:
+        done = set(result.outputs) | set(result.errors) | set(result.skipped)
+        weight = sum(NODE_STAGES.get(name, ('', 0))[1] for name in done)
+        share = weight / self.total_weight if self.total_weight else 1
+        return self.start_percent + int(share * (PIPELINE_PERCENT - self.start_percent))
+
+    def __call__(self, name: str, event: str, result):
+        if event == 'started':
+            self.in_flight.add(name)
+        else:
+            self.in_flight.discard(name)
+        running = sorted(self.in_flight)
+        # The most expensive node in flight names the stage
+        stage = max((NODE_STAGES.get(n, (n, 0)) for n in running), key=lambda s: s[1])[0] if running else 'scoring'
+        timings = {n: round(t['duration'], 3) for n, t in result.timings.items()}
+        record_progress(self.interview_id, stage, self.percent(result), running=running, timings=timings)
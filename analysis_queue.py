@@ -0,0 +1,225 @@
+"""
+Analysis Job Queue
+Durable, database-backed queue for interview analysis
+Handles: Enqueue, Lease, Heartbeat, Retry with backoff, Dead-letter
+Workers (worker.py) can run on any node that shares the database and upload storage
+"""
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import and_, or_, update, exists
+from sqlalchemy.orm import aliased
+
+from models import db, AnalysisJob
+
+# Job states
+STATUS_QUEUED = 'queued'
+STATUS_LEASED = 'leased'
+STATUS_DONE = 'done'
+STATUS_DEAD = 'dead'  # Dead-letter: exhausted all attempts
+
+ACTIVE_STATUSES = (STATUS_QUEUED, STATUS_LEASED)
+
+# Job types
+JOB_FULL = 'full'        # Final analysis of the complete recording
+JOB_PARTIAL = 'partial'  # Incremental processing of chunks received so far
+
+
+def default_worker_id() -> str:
+    """Unique worker identity: host + process id"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue_analysis(interview_id: int, max_attempts: int = 3, job_type: str = JOB_FULL) -> AnalysisJob:
+    """
+    Queue an interview for analysis.
+
+    Idempotent: if the interview already has a queued or running job of the
+    same type, that job is returned instead of creating a duplicate. Queuing
+    the full analysis drops any partial job that has not started yet (the full
+    job processes whatever is left). The job is flushed but not committed so
+    it lands in the same transaction as the caller's changes.
+    """
+    existing = AnalysisJob.query.filter(
+        AnalysisJob.interview_id == interview_id,
+        AnalysisJob.job_type == job_type,
+        AnalysisJob.status.in_(ACTIVE_STATUSES)
+    ).first()
+    if existing:
+        return existing
+
+    if job_type == JOB_FULL:
+        now = datetime.utcnow()
+        db.session.execute(
+            update(AnalysisJob)
+            .where(AnalysisJob.interview_id == interview_id,
+                   AnalysisJob.job_type == JOB_PARTIAL,
+                   AnalysisJob.status == STATUS_QUEUED)
+            .values(status=STATUS_DONE, last_error='Superseded by full analysis',
+                    finished_at=now, updated_at=now)
+        )
+
+    job = AnalysisJob(interview_id=interview_id, max_attempts=max_attempts, job_type=job_type)
+    job.status = STATUS_QUEUED
+    job.available_at = datetime.utcnow()
+    db.session.add(job)
+    db.session.flush()
+    print(f"📥 [ANALYSIS_QUEUE] Queued {job_type} job {job.job_id} for interview {interview_id}")
+    return job
+
+
+def _leasable_condition(now: datetime):
+    """
+    Jobs that are ready to run, or whose previous worker stopped heartbeating.
+
+    A full job waits while a partial job for the same interview holds a live
+    lease, so the two never process the same recording concurrently.
+    """
+    running_partial = aliased(AnalysisJob)
+    partial_in_progress = exists().where(
+        running_partial.interview_id == AnalysisJob.interview_id,
+        running_partial.job_type == JOB_PARTIAL,
+        running_partial.status == STATUS_LEASED,
+        running_partial.lease_expires_at >= now
+    )
+    return and_(
+        or_(
+            and_(AnalysisJob.status == STATUS_QUEUED, AnalysisJob.available_at <= now),
+            and_(AnalysisJob.status == STATUS_LEASED, AnalysisJob.lease_expires_at < now)
+        ),
+        or_(AnalysisJob.job_type != JOB_FULL, ~partial_in_progress)
+    )
+
+
+def lease_next_job(worker_id: str, lease_seconds: int = 120) -> Optional[AnalysisJob]:
+    """
+    Atomically claim the next available job.
+
+    The claim is a compare-and-set UPDATE guarded by the same predicate used to
+    select candidates, so two workers racing for one row cannot both win.
+    Works on SQLite and Azure SQL without row-locking hints.
+    """
+    now = datetime.utcnow()
+    candidates = AnalysisJob.query.filter(_leasable_condition(now)).order_by(
+        AnalysisJob.available_at, AnalysisJob.job_id
+    ).limit(5).all()
+
+    for candidate in candidates:
+        job_id = candidate.job_id
+
+        # Expired lease on the final attempt: the job keeps crashing its worker
+        if candidate.status == STATUS_LEASED and (candidate.attempts or 0) >= (candidate.max_attempts or 1):
+            db.session.execute(
+                update(AnalysisJob)
+                .where(AnalysisJob.job_id == job_id, _leasable_condition(now))
+                .values(status=STATUS_DEAD, lease_owner=None, lease_expires_at=None,
+                        last_error='Lease expired on final attempt (worker lost)',
+                        finished_at=now, updated_at=now)
+            )
+            db.session.commit()
+            print(f"☠️ [ANALYSIS_QUEUE] Job {job_id} moved to dead-letter (lease expired)")
+            continue
+
+        result = db.session.execute(
+            update(AnalysisJob)
+            .where(AnalysisJob.job_id == job_id, _leasable_condition(now))
+            .values(status=STATUS_LEASED,
+                    lease_owner=worker_id,
+                    lease_expires_at=now + timedelta(seconds=lease_seconds),
+                    attempts=AnalysisJob.attempts + 1,
+                    updated_at=now)
+        )
+        db.session.commit()
+
+        if result.rowcount == 1:  # type: ignore
+            job = db.session.get(AnalysisJob, job_id)
+            db.session.refresh(job)
+            return job
+
+    return None
+
+
+def heartbeat(job_id: int, worker_id: str, lease_seconds: int = 120) -> bool:
+    """
+    Extend the lease on a running job.
+
+    Returns False if the lease was lost (expired and taken over by another worker).
+    """
+    now = datetime.utcnow()
+    result = db.session.execute(
+        update(AnalysisJob)
+        .where(AnalysisJob.job_id == job_id,
+               AnalysisJob.status == STATUS_LEASED,
+               AnalysisJob.lease_owner == worker_id)
+        .values(lease_expires_at=now + timedelta(seconds=lease_seconds), updated_at=now)
+    )
+    db.session.commit()
+    return result.rowcount == 1  # type: ignore
+
+
+def complete_job(job_id: int, worker_id: str) -> bool:
+    """Mark a leased job as done"""
+    now = datetime.utcnow()
+    result = db.session.execute(
+        update(AnalysisJob)
+        .where(AnalysisJob.job_id == job_id, AnalysisJob.lease_owner == worker_id)
+        .values(status=STATUS_DONE, lease_owner=None, lease_expires_at=None,
+                last_error=None, finished_at=now, updated_at=now)
+    )
+    db.session.commit()
+    return result.rowcount == 1  # type: ignore
+
+
+def fail_job(job_id: int, worker_id: str, error: str, retry_base_seconds: int = 30) -> str:
+    """
+    Record a failed attempt.
+
+    Retries with exponential backoff (base * 2^(attempt-1)) until max_attempts,
+    then moves the job to the dead-letter state. Returns the new status.
+    """
+    job = db.session.get(AnalysisJob, job_id)
+    if job is None or job.lease_owner != worker_id:
+        return 'lost'
+
+    now = datetime.utcnow()
+    attempts = job.attempts or 0
+    job.last_error = (error or 'Unknown error')[:4000]
+    job.lease_owner = None
+    job.lease_expires_at = None
+    job.updated_at = now
+
+    if attempts >= (job.max_attempts or 1):
+        job.status = STATUS_DEAD
+        job.finished_at = now
+        print(f"☠️ [ANALYSIS_QUEUE] Job {job_id} moved to dead-letter after {attempts} attempts")
+    else:
+        delay = retry_base_seconds * (2 ** max(0, attempts - 1))
+        job.status = STATUS_QUEUED
+        job.available_at = now + timedelta(seconds=delay)
+        print(f"🔁 [ANALYSIS_QUEUE] Job {job_id} will retry in {delay}s (attempt {attempts}/{job.max_attempts})")
+
+    db.session.commit()
+    return job.status
+
+
+def requeue_dead_job(job_id: int) -> bool:
+    """Manually return a dead-letter job to the queue with a fresh attempt budget"""
+    job = db.session.get(AnalysisJob, job_id)
+    if job is None or job.status != STATUS_DEAD:
+        return False
+    job.status = STATUS_QUEUED
+    job.attempts = 0
+    job.available_at = datetime.utcnow()
+    job.finished_at = None
+    db.session.commit()
+    return True
+
+
+def queue_stats() -> dict:
+    """Count jobs per state (for monitoring)"""
+    rows = db.session.query(AnalysisJob.status, db.func.count(AnalysisJob.job_id)).group_by(AnalysisJob.status).all()
+    stats = {status: 0 for status in (STATUS_QUEUED, STATUS_LEASED, STATUS_DONE, STATUS_DEAD)}
+    stats.update({status: count for status, count in rows})
+    return stats
@@ -10,7 +10,9 @@ import os
 import re
 import json
 from typing import Optional, List, Dict, Any
-from groq import Groq
+from llm_gateway import get_gateway
+from llm_scheduler import run_concurrently
+from text_matcher import get_matcher, normalize_term
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.metrics.pairwise import cosine_similarity
 import nltk
@@ -34,33 +36,19 @@ class AnswerAnalyzer:
     
     def __init__(self, groq_api_key: Optional[str] = None):
         self.groq_api_key = groq_api_key or os.environ.get('GROQ_API_KEY')
-        self.groq_client = None
-        self.model = 'llama-3.3-70b-versatile'  # Updated from deprecated llama3-70b-8192
+        # Shared pooled client; the model comes from Config.GROQ_MODEL (see llm_gateway.py)
+        self.gateway = get_gateway(self.groq_api_key)
         self.vectorizer = TfidfVectorizer(stop_words='english', max_features=3000)
-        
-        if self.groq_api_key:
-            try:
-                self.groq_client = Groq(api_key=self.groq_api_key)
-                print("[ANSWER_ANALYZER] Groq API initialized")
-            except Exception as e:
-                print(f"[ANSWER_ANALYZER] Groq init failed: {e}")
+        # One LLM call per interview instead of one per question (see evaluate_batch_with_ai)
+        self.batch_evaluation = os.environ.get('KNOWLEDGE_BATCH_EVALUATION', 'true').lower() == 'true'
     
     def _call_groq(self, system_prompt: str, user_prompt: str, max_tokens: int = 1500):
-        """Make a request to Groq API"""
-        if not self.groq_client:
+        """Make a request to Groq API (through the shared gateway and cache)"""
+        if not self.gateway:
             return None
         
         try:
-            response = self.groq_client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                max_tokens=max_tokens,
-                temperature=0.3
-            )
-            return response.choices[0].message.content
+            return self.gateway.complete(system_prompt, user_prompt, max_tokens=max_tokens, temperature=0.3)
         except Exception as e:
             print(f"   ⚠️ Groq API error: {e}")
             return None
@@ -75,8 +63,9 @@ class AnswerAnalyzer:
         if not keywords:
             return 0.0
         
-        answer_lower = answer.lower()
-        matched = sum(1 for kw in keywords if kw in answer_lower)
+        # Whole words (plurals count: "deadlines" covers "deadline"), one pass over the answer
+        found = get_matcher(keywords, plurals=True).found(answer)
+        matched = sum(1 for kw in keywords if normalize_term(kw) in found)
         
         return (matched / len(keywords)) * 100
     
@@ -125,7 +114,7 @@ class AnswerAnalyzer:
     
     def evaluate_with_ai(self, question: str, answer: str, expected_keywords: str = "") -> Dict:
         """Use AI to evaluate answer quality"""
-        if not self.groq_client:
+        if not self.gateway:
             return {'score': None, 'feedback': 'AI evaluation not available'}
         
         system_prompt = """You are an expert interview evaluator. Analyze the candidate's answer to the interview question.
@@ -173,10 +162,102 @@ Evaluate this answer and provide scores in JSON format."""
             print(f"   ⚠️ AI evaluation error: {e}")
             return {'score': None, 'feedback': str(e)}
     
-    def evaluate_single_answer(self, question: str, answer: str, expected_keywords: str = "") -> Dict:
+    @staticmethod
+    def _valid_ai_evaluation(evaluation) -> bool:
+        """An AI evaluation is usable only if it carries a numeric 0-100 score"""
+        if not isinstance(evaluation, dict):
+            return False
+        score = evaluation.get('score')
+        return isinstance(score, (int, float)) and not isinstance(score, bool) and 0 <= score <= 100
+    
+    def evaluate_batch_with_ai(self, items: List[Dict]) -> List[Optional[Dict]]:
+        """
+        Evaluate several answers with a single AI request
+        
+        Args:
+            items: List of dicts with 'question', 'answer', 'expected_keywords'
+        
+        Returns:
+            One evaluation per item, in order; None where the response was
+            missing or failed validation (the caller evaluates those singly)
+        """
+        if not self.gateway or not items:
+            return [None] * len(items)
+        
+        system_prompt = """You are an expert interview evaluator. Analyze each of the candidate's answers to the numbered interview questions independently.
+        
+Evaluate each answer based on:
+1. Correctness - Is the answer factually accurate?
+2. Relevance - Does it address the question directly?
+3. Completeness - Does it cover key aspects?
+4. Technical Depth - For technical questions, does it show understanding?
+5. Communication - Is it well-structured and clear?
+
+Respond in JSON format only, with exactly one entry per question:
+{
+    "evaluations": [
+        {
+            "index": <question number>,
+            "score": <number 0-100>,
+            "correctness": <number 0-100>,
+            "relevance": <number 0-100>,
+            "completeness": <number 0-100>,
+            "technical_depth": <number 0-100>,
+            "feedback": "<brief constructive feedback>",
+            "key_points_covered": ["point1", "point2"],
+            "missing_points": ["point1", "point2"]
+        }
+    ]
+}"""
+        
+        # Unsegmented interviews answer every question from the same transcript - send it once
+        shared_answer = items[0]['answer'] if all(item['answer'] == items[0]['answer'] for item in items) else None
+        
+        blocks = []
+        for i, item in enumerate(items, start=1):
+            block = f"""Question {i}: {item['question']}
+Expected Keywords/Concepts: {item.get('expected_keywords') or 'Not specified'}"""
+            if shared_answer is None:
+                block += f"\nCandidate's Answer {i}: {item['answer']}"
+            blocks.append(block)
+        
+        user_prompt = '\n\n'.join(blocks)
+        if shared_answer is not None:
+            user_prompt += f"\n\nCandidate's full interview transcript (answers to all questions above): {shared_answer}"
+        user_prompt += f"\n\nEvaluate all {len(items)} answers and provide scores in JSON format."
+        
+        evaluations: List[Optional[Dict]] = [None] * len(items)
+        try:
+            response = self._call_groq(system_prompt, user_prompt, max_tokens=300 * len(items) + 200)
+            if not response:
+                return evaluations
+            
+            json_match = re.search(r'\{[\s\S]*\}', response)
+            if not json_match:
+                return evaluations
+            
+            parsed = json.loads(json_match.group())
+            entries = parsed.get('evaluations', []) if isinstance(parsed, dict) else []
+            for position, entry in enumerate(entries):
+                if not isinstance(entry, dict):
+                    continue
+                index = entry.get('index', position + 1)
+                if isinstance(index, int) and 1 <= index <= len(items) and self._valid_ai_evaluation(entry):
+                    evaluations[index - 1] = entry
+            
+        except Exception as e:
+            print(f"   ⚠️ Batch AI evaluation error: {e}")
+        
+        return evaluations
+    
+    def evaluate_single_answer(self, question: str, answer: str, expected_keywords: str = "",
+                               ai_eval: Optional[Dict] = None) -> Dict:
         """
         Evaluate a single answer
         
+        ai_eval: AI evaluation already obtained (batch or concurrent request);
+        when None the answer gets its own AI request
+        
         Returns:
             dict: {
                 'score': float (0-100),
@@ -203,8 +284,9 @@ Evaluate this answer and provide scores in JSON format."""
             relevance_score = self.calculate_similarity(answer, question)
             length_analysis = self.analyze_answer_length(answer)
             
-            # Try AI evaluation
-            ai_eval = self.evaluate_with_ai(question, answer, expected_keywords)
+            # Try AI evaluation (unless analyze() already requested it)
+            if ai_eval is None:
+                ai_eval = self.evaluate_with_ai(question, answer, expected_keywords)
             ai_score = ai_eval.get('score') if ai_eval.get('score') is not None else None
             
             # Calculate final score
@@ -253,8 +335,10 @@ Evaluate this answer and provide scores in JSON format."""
         Main analysis method - evaluate all answers
         
         Args:
-            questions: List of dicts with 'question_text', 'expected_keywords'
-            transcript: Full interview transcript
+            questions: List of dicts with 'question_text', 'expected_keywords' and
+                       optionally 'answer_text' (the question's own answer slice,
+                       see answer_segmenter.py)
+            transcript: Full interview transcript (used when no answer_text is given)
         
         Returns:
             dict: {
@@ -290,17 +374,47 @@ Evaluate this answer and provide scores in JSON format."""
                     'error': 'No questions to evaluate against'
                 }
             
-            # Evaluate each question against the transcript
+            # Evaluate each question against its own answer (or the whole transcript)
             individual_scores = []
+            segmented = any(q.get('answer_text') is not None for q in questions)
+            items = [
+                {
+                    'question': q.get('question_text', q.get('text', '')),
+                    'answer': transcript if q.get('answer_text') is None else q.get('answer_text'),
+                    'expected_keywords': q.get('expected_keywords', '')
+                }
+                for q in questions
+            ]
             
-            for i, q in enumerate(questions):
-                question_text = q.get('question_text', q.get('text', ''))
-                expected_keywords = q.get('expected_keywords', '')
+            # One AI request for all substantial answers; failed items fall back to their own request
+            batch_evals: List[Optional[Dict]] = [None] * len(items)
+            batched = [i for i, item in enumerate(items) if item['answer'] and len(item['answer'].strip()) >= 10]
+            if self.batch_evaluation and self.gateway and len(batched) > 1:
+                results = self.evaluate_batch_with_ai([items[i] for i in batched])
+                for i, evaluation in zip(batched, results):
+                    batch_evals[i] = evaluation
+                valid = sum(1 for e in results if e is not None)
+                print(f"   📦 Batch AI evaluation: {valid}/{len(batched)} valid, "
+                      f"{len(batched) - valid} will be evaluated individually")
+            
+            # Remaining AI requests are independent - fan them out (bounded, rate limited)
+            pending = [i for i in batched if batch_evals[i] is None]
+            if self.gateway and pending:
+                evaluations = run_concurrently([
+                    (lambda item=items[i]: self.evaluate_with_ai(item['question'], item['answer'], item['expected_keywords']))
+                    for i in pending
+                ])
+                for i, evaluation in zip(pending, evaluations):
+                    batch_evals[i] = evaluation if isinstance(evaluation, dict) else {'score': None, 'feedback': str(evaluation)}
+            
+            for i, item in enumerate(items):
+                question_text = item['question']
                 
                 result = self.evaluate_single_answer(
                     question_text,
-                    transcript,
-                    expected_keywords
+                    item['answer'],
+                    item['expected_keywords'],
+                    ai_eval=batch_evals[i]
                 )
                 
                 individual_scores.append({
@@ -310,6 +424,11 @@ Evaluate this answer and provide scores in JSON format."""
                     'feedback': result.get('feedback', '')
                 })
             
+            # False when the provider failed for some answers and they fell back to local scoring
+            ai_complete = self.gateway is None or all(
+                batch_evals[i] is not None and batch_evals[i].get('score') is not None for i in batched
+            )
+            
             # Calculate overall knowledge score
             scores = [s['score'] for s in individual_scores]
             overall_score = sum(scores) / len(scores) if scores else 0
@@ -317,8 +436,11 @@ Evaluate this answer and provide scores in JSON format."""
             analysis_detail = {
                 'questions_evaluated': len(questions),
                 'transcript_length': len(transcript),
+                'segmented_answers': segmented,
+                'batch_evaluation': self.batch_evaluation,
                 'individual_scores': individual_scores,
-                'ai_used': self.groq_client is not None
+                'ai_used': self.gateway is not None,
+                'ai_complete': ai_complete
             }
             
             print(f"\n{'='*50}")
@@ -331,6 +453,7 @@ Evaluate this answer and provide scores in JSON format."""
                 'status': 'success',
                 'individual_scores': individual_scores,
                 'analysis_detail': json.dumps(analysis_detail),
+                'ai_complete': ai_complete,
                 'error': None
             }
             
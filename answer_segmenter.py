@@ -0,0 +1,101 @@
+"""
+Answer Segmenter Module
+Splits the interview transcript into one answer per question
+Handles: Question time windows from client timestamps, Whisper segment → question mapping
+
+The interview room records when each question was shown (relative to the
+start of the recording). Whisper returns timestamped segments. Each segment
+goes to the question window it overlaps most, so every question is scored
+against its own answer instead of the whole interview transcript.
+"""
+from typing import Dict, List, Optional, Tuple
+
+
+def question_windows(questions: List[Dict], total_duration: float = 0) -> Optional[List[Tuple[float, float]]]:
+    """
+    Build (start, end) windows in seconds from 'answer_start'/'answer_end'.
+
+    A missing end runs until the next question's start (or the end of the
+    recording). Returns None when any question has no start timestamp, in
+    which case callers fall back to the full transcript.
+    """
+    if not questions:
+        return None
+    starts = [q.get('answer_start') for q in questions]
+    if any(start is None for start in starts):
+        return None
+
+    windows = []
+    for i, q in enumerate(questions):
+        start = float(starts[i])
+        end = q.get('answer_end')
+        if end is None:
+            end = float(starts[i + 1]) if i + 1 < len(questions) else max(total_duration, start)
+        windows.append((start, max(start, float(end))))
+    return windows
+
+
+def _overlap(a_start: float, a_end: float, b_start: float, b_end: float) -> float:
+    return max(0.0, min(a_end, b_end) - max(a_start, b_start))
+
+
+def assign_segments(segments: List[Dict], windows: List[Tuple[float, float]]) -> List[List[Dict]]:
+    """
+    Map each Whisper segment to the window it overlaps most.
+
+    A segment that overlaps no window (speech before the first question or
+    after the last) goes to the nearest window.
+    """
+    assigned: List[List[Dict]] = [[] for _ in windows]
+    if not windows:
+        return assigned
+
+    for seg in segments:
+        seg_start = float(seg.get('start', 0))
+        seg_end = max(seg_start, float(seg.get('end', seg_start)))
+
+        best, best_overlap = None, 0.0
+        for i, (w_start, w_end) in enumerate(windows):
+            overlap = _overlap(seg_start, seg_end, w_start, w_end)
+            if overlap > best_overlap:
+                best, best_overlap = i, overlap
+
+        if best is None:
+            midpoint = (seg_start + seg_end) / 2
+            best = min(range(len(windows)),
+                       key=lambda i: min(abs(midpoint - windows[i][0]), abs(midpoint - windows[i][1])))
+        assigned[best].append(seg)
+
+    return assigned
+
+
+def segment_answers(segments: List[Dict], questions: List[Dict], total_duration: float = 0) -> Optional[List[str]]:
+    """
+    Per-question answer text, in question order.
+
+    Returns None when timestamps or segments are missing, so the caller can
+    fall back to evaluating against the whole transcript.
+    """
+    windows = question_windows(questions, total_duration)
+    if windows is None or not segments:
+        return None
+
+    return [
+        ' '.join(seg.get('text', '').strip() for seg in bucket if seg.get('text', '').strip())
+        for bucket in assign_segments(segments, windows)
+    ]
+
+
+if __name__ == "__main__":
+    print("Answer Segmenter Module - Test")
+    print("=" * 50)
+
+    test_questions = [{'answer_start': 0.0}, {'answer_start': 20.0}, {'answer_start': 45.0}]
+    test_segments = [
+        {'start': 1.0, 'end': 8.0, 'text': 'Python is a high-level language.'},
+        {'start': 8.0, 'end': 21.0, 'text': 'It is popular for its libraries.'},
+        {'start': 22.0, 'end': 40.0, 'text': 'A class bundles data and behaviour.'},
+        {'start': 47.0, 'end': 60.0, 'text': 'I would use a queue here.'},
+    ]
+    for index, answer in enumerate(segment_answers(test_segments, test_questions, 60.0) or []):
+        print(f"Q{index + 1}: {answer}")
@@ -13,7 +13,7 @@ from dotenv import load_dotenv
 load_dotenv()
 
 # Import extensions and models
-from models import db, User
+from models import db, User, upgrade_schema
 from config import config
 
 # Initialize extensions
@@ -67,6 +67,7 @@ def create_app(config_name=None):
         # Create database tables - don't crash if DB is temporarily unavailable
         try:
             db.create_all()
+            upgrade_schema()  # Columns added to existing tables (create_all never alters them)
             print("[APP] Database tables created/verified.")
         except Exception as e:
             print(f"[APP] Warning: Could not create database tables on startup: {e}")
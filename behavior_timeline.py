@@ -0,0 +1,252 @@
+"""
+Behavior Timeline Module
+Per-sample confidence signals kept next to each interview video
+Handles: Compact npz timeline, Vectorized confidence scoring, Bulk re-scoring without decoding video
+
+ConfidenceAnalyzer reduces a video to a few averages, so a change to the
+confidence formula used to mean decoding every stored video again. Each
+analysis now also writes <video>.timeline.npz with one row per sampled
+frame:
+
+    t        float32   sample timestamp in seconds (NaN when unknown)
+    w        float16   sample weight (< 1 for motion-burst samples, see AdaptiveSampler)
+    face     uint8     1 if a face was found
+    eye      float16   eye-contact score 0..100 (0 without landmarks)
+    emotion  uint8     index into labels, 255 = no emotion
+    probs    float16   (rows, len(labels)) emotion-model probabilities
+    labels   str       emotion label names
+
+A 20-minute interview at one sample per second is about 20 KB.
+score_many() applies the confidence formula (CONFIDENCE_WEIGHTS, the same
+constants ConfidenceAnalyzer.score_stats uses) to any number of timelines
+in one vectorized pass; rescore_interviews() does that for stored
+interviews and can write the new scores back.
+"""
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+TIMELINE_ENABLED = os.environ.get('CONFIDENCE_TIMELINE_ENABLED', 'true').lower() == 'true'
+NO_EMOTION = 255
+
+# Confidence formula (see ConfidenceAnalyzer.score_stats)
+CONFIDENCE_WEIGHTS = {
+    'presence': 0.25,          # Being present
+    'eye_contact': 0.35,       # Eye contact
+    'emotion': 0.40,           # Positive emotions
+    'negative_penalty': 0.5,   # Share of negative emotions subtracted from the positive share
+    'floor': 20,               # Minimum score once any face was seen
+    'positive': ['happy', 'neutral', 'surprise'],
+    'negative': ['angry', 'sad', 'fear', 'disgust']
+}
+
+
+def timeline_path(video_path: str) -> str:
+    return os.path.splitext(video_path)[0] + '.timeline.npz'
+
+
+class BehaviorTimeline:
+    """Rows of per-sample signals, appended in sampling order by ConfidenceStats.add_frame"""
+
+    def __init__(self, labels: Optional[Iterable[str]] = None):
+        self.labels: List[str] = list(labels or [])
+        self.times: List[float] = []
+        self.weights: List[float] = []
+        self.faces: List[int] = []
+        self.eyes: List[float] = []
+        self.emotions: List[int] = []
+        self.probs: List[Optional[np.ndarray]] = []
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def _label_index(self, emotion: Optional[str]) -> int:
+        if not emotion:
+            return NO_EMOTION
+        if emotion not in self.labels:
+            self.labels.append(emotion)  # e.g. 'unknown' when the model failed
+        return self.labels.index(emotion)
+
+    def add(self, frame_result: Dict):
+        face = bool(frame_result.get('face_detected'))
+        timestamp = frame_result.get('timestamp')
+        self.times.append(float(timestamp) if timestamp is not None else float('nan'))
+        self.weights.append(float(frame_result.get('weight', 1.0)))
+        self.faces.append(1 if face else 0)
+        self.eyes.append(float(frame_result.get('eye_contact', 0) or 0) if face else 0.0)
+        self.emotions.append(self._label_index(frame_result.get('emotion')) if face else NO_EMOTION)
+        self.probs.append(frame_result.get('emotion_probs') if face else None)
+
+    def extend(self, other: 'BehaviorTimeline') -> 'BehaviorTimeline':
+        mapping = [self._label_index(label) for label in other.labels]
+        self.times.extend(other.times)
+        self.weights.extend(other.weights)
+        self.faces.extend(other.faces)
+        self.eyes.extend(other.eyes)
+        self.emotions.extend(e if e == NO_EMOTION else mapping[e] for e in other.emotions)
+        self.probs.extend(other.probs)
+        return self
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        width = max([len(self.labels)] + [len(p) for p in self.probs if p is not None])
+        probs = np.zeros((len(self), width), dtype=np.float16)
+        for row, p in enumerate(self.probs):
+            if p is not None:
+                probs[row, :len(p)] = np.asarray(p, dtype=np.float32).reshape(-1)
+        arrays = {
+            't': np.array(self.times, dtype=np.float32),
+            'w': np.array(self.weights, dtype=np.float16),
+            'face': np.array(self.faces, dtype=np.uint8),
+            'eye': np.array(self.eyes, dtype=np.float16),
+            'emotion': np.array(self.emotions, dtype=np.uint8),
+            'probs': probs,
+            'labels': np.array(self.labels, dtype=str)
+        }
+        # Shards and reused samples arrive out of order
+        order = np.argsort(arrays['t'], kind='stable')
+        for key in ('t', 'w', 'face', 'eye', 'emotion', 'probs'):
+            arrays[key] = arrays[key][order]
+        return arrays
+
+    def save(self, path: str):
+        """Write atomically, so a reader never sees half a file"""
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez_compressed(f, **self.to_arrays())
+        os.replace(tmp_path, path)
+
+
+def load_timeline(path: str) -> Dict[str, np.ndarray]:
+    with np.load(path, allow_pickle=False) as data:
+        return {key: data[key] for key in data.files}
+
+
+def score_many(timelines: List[Dict[str, np.ndarray]], weights: Optional[Dict] = None) -> np.ndarray:
+    """
+    Confidence score for every timeline in one vectorized pass.
+
+    Reproduces ConfidenceAnalyzer.score_stats (within float16 precision of
+    the stored eye-contact values); change weights to try another formula.
+    """
+    weights = dict(CONFIDENCE_WEIGHTS, **(weights or {}))
+    if not timelines:
+        return np.zeros(0)
+    lengths = np.array([len(t['face']) for t in timelines])
+    segment = np.repeat(np.arange(len(timelines)), lengths)
+    # Timelines saved before sample weights existed count every row once
+    weight = np.concatenate([t['w'] if 'w' in t else np.ones(len(t['face'])) for t in timelines]).astype(np.float64)
+    face = np.concatenate([t['face'] for t in timelines]).astype(np.float64) * weight
+    eye = np.concatenate([t['eye'] for t in timelines]).astype(np.float64)
+    emotion = np.concatenate([t['emotion'] for t in timelines])
+
+    # Per-file label names → +1 positive / -1 negative / 0 other, looked up per row
+    polarity_rows = []
+    for t in timelines:
+        labels = [str(label) for label in t['labels']]
+        polarity = np.zeros(256, dtype=np.int8)
+        polarity[[i for i, label in enumerate(labels) if label in weights['positive']]] = 1
+        polarity[[i for i, label in enumerate(labels) if label in weights['negative']]] = -1
+        polarity_rows.append(polarity[t['emotion']])
+    polarity = np.concatenate(polarity_rows)
+
+    count = len(timelines)
+    total = np.bincount(segment, weights=weight, minlength=count)
+    faces = np.bincount(segment, weights=face, minlength=count)
+    eye_sum = np.bincount(segment, weights=eye * face, minlength=count)
+    has_emotion = ((face > 0) & (emotion != NO_EMOTION)) * weight
+    emotions = np.bincount(segment, weights=has_emotion, minlength=count)
+    positive = np.bincount(segment, weights=has_emotion * (polarity > 0), minlength=count)
+    negative = np.bincount(segment, weights=has_emotion * (polarity < 0), minlength=count)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        presence = np.where(total > 0, faces / total * 100, 0.0)
+        avg_eye = np.where(faces > 0, eye_sum / faces, 0.0)
+        positive_pct = np.where(emotions > 0, positive / emotions * 100, 0.0)
+        negative_pct = np.where(emotions > 0, negative / emotions * 100, 0.0)
+    emotion_score = np.clip(positive_pct - negative_pct * weights['negative_penalty'], 0, 100)
+    score = (presence * weights['presence'] + avg_eye * weights['eye_contact']
+             + emotion_score * weights['emotion'])
+    score = np.where((faces > 0) & (score < weights['floor']), weights['floor'], score)
+    return np.where(lengths > 0, np.round(score, 2), 0.0)
+
+
+def score_timeline(timeline: Dict[str, np.ndarray], weights: Optional[Dict] = None) -> float:
+    return float(score_many([timeline], weights)[0])
+
+
+def rescore_interviews(weights: Optional[Dict] = None, interview_ids: Optional[List[int]] = None,
+                       apply: bool = False) -> Dict[int, Tuple[float, float]]:
+    """
+    New confidence scores for analyzed interviews that have a timeline.
+
+    Returns {interview_id: (stored score, new score)}. With apply=True the
+    new scores are written to CandidateResult (overall score recomputed with
+    the configured pillar weights). Needs an app context.
+    """
+    from flask import current_app
+    from models import db, Interview, CandidateResult
+
+    query = db.session.query(Interview.interview_id, Interview.video_path, CandidateResult) \
+        .join(CandidateResult, CandidateResult.interview_id == Interview.interview_id) \
+        .filter(Interview.video_path.isnot(None))
+    if interview_ids is not None:
+        query = query.filter(Interview.interview_id.in_(interview_ids))
+
+    ids, results, timelines = [], [], []
+    for interview_id, video_path, result in query.all():
+        path = timeline_path(video_path)
+        if not os.path.exists(path):
+            continue
+        try:
+            timelines.append(load_timeline(path))
+        except Exception as e:
+            print(f"   ⚠️ [TIMELINE] Unreadable timeline for interview {interview_id}: {e}")
+            continue
+        ids.append(interview_id)
+        results.append(result)
+
+    scores = score_many(timelines, weights)
+    changes = {interview_id: (result.confidence_score, float(score))
+               for interview_id, result, score in zip(ids, results, scores)}
+
+    if apply and results:
+        pillar_weights = {
+            'resume': current_app.config.get('WEIGHT_RESUME', 0.25),
+            'confidence': current_app.config.get('WEIGHT_CONFIDENCE', 0.20),
+            'communication': current_app.config.get('WEIGHT_COMMUNICATION', 0.25),
+            'knowledge': current_app.config.get('WEIGHT_KNOWLEDGE', 0.30)
+        }
+        for result, score in zip(results, scores):
+            result.confidence_score = float(score)
+            result.calculate_overall_score(pillar_weights)
+        db.session.commit()
+    print(f"[TIMELINE] Re-scored {len(changes)} interviews{' (saved)' if apply else ''}")
+    return changes
+
+
+if __name__ == "__main__":
+    import time
+
+    print("Behavior Timeline Module - Test")
+    print("=" * 50)
+
+    rng = np.random.default_rng(0)
+    labels = ['Angry', 'Disgust', 'Fear', 'Happy', 'Sad', 'Surprise', 'Neutral']
+    timelines = []
+    for _ in range(5000):
+        rows = 1200  # 20 minutes at one sample per second
+        face = (rng.random(rows) < 0.9).astype(np.uint8)
+        timelines.append({
+            't': np.arange(rows, dtype=np.float32),
+            'face': face,
+            'eye': (rng.random(rows) * 100 * face).astype(np.float16),
+            'emotion': np.where(face > 0, rng.integers(0, len(labels), rows), NO_EMOTION).astype(np.uint8),
+            'labels': np.array(labels)
+        })
+    started = time.perf_counter()
+    scores = score_many(timelines)
+    elapsed = time.perf_counter() - started
+    alternative = score_many(timelines, {'eye_contact': 0.45, 'emotion': 0.30, 'floor': 0})
+    print(f"Scored {len(timelines)} interviews ({len(timelines) * 1200:,} samples) in {elapsed:.2f}s")
+    print(f"Mean score {scores.mean():.2f}; with more weight on eye contact and no floor {alternative.mean():.2f}")
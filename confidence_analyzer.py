@@ -8,12 +8,16 @@
 Confidence Analyzer Module (Pillar 2)
 Analyze interview video for confidence indicators
 Evaluates: Facial expressions, Eye contact, Body posture, Overall confidence
-Uses: TensorFlow emotion_model.h5, MediaPipe for face/eye tracking
+Uses: emotion_model (ONNX or TensorFlow .h5, see emotion_runtime.py), MediaPipe for face/eye tracking
 Output: Confidence Score percentage
 """
 import os
 import json
-from typing import Optional, Dict, Any, Tuple
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, wait
+from typing import Optional, Dict, Any, List, Tuple
 
 # NumPy
 np = None
@@ -31,79 +35,306 @@ try:
 except ImportError:
     print("[CONFIDENCE_ANALYZER] OpenCV not available")
 
-# MediaPipe for face analysis
-mp = None
-mp_face_mesh = None
-mp_face_landmarker = None
-MEDIAPIPE_AVAILABLE = False
-MEDIAPIPE_TASKS_API = False
+# MediaPipe face landmarks (solutions FaceMesh or Tasks FaceLandmarker - see landmark_engine.py)
+from landmark_engine import (mp_face_mesh, MEDIAPIPE_AVAILABLE, MEDIAPIPE_TASKS_API, create_engine,
+                             gaze_metrics, landmarks_to_array)
 
-try:
-    import mediapipe as mp_module
-    mp = mp_module
-    
-    # Try old solutions API first (MediaPipe < 0.10.x)
-    if hasattr(mp, 'solutions') and hasattr(mp.solutions, 'face_mesh'):
-        mp_face_mesh = mp.solutions.face_mesh
-        MEDIAPIPE_AVAILABLE = True
-        print("[CONFIDENCE_ANALYZER] MediaPipe (solutions API) loaded successfully")
-    # Try new Tasks API (MediaPipe >= 0.10.x)
-    elif hasattr(mp, 'tasks'):
-        try:
-            from mediapipe.tasks import python as mp_tasks
-            from mediapipe.tasks.python import vision as mp_vision
-            mp_face_landmarker = mp_vision
-            MEDIAPIPE_AVAILABLE = True
-            MEDIAPIPE_TASKS_API = True
-            print("[CONFIDENCE_ANALYZER] MediaPipe (Tasks API) loaded successfully")
-        except Exception as e:
-            print(f"[CONFIDENCE_ANALYZER] MediaPipe Tasks API not available: {e}")
-    else:
-        print("[CONFIDENCE_ANALYZER] MediaPipe loaded but face_mesh not available - using OpenCV fallback")
-        
-except (ImportError, AttributeError, Exception) as e:
-    print(f"[CONFIDENCE_ANALYZER] MediaPipe not available: {e}")
+# Emotion classifier runtime (ONNX Runtime / OpenCV DNN / Keras - see emotion_runtime.py)
+from emotion_runtime import load_emotion_model, backend_name
+import face_tracker
+import adaptive_sampler
+from face_tracker import FaceTracker, FrameBuffers
+from adaptive_sampler import AdaptiveSampler, ADAPTIVE_SAMPLING
+from behavior_timeline import BehaviorTimeline, CONFIDENCE_WEIGHTS, TIMELINE_ENABLED, timeline_path
+from analysis_pipeline import AnalysisCancelled
 
-# TensorFlow/Keras - lazy loading
-tf = None
-load_model = None
-img_to_array = None
-_tf_loaded = False
 
+# Model paths
+MODEL_PATH = os.path.join(os.path.dirname(__file__), 'emotion_model.h5')
+LABELS_PATH = os.path.join(os.path.dirname(__file__), 'labels.txt')
 
-def _load_tensorflow():
-    """Lazy load TensorFlow to avoid slow startup"""
-    global tf, load_model, img_to_array, _tf_loaded
+# Time-based sampling (see TimeSampler); 0 samples/s = legacy every-Nth-frame sampling
+DEFAULT_SAMPLES_PER_SECOND = float(os.environ.get('CONFIDENCE_SAMPLES_PER_SECOND') or 1.0)
+SEEK_MIN_INTERVAL = float(os.environ.get('CONFIDENCE_SEEK_MIN_INTERVAL') or 2.0)
+# Face crops per emotion-model call (see EmotionBatcher); 1 = one predict() per face
+EMOTION_BATCH_SIZE = max(1, int(os.environ.get('CONFIDENCE_EMOTION_BATCH_SIZE') or 32))
+FALLBACK_FPS = 30.0  # When the container reports no usable timestamps or FPS
+# Long videos are split into time ranges analyzed in parallel processes (see plan_shards)
+SHARD_WORKERS = int(os.environ.get('CONFIDENCE_SHARD_WORKERS') or min(4, os.cpu_count() or 1))
+MIN_SHARD_SECONDS = float(os.environ.get('CONFIDENCE_MIN_SHARD_SECONDS') or 120)
+SHARD_CANCEL_POLL_SECONDS = 0.5  # How often a sharded analysis checks its cancel event
+# Analyzer instances per process for concurrent analyses (gunicorn --threads, see AnalyzerPool)
+ANALYZER_POOL_SIZE = int(os.environ.get('CONFIDENCE_ANALYZER_POOL_SIZE') or 4)
+
+
+class ConfidenceStats:
+    """
+    Mergeable per-frame counters for confidence scoring
     
-    if _tf_loaded:
-        return tf is not None
+    Every field is a sum or a count, so stats from separate parts of a video
+    (incremental chunk processing, parallel shards) merge exactly. The
+    optional timeline keeps the per-sample rows as well (behavior_timeline.py);
+    it is dropped when merged with counters that have none.
     
-    _tf_loaded = True
+    Samples carry a weight (frame_result['weight'], default 1): motion-burst
+    samples from AdaptiveSampler stand for less video than base-rate ones.
+    frames_analyzed/faces_detected count rows; the scores use the weighted
+    sums (sample_weight, face_weight and the weighted eye/emotion/pose
+    counters).
+    """
     
-    try:
-        import tensorflow as tf_module
-        tf = tf_module
-        
-        try:
-            from tensorflow.keras.models import load_model as lm
-            from tensorflow.keras.preprocessing.image import img_to_array as ita
-        except:
-            from keras.models import load_model as lm
-            from keras.preprocessing.image import img_to_array as ita
-        
-        load_model = lm
-        img_to_array = ita
-        print("[CONFIDENCE_ANALYZER] TensorFlow loaded")
-        return True
-        
-    except Exception as e:
-        print(f"[CONFIDENCE_ANALYZER] TensorFlow not available: {e}")
+    def __init__(self):
+        self.frames_analyzed = 0
+        self.faces_detected = 0
+        self.eye_contact_sum = 0.0
+        self.eye_contact_count = 0.0
+        self.emotion_counts: Dict[str, float] = {}
+        self.emotion_confidence_sum = 0.0
+        self.head_yaw_sum = 0.0  # Absolute degrees, frames with landmarks only
+        self.head_pitch_sum = 0.0
+        self.head_pose_count = 0.0
+        self.sample_weight = 0.0
+        self.face_weight = 0.0
+        self.duration = 0.0
+        self.timeline: Optional[BehaviorTimeline] = None
+    
+    def add_frame(self, frame_result: Dict):
+        weight = frame_result.get('weight', 1.0)
+        self.frames_analyzed += 1
+        self.sample_weight += weight
+        if self.timeline is not None:
+            self.timeline.add(frame_result)
+        if frame_result.get('face_detected'):
+            self.faces_detected += 1
+            self.face_weight += weight
+            
+            # Track emotions
+            emotion = frame_result.get('emotion')
+            if emotion:
+                self.emotion_counts[emotion] = self.emotion_counts.get(emotion, 0) + weight
+                self.emotion_confidence_sum += frame_result.get('emotion_confidence', 0) * weight
+            
+            # Track eye contact
+            self.eye_contact_sum += frame_result.get('eye_contact', 0) * weight
+            self.eye_contact_count += weight
+            
+            if frame_result.get('head_yaw') is not None:
+                self.head_yaw_sum += abs(frame_result['head_yaw']) * weight
+                self.head_pitch_sum += abs(frame_result['head_pitch']) * weight
+                self.head_pose_count += weight
+    
+    def merge(self, other: 'ConfidenceStats') -> 'ConfidenceStats':
+        self.frames_analyzed += other.frames_analyzed
+        self.faces_detected += other.faces_detected
+        self.eye_contact_sum += other.eye_contact_sum
+        self.eye_contact_count += other.eye_contact_count
+        for emotion, count in other.emotion_counts.items():
+            self.emotion_counts[emotion] = self.emotion_counts.get(emotion, 0) + count
+        self.emotion_confidence_sum += other.emotion_confidence_sum
+        self.head_yaw_sum += other.head_yaw_sum
+        self.head_pitch_sum += other.head_pitch_sum
+        self.head_pose_count += other.head_pose_count
+        self.sample_weight += other.sample_weight
+        self.face_weight += other.face_weight
+        self.duration += other.duration
+        if self.timeline is not None and other.timeline is not None:
+            self.timeline.extend(other.timeline)
+        elif self.timeline is not None and other.frames_analyzed:
+            self.timeline = None  # Part of the video has counters only
+        return self
+    
+    def to_dict(self) -> Dict:
+        return {
+            'frames_analyzed': self.frames_analyzed,
+            'faces_detected': self.faces_detected,
+            'eye_contact_sum': self.eye_contact_sum,
+            'eye_contact_count': self.eye_contact_count,
+            'emotion_counts': dict(self.emotion_counts),
+            'emotion_confidence_sum': self.emotion_confidence_sum,
+            'head_yaw_sum': self.head_yaw_sum,
+            'head_pitch_sum': self.head_pitch_sum,
+            'head_pose_count': self.head_pose_count,
+            'sample_weight': self.sample_weight,
+            'face_weight': self.face_weight,
+            'duration': self.duration
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'ConfidenceStats':
+        stats = cls()
+        for key, value in (data or {}).items():
+            if hasattr(stats, key):
+                setattr(stats, key, dict(value) if key == 'emotion_counts' else value)
+        if 'sample_weight' not in (data or {}):
+            # Saved before samples were weighted: every sample counted once
+            stats.sample_weight = float(stats.frames_analyzed)
+            stats.face_weight = float(stats.faces_detected)
+        return stats
+
+
+class TimeSampler:
+    """
+    Yield frames from an open cv2.VideoCapture at N samples per second of video
+    
+    Sampling follows the frame timestamps (CAP_PROP_POS_MSEC), not frame
+    counts, so browser webm files with bogus FPS/frame counts are sampled
+    correctly. Frames between samples are only grab()bed - demuxed and
+    decoded, but never converted to BGR or copied. When samples are at least
+    seek_min_interval apart, the sampler seeks instead, so decode work
+    scales with the number of samples; files that cannot seek accurately
+    (e.g. webm without cues) fall back to grabbing.
+    
+    After iteration, duration is the timestamp of the last frame seen and
+    grabbed the number of frames read through the capture (a seek still
+    decodes from the preceding keyframe inside OpenCV).
+    
+    start/end restrict sampling to [start, end) of the video (one shard of
+    a parallel analysis); with start on the sampling grid the shard yields
+    exactly the frames a full pass would yield in that range.
+    """
+    
+    def __init__(self, cap, samples_per_second: float, seek_min_interval: float = SEEK_MIN_INTERVAL,
+                 start: float = 0.0, end: Optional[float] = None):
+        self.cap = cap
+        self.interval = 1.0 / samples_per_second
+        self.start = start
+        self.end = end
+        self.reached_end = False  # Stopped at end rather than at the end of the file
+        self.seek_min_interval = seek_min_interval
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        self.fps = fps if 1 <= fps <= 120 else FALLBACK_FPS
+        self.mode = 'seek' if self.interval >= seek_min_interval else 'grab'
+        self.duration = 0.0
+        self.grabbed = 0
+        self.samples = 0
+        self.last_position = None  # Timestamp (s) of the frame just yielded
+    
+    def _position(self, index: int) -> float:
+        """Timestamp (s) of the frame just grabbed; frame index / FPS if the backend reports none"""
+        msec = self.cap.get(cv2.CAP_PROP_POS_MSEC)
+        if msec > 0 or index == 0:
+            return msec / 1000.0
+        return index / self.fps
+    
+    def __iter__(self):
+        if self.start > 0:
+            self.cap.set(cv2.CAP_PROP_POS_MSEC, self.start * 1000.0)
+            if self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0 > self.start + self.interval:
+                # Overshot: samples before the landing point would be lost, decode from the start instead
+                self.cap.set(cv2.CAP_PROP_POS_MSEC, 0)
+        if self.mode == 'seek':
+            yield from self._seek_frames()
+        else:
+            yield from self._grab_frames(self.start)
+    
+    def _past_end(self, position: float) -> bool:
+        if self.end is not None and position + 1e-3 >= self.end:
+            self.reached_end = True
+            return True
         return False
+    
+    def _grab_frames(self, next_sample: float):
+        index = 0
+        while self.cap.grab():
+            position = self._position(index)
+            index += 1
+            self.grabbed += 1
+            if self._past_end(position):
+                return
+            self.duration = max(self.duration, position)
+            if position + 1e-3 < next_sample:
+                continue
+            ok, frame = self.cap.retrieve()
+            if ok:
+                self.samples += 1
+                self.last_position = position
+                yield frame
+            # Next sample point after this frame (skips gaps in variable-frame-rate video)
+            next_sample = (int(position / self.interval) + 1) * self.interval
+    
+    def _seek_frames(self):
+        target = self.start
+        while True:
+            self.cap.set(cv2.CAP_PROP_POS_MSEC, target * 1000.0)
+            ok, frame = self.cap.read()
+            if not ok:
+                return
+            self.grabbed += 1
+            position = self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+            if target > 0 and position + self.interval / 2 < target:
+                # Seek landed far before the target: not seekable, decode forward instead
+                print(f"   ⚠️ [CONFIDENCE_ANALYZER] Video not seekable, sampling by grab()")
+                self.mode = 'grab'
+                yield from self._grab_frames(target)
+                return
+            if self._past_end(position):
+                return
+            self.duration = max(self.duration, position)
+            self.samples += 1
+            self.last_position = position
+            yield frame
+            target = max(target, position) + self.interval
 
 
-# Model paths
-MODEL_PATH = os.path.join(os.path.dirname(__file__), 'emotion_model.h5')
-LABELS_PATH = os.path.join(os.path.dirname(__file__), 'labels.txt')
+class EmotionBatcher:
+    """
+    Classify face crops in batches instead of one predict() per face
+    
+    Keras predict() has a large fixed cost per call, which dominated
+    confidence analysis when it ran once per sampled frame. Crops are
+    preprocessed straight into a preallocated (batch, h, w, 1) float32
+    tensor; when it is full, one predict_on_batch() scores all of them and
+    the emotions are written back into the waiting frame results, which
+    take() hands out in sampling order.
+    """
+    
+    def __init__(self, analyzer: 'ConfidenceAnalyzer', batch_size: int = EMOTION_BATCH_SIZE):
+        self.analyzer = analyzer
+        self.input_h, self.input_w = analyzer.input_shape if analyzer.input_shape else (48, 48)
+        self.buffer = np.empty((batch_size, self.input_h, self.input_w, 1), dtype=np.float32)
+        self.pending: List[Dict] = []
+        self.completed: List[Dict] = []
+        self.batches = 0
+    
+    def add(self, face_roi, frame_result: Dict):
+        """Queue one face; frame_result gets its emotion when the batch is scored"""
+        slot = self.buffer[len(self.pending), :, :, 0]
+        gray = cv2.cvtColor(face_roi, cv2.COLOR_BGR2GRAY) if len(face_roi.shape) == 3 else face_roi
+        resized = cv2.resize(gray, (self.input_w, self.input_h))
+        np.multiply(resized, 1.0 / 255.0, out=slot, casting='unsafe')
+        self.pending.append(frame_result)
+        if len(self.pending) == len(self.buffer):
+            self.flush()
+    
+    def take(self) -> List[Dict]:
+        """Frame results whose emotion is known, since the last take()"""
+        done, self.completed = self.completed, []
+        return done
+    
+    def flush(self):
+        """Score every queued face, even if the batch is not full"""
+        if not self.pending:
+            return
+        done, self.pending = self.pending, []
+        try:
+            predictions = np.asarray(self.analyzer.emotion_model.predict_on_batch(self.buffer[:len(done)]))
+            self.batches += 1
+        except Exception as e:
+            print(f"   ⚠️ [CONFIDENCE_ANALYZER] Emotion batch failed: {e}")
+            predictions = None
+        
+        labels = self.analyzer.emotion_labels
+        for i, frame_result in enumerate(done):
+            if predictions is None:
+                emotion, confidence = 'unknown', 0.0
+            else:
+                emotion_idx = int(np.argmax(predictions[i]))
+                confidence = float(predictions[i][emotion_idx])
+                emotion = labels[emotion_idx] if emotion_idx < len(labels) else 'unknown'
+            frame_result['emotion'] = emotion
+            frame_result['emotion_confidence'] = confidence
+            frame_result['emotion_probs'] = predictions[i] if predictions is not None else None
+        self.completed.extend(done)
 
 
 class ConfidenceAnalyzer:
@@ -118,30 +349,26 @@ class ConfidenceAnalyzer:
         self.emotion_labels = None
         self.face_cascade = None
         self.face_mesh = None
+        self.landmarks = None  # Shared landmark engine for single-frame calls
         self.input_shape = None
         
         # Positive emotions that indicate confidence
-        self.confidence_emotions = ['happy', 'neutral', 'surprise']
-        self.negative_emotions = ['angry', 'sad', 'fear', 'disgust']
-        
-        # Eye contact landmark indices (MediaPipe)
-        self.left_eye_indices = [33, 7, 163, 144, 145, 153, 154, 155, 133, 173, 157, 158, 159, 160, 161, 246]
-        self.right_eye_indices = [362, 382, 381, 380, 374, 373, 390, 249, 263, 466, 388, 387, 386, 385, 384, 398]
-        self.iris_left = [468, 469, 470, 471, 472]
-        self.iris_right = [473, 474, 475, 476, 477]
+        self.confidence_emotions = CONFIDENCE_WEIGHTS['positive']
+        self.negative_emotions = CONFIDENCE_WEIGHTS['negative']
         
         self._initialize()
     
     def _initialize(self):
         """Initialize models and resources"""
-        # Load emotion model
-        if _load_tensorflow() and os.path.exists(MODEL_PATH):
-            try:
-                self.emotion_model = load_model(MODEL_PATH, compile=False)  # type: ignore
-                self.input_shape = self.emotion_model.input_shape[1:3]  # type: ignore
-                print(f"   ✅ Emotion model loaded: {self.input_shape}")
-            except Exception as e:
-                print(f"   ⚠️ Failed to load emotion model: {e}")
+        # Load emotion model (ONNX when converted, so TensorFlow is never imported)
+        try:
+            self.emotion_model = load_emotion_model(MODEL_PATH)
+            if self.emotion_model is not None:
+                self.input_shape = tuple(d or 48 for d in self.emotion_model.input_shape[1:3])  # type: ignore
+                print(f"   ✅ Emotion model loaded: {self.input_shape} "
+                      f"({backend_name(self.emotion_model)})")
+        except Exception as e:
+            print(f"   ⚠️ Failed to load emotion model: {e}")
         
         # Load emotion labels
         if os.path.exists(LABELS_PATH):
@@ -173,11 +400,21 @@ class ConfidenceAnalyzer:
                 print("   ✅ MediaPipe Face Mesh initialized")
             except Exception as e:
                 print(f"   ⚠️ MediaPipe init failed: {e}")
+        
+        # Landmark engine (Tasks API: FaceLandmarker in VIDEO mode; collect_stats makes one per video)
+        self.landmarks = create_engine(self.face_mesh)
+        if self.landmarks is not None and MEDIAPIPE_TASKS_API:
+            print("   ✅ MediaPipe FaceLandmarker initialized (VIDEO mode)")
     
     def detect_emotion(self, face_img) -> Tuple[str, float]:
         """Detect emotion from face image"""
+        emotion, confidence, _ = self._predict_emotion(face_img)
+        return emotion, confidence
+    
+    def _predict_emotion(self, face_img) -> Tuple[str, float, Any]:
+        """detect_emotion() plus the model's probability vector (None if the model did not run)"""
         if self.emotion_model is None or face_img is None:
-            return 'unknown', 0.0
+            return 'unknown', 0.0, None
         
         try:
             # Preprocess face for model
@@ -203,10 +440,10 @@ class ConfidenceAnalyzer:
             
             emotion = self.emotion_labels[emotion_idx] if emotion_idx < len(self.emotion_labels) else 'unknown'  # type: ignore
             
-            return emotion, confidence
+            return emotion, confidence, predictions[0]
             
         except Exception as e:
-            return 'unknown', 0.0
+            return 'unknown', 0.0, None
     
     def calculate_eye_contact(self, face_landmarks, frame_width, frame_height) -> float:
         """Calculate eye contact score based on gaze direction"""
@@ -214,43 +451,42 @@ class ConfidenceAnalyzer:
             return 0.0
         
         try:
-            # Get iris positions
-            landmarks = face_landmarks.landmark
-            
-            # Left eye center
-            left_eye_center_x = sum(landmarks[i].x for i in self.left_eye_indices) / len(self.left_eye_indices)
-            left_eye_center_y = sum(landmarks[i].y for i in self.left_eye_indices) / len(self.left_eye_indices)
-            
-            # Right eye center
-            right_eye_center_x = sum(landmarks[i].x for i in self.right_eye_indices) / len(self.right_eye_indices)
-            right_eye_center_y = sum(landmarks[i].y for i in self.right_eye_indices) / len(self.right_eye_indices)
-            
-            # Get iris center if available
-            if len(self.iris_left) > 0 and self.iris_left[0] < len(landmarks):
-                left_iris_x = landmarks[self.iris_left[0]].x
-                right_iris_x = landmarks[self.iris_right[0]].x
-            else:
-                left_iris_x = left_eye_center_x
-                right_iris_x = right_eye_center_x
-            
-            # Calculate deviation from center
-            left_deviation = abs(left_iris_x - left_eye_center_x)
-            right_deviation = abs(right_iris_x - right_eye_center_x)
-            avg_deviation = (left_deviation + right_deviation) / 2
-            
-            # Convert to score (lower deviation = higher score)
-            eye_contact_score = max(0, 100 - (avg_deviation * 1000))
-            
-            return min(100, eye_contact_score)
+            points = face_landmarks if hasattr(face_landmarks, 'shape') else landmarks_to_array(face_landmarks.landmark)
+            return gaze_metrics(points, frame_width, frame_height)['eye_contact']
             
         except Exception as e:
             return 50.0
     
-    def analyze_frame(self, frame) -> Dict:
-        """Analyze a single frame for confidence indicators"""
+    def analyze_frame(self, frame, batcher: Optional[EmotionBatcher] = None,
+                      tracker: Optional[FaceTracker] = None, buffers: Optional[FrameBuffers] = None,
+                      landmarks=None, timestamp: Optional[float] = None) -> Dict:
+        """
+        Analyze a single frame for confidence indicators
+        
+        With a batcher the face crop is queued instead of classified here
+        (result['deferred']); the result gets its emotion when the batch is
+        scored and is then returned by batcher.take().
+        
+        The frame is downscaled once (buffers) and the face is found once:
+        from the landmarks when the landmark engine sees a face, otherwise by
+        the tracker, which only runs the Haar cascade when tracking is lost.
+        Pass the same tracker/buffers/landmarks engine (and increasing
+        timestamps) for consecutive frames of one video.
+        """
         if frame is None or cv2 is None:
             return {'face_detected': False, 'emotion': None, 'eye_contact': 0}
         
+        try:
+            landmarks = landmarks or self.landmarks
+            buffers = (buffers or FrameBuffers()).prepare(frame, need_rgb=landmarks is not None)
+        except Exception as e:
+            return {'face_detected': False, 'emotion': None, 'eye_contact': 0, 'error': str(e)}
+        return self._analyze_prepared(buffers, batcher, tracker, landmarks, timestamp)
+    
+    def _analyze_prepared(self, buffers: FrameBuffers, batcher: Optional[EmotionBatcher] = None,
+                          tracker: Optional[FaceTracker] = None, landmarks=None,
+                          timestamp: Optional[float] = None) -> Dict:
+        """analyze_frame() on a frame already downscaled into buffers"""
         result = {
             'face_detected': False,
             'emotion': None,
@@ -259,50 +495,62 @@ class ConfidenceAnalyzer:
         }
         
         try:
-            height, width = frame.shape[:2]
+            height, width = buffers.source_shape
+            tracker = tracker or FaceTracker(self.face_cascade)
+            gray = buffers.gray
+            box = None
+            
+            # Detect face and landmarks (landmarks are normalized, so the small frame gives the same gaze)
+            points = landmarks.detect(buffers.rgb, timestamp) if landmarks is not None else None
+            if points is not None:
+                result['face_detected'] = True
+                
+                # Eye contact and head pose
+                metrics = gaze_metrics(points, width, height)
+                result['eye_contact'] = metrics['eye_contact']
+                result['head_yaw'] = metrics['yaw']
+                result['head_pitch'] = metrics['pitch']
+                result['head_roll'] = metrics['roll']
+                box = tracker.from_landmarks(points, gray)
             
-            # Convert to RGB for MediaPipe
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            # No landmark face: follow the last face box, re-detecting when the match weakens
+            if box is None:
+                box = tracker.locate(gray)
             
-            # Detect face and landmarks
-            if self.face_mesh:
-                mesh_results = self.face_mesh.process(rgb_frame)
+            if box is not None:
+                result['face_detected'] = True
+                x, y, w, h = box
+                face_roi = gray[y:y+h, x:x+w]
                 
-                if mesh_results.multi_face_landmarks:
-                    result['face_detected'] = True
-                    face_landmarks = mesh_results.multi_face_landmarks[0]
-                    
-                    # Calculate eye contact
-                    result['eye_contact'] = self.calculate_eye_contact(face_landmarks, width, height)
-            
-            # Detect faces for emotion analysis
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            
-            if self.face_cascade is not None:
-                faces = self.face_cascade.detectMultiScale(gray, 1.3, 5)
+                if batcher is not None:
+                    result['deferred'] = True
+                    # Buffers are overwritten by the next frame; the batcher keeps its own copy
+                    batcher.add(face_roi, result)
+                    return result
                 
-                if len(faces) > 0:
-                    result['face_detected'] = True
-                    x, y, w, h = faces[0]
-                    face_roi = gray[y:y+h, x:x+w]
-                    
-                    # Detect emotion
-                    emotion, confidence = self.detect_emotion(face_roi)
-                    result['emotion'] = emotion
-                    result['emotion_confidence'] = confidence
+                # Detect emotion
+                emotion, confidence, probs = self._predict_emotion(face_roi)
+                result['emotion'] = emotion
+                result['emotion_confidence'] = confidence
+                result['emotion_probs'] = probs
             
             return result
             
         except Exception as e:
             return {'face_detected': False, 'emotion': None, 'eye_contact': 0, 'error': str(e)}
     
-    def analyze(self, video_path: str, sample_rate: int = 30) -> Dict:
+    def analyze(self, video_path: str, sample_rate: int = 30, samples_per_second: Optional[float] = None,
+                workers: int = SHARD_WORKERS, cancel: Optional[threading.Event] = None) -> Dict:
         """
         Main analysis method - analyze video for confidence
         
         Args:
             video_path: Path to video file
-            sample_rate: Analyze every Nth frame
+            sample_rate: Analyze every Nth frame (only when samples_per_second is 0)
+            samples_per_second: Frames analyzed per second of video
+                (default CONFIDENCE_SAMPLES_PER_SECOND, see TimeSampler)
+            workers: Processes for long videos (see plan_shards); 1 = analyze the ranges in this process
+            cancel: Set by analysis_pipeline when the node's budget expires; raises AnalysisCancelled
         
         Returns:
             dict: {
@@ -362,48 +610,279 @@ class ConfidenceAnalyzer:
             
             print(f"   📊 Total frames: {total_frames}, FPS: {fps:.1f}, Duration: {duration:.1f}s")
             
-            # Analysis metrics
-            frames_analyzed = 0
-            faces_detected = 0
-            eye_contact_scores = []
-            emotion_counts = {}
-            emotion_confidences = []
-            
-            frame_count = 0
-            
-            while True:
-                ret, frame = cap.read()
-                if not ret:
-                    break
+            if samples_per_second is None:
+                samples_per_second = DEFAULT_SAMPLES_PER_SECOND
+            try:
+                if samples_per_second <= 0:
+                    return self._analyze_frames(self._sample_capture(cap, sample_rate), duration,
+                                                video_path=video_path, cancel=cancel)
                 
-                frame_count += 1
+                shards = plan_shards(probe_duration(video_path, duration), samples_per_second)
+                if len(shards) > 1:
+                    return self._analyze_sharded(video_path, shards, samples_per_second, parallel=workers > 1,
+                                                 cancel=cancel)
                 
-                # Sample frames
-                if frame_count % sample_rate != 0:
+                # Container frame counts/FPS are unreliable (browser webm): trust timestamps
+                sampler = TimeSampler(cap, samples_per_second)
+                result = self._analyze_frames(sampler, None, video_path=video_path, cancel=cancel)
+                print(f"   🎯 Sampled {sampler.samples} frames at {samples_per_second:g}/s "
+                      f"({sampler.mode}, {sampler.grabbed} frames grabbed)")
+                return result
+            finally:
+                cap.release()
+            
+        except AnalysisCancelled:
+            raise
+        except Exception as e:
+            print(f"   ❌ Analysis error: {e}")
+            import traceback
+            traceback.print_exc()
+            return self._error_result(str(e))
+    
+    def _analyze_sharded(self, video_path: str, shards: List[Tuple[float, Optional[float]]],
+                         samples_per_second: float, parallel: bool = True,
+                         cancel: Optional[threading.Event] = None) -> Dict:
+        """
+        Analyze time ranges (in the shard process pool) and score the merged counters
+        
+        Face tracking and adaptive sampling start fresh at each range boundary.
+        If the pool fails, or parallel is False, the same ranges are analyzed
+        one after another in this process, so the result does not depend on
+        whether the pool ran. When cancel is set the pool's processes are
+        killed (they cannot see the event) and AnalysisCancelled is raised.
+        """
+        print(f"   🧩 Sharding into {len(shards)} ranges: "
+              + ", ".join(f"{start:.0f}-{'end' if end is None else f'{end:.0f}'}s" for start, end in shards))
+        parts = None
+        if parallel:
+            try:
+                pool = get_shard_pool(len(shards))
+                futures = [pool.submit(_analyze_shard, video_path, start, end, samples_per_second)
+                           for start, end in shards]
+                pending = set(futures)
+                while pending:
+                    if cancel is not None and cancel.is_set():
+                        print("   🛑 [CONFIDENCE_ANALYZER] Cancelled, stopping the shard processes")
+                        reset_shard_pool(terminate=True)
+                        raise AnalysisCancelled('confidence analysis cancelled')
+                    _, pending = wait(pending, timeout=SHARD_CANCEL_POLL_SECONDS)
+                parts = [future.result() for future in futures]
+            except AnalysisCancelled:
+                raise
+            except Exception as e:
+                print(f"   ⚠️ [CONFIDENCE_ANALYZER] Sharded analysis failed ({e}), analyzing the ranges serially")
+                reset_shard_pool()
+        processes = len(shards) if parts is not None else 1
+        if parts is None:
+            parts = [_analyze_shard(video_path, start, end, samples_per_second, self, cancel) for start, end in shards]
+        
+        stats = ConfidenceStats()
+        stats.timeline = BehaviorTimeline(self.emotion_labels) if TIMELINE_ENABLED else None
+        for part in parts:
+            shard_stats = ConfidenceStats.from_dict(part['stats'])
+            shard_stats.timeline = part.get('timeline')
+            stats.merge(shard_stats)
+        print(f"   🎯 Sampled {sum(p['samples'] for p in parts)} frames at {samples_per_second:g}/s "
+              f"in {len(parts)} ranges, {processes} process(es) ({sum(p['grabbed'] for p in parts)} frames grabbed)")
+        result = self.score_stats(stats)
+        self.save_timeline(stats, video_path)
+        return result
+    
+    def analyze_stream(self, stream, base_stats: Optional[ConfidenceStats] = None,
+                       cancel: Optional[threading.Event] = None) -> Dict:
+        """
+        Analyze frames from a shared media_pipeline.MediaStream
+        
+        The stream is already downsampled to the sampling rate, so every frame
+        it yields is analyzed; the video is not opened again here. base_stats
+        carries counters from earlier parts of the video (incremental uploads).
+        """
+        try:
+            print(f"\n{'='*50}")
+            print(f"😊 [CONFIDENCE_ANALYZER] Starting video analysis (shared decode)...")
+            print(f"{'='*50}")
+            print(f"   🎬 Video: {stream.video_path} → {stream.width}x{stream.height} @ {stream.output_fps:.2f} fps")
+            
+            if cv2 is None:
+                return self._error_result('OpenCV is required for video analysis', 'OpenCV not available')
+            
+            frame_interval = 1.0 / stream.output_fps if stream.output_fps > 0 else 0
+            # Only a decode of the whole file yields a complete timeline
+            whole_file = stream.start_seconds == 0 and stream.duration_seconds is None
+            return self._analyze_frames(stream.frames(), None, frame_interval, base_stats,
+                                        video_path=stream.video_path if whole_file else None, cancel=cancel)
+            
+        except AnalysisCancelled:
+            raise
+        except Exception as e:
+            print(f"   ❌ Analysis error: {e}")
+            import traceback
+            traceback.print_exc()
+            return self._error_result(str(e))
+    
+    @staticmethod
+    def _sample_capture(cap, sample_rate: int):
+        """Yield every Nth frame from an open cv2.VideoCapture"""
+        frame_count = 0
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                return
+            frame_count += 1
+            if frame_count % sample_rate == 0:
+                yield frame
+    
+    @staticmethod
+    def _error_result(error: str, detail: Optional[str] = None) -> Dict:
+        return {
+            'score': 0,
+            'status': 'error',
+            'face_presence': 0,
+            'eye_contact': 0,
+            'emotion_breakdown': {},
+            'analysis_detail': json.dumps({'error': detail or error}),
+            'error': error
+        }
+    
+    def collect_stats(self, frames, stats: Optional[ConfidenceStats] = None,
+                      batch_size: int = EMOTION_BATCH_SIZE, adaptive: bool = ADAPTIVE_SAMPLING,
+                      cancel: Optional[threading.Event] = None) -> ConfidenceStats:
+        """
+        Run per-frame analysis over already-sampled BGR frames into mergeable counters
+        
+        Face crops are classified batch_size at a time (EmotionBatcher); a
+        frame is counted once its emotion is known. One FaceTracker follows
+        the face across the frames so the detector rarely runs. With adaptive
+        sampling (AdaptiveSampler) a frame that looks like the last analyzed
+        one reuses its result, and a TimeSampler source samples more densely
+        while there is motion. Frame results carry the sample timestamp when
+        the source provides one (TimeSampler); it is also the FaceLandmarker's
+        VIDEO-mode timeline. cancel is checked before every frame; once set,
+        AnalysisCancelled is raised.
+        """
+        if stats is None:
+            stats = ConfidenceStats()
+            if TIMELINE_ENABLED:
+                stats.timeline = BehaviorTimeline(self.emotion_labels)
+        batcher = EmotionBatcher(self, batch_size) if self.emotion_model is not None and batch_size > 1 else None
+        tracker = FaceTracker(self.face_cascade)
+        buffers = FrameBuffers()
+        # FaceLandmarker VIDEO mode needs its own timeline per video; FaceMesh is shared
+        landmarks = create_engine(self.face_mesh) if MEDIAPIPE_TASKS_API else self.landmarks
+        sampler = AdaptiveSampler(frames) if adaptive else None
+        last_result = None
+        seen = 0
+        
+        def count(frame_result):
+            # Once for the frame itself, once more for every sample that reused it
+            stats.add_frame(frame_result)
+            for repeat_timestamp, repeat_weight in frame_result.get('repeat_samples', ()):
+                stats.add_frame(dict(frame_result, timestamp=repeat_timestamp, weight=repeat_weight))
+        
+        try:
+            for frame in frames:
+                if cancel is not None and cancel.is_set():
+                    print(f"   🛑 [CONFIDENCE_ANALYZER] Cancelled after {seen} frames")
+                    raise AnalysisCancelled('confidence analysis cancelled')
+                timestamp = getattr(frames, 'last_position', None)
+                seen += 1
+                try:
+                    buffers.prepare(frame, need_rgb=landmarks is not None)
+                except Exception as e:
+                    stats.add_frame({'face_detected': False, 'emotion': None, 'eye_contact': 0, 'error': str(e)})
                     continue
                 
-                frames_analyzed += 1
-                
-                # Analyze frame
-                frame_result = self.analyze_frame(frame)
-                
-                if frame_result['face_detected']:
-                    faces_detected += 1
-                    
-                    # Track emotions
-                    emotion = frame_result.get('emotion')
-                    if emotion:
-                        emotion_counts[emotion] = emotion_counts.get(emotion, 0) + 1
-                        emotion_confidences.append(frame_result.get('emotion_confidence', 0))
-                    
-                    # Track eye contact
-                    eye_contact_scores.append(frame_result.get('eye_contact', 0))
+                # The first frame is always analyzed; later ones only when they differ from the last analyzed one
+                if sampler is not None and not sampler.should_analyze(buffers.gray, timestamp):
+                    if last_result.get('deferred') and last_result.get('emotion') is None:
+                        # Counted when its emotion arrives
+                        last_result.setdefault('repeat_samples', []).append((timestamp, sampler.weight))
+                    else:
+                        stats.add_frame(dict(last_result, timestamp=timestamp, weight=sampler.weight))
+                else:
+                    frame_result = self._analyze_prepared(buffers, batcher, tracker, landmarks, timestamp)
+                    frame_result['timestamp'] = timestamp
+                    if sampler is not None:
+                        frame_result['weight'] = sampler.weight  # < 1 for motion-burst samples
+                    last_result = frame_result
+                    if not frame_result.get('deferred'):
+                        stats.add_frame(frame_result)
+                if batcher is not None:
+                    for completed in batcher.take():
+                        count(completed)
                 
                 # Progress indicator
-                if frames_analyzed % 50 == 0:
-                    print(f"   📹 Analyzed {frames_analyzed} frames...")
+                if seen % 50 == 0:
+                    print(f"   📹 Analyzed {seen} frames...")
+        finally:
+            if landmarks is not None and landmarks is not self.landmarks:
+                landmarks.close()
+        
+        if batcher is not None:
+            batcher.flush()
+            for completed in batcher.take():
+                count(completed)
+            if batcher.batches:
+                print(f"   🧠 Emotion model: {batcher.batches} batched calls for {stats.faces_detected} faces")
+        if sampler is not None and seen:
+            print(f"   ♻️ Adaptive sampling: {sampler.stats['analyzed']} of {seen} frames analyzed, "
+                  f"{sampler.stats['reused']} reused ({sampler.stats['capped']} over the per-minute cap), "
+                  f"{sampler.stats['bursts']} motion bursts")
+        if seen:
+            print(f"   👤 Face tracking: {tracker.stats['detections']} detections, "
+                  f"{tracker.stats['tracked']} tracked frames, {tracker.stats['lost']} re-detections")
+        return stats
+    
+    def _analyze_frames(self, frames, duration: Optional[float], frame_interval: float = 0,
+                        base_stats: Optional[ConfidenceStats] = None, video_path: Optional[str] = None,
+                        cancel: Optional[threading.Event] = None) -> Dict:
+        """
+        Score an iterable of already-sampled BGR frames
+        
+        duration=None takes it from the frame source (TimeSampler.duration) or
+        derives it from the number of frames and frame_interval.
+        base_stats (e.g. from incremental processing) are merged before scoring.
+        With video_path the per-sample timeline is saved next to the video.
+        """
+        try:
+            stats = self.collect_stats(frames, cancel=cancel)
+            if duration is None:
+                duration = getattr(frames, 'duration', None)
+            stats.duration = duration if duration is not None else stats.frames_analyzed * frame_interval
+            if base_stats is not None:
+                stats.merge(base_stats)
+            result = self.score_stats(stats)
+            if video_path:
+                self.save_timeline(stats, video_path)
+            return result
             
-            cap.release()
+        except AnalysisCancelled:
+            raise
+        except Exception as e:
+            print(f"   ❌ Analysis error: {e}")
+            import traceback
+            traceback.print_exc()
+            return self._error_result(str(e))
+    
+    @staticmethod
+    def save_timeline(stats: ConfidenceStats, video_path: str):
+        """Store the per-sample rows for re-scoring (behavior_timeline.rescore_interviews)"""
+        if stats.timeline is None or not len(stats.timeline):
+            return
+        try:
+            path = timeline_path(video_path)
+            stats.timeline.save(path)
+            print(f"   💾 Timeline: {len(stats.timeline)} samples → {os.path.basename(path)}")
+        except Exception as e:
+            print(f"   ⚠️ [CONFIDENCE_ANALYZER] Could not save timeline: {e}")
+    
+    def score_stats(self, stats: ConfidenceStats) -> Dict:
+        """Turn (possibly merged) frame counters into the confidence result"""
+        try:
+            duration = stats.duration
+            frames_analyzed = stats.frames_analyzed
+            faces_detected = stats.faces_detected
+            emotion_counts = stats.emotion_counts
             
             if frames_analyzed == 0:
                 return {
@@ -416,9 +895,9 @@ class ConfidenceAnalyzer:
                     'error': 'Could not analyze any frames'
                 }
             
-            # Calculate metrics
-            face_presence = (faces_detected / frames_analyzed) * 100
-            avg_eye_contact = sum(eye_contact_scores) / len(eye_contact_scores) if eye_contact_scores else 0
+            # Calculate metrics (weighted, so motion-burst samples count for the time they cover)
+            face_presence = (stats.face_weight / stats.sample_weight) * 100 if stats.sample_weight else 0
+            avg_eye_contact = stats.eye_contact_sum / stats.eye_contact_count if stats.eye_contact_count else 0
             
             # Emotion breakdown
             total_emotions = sum(emotion_counts.values())
@@ -430,19 +909,21 @@ class ConfidenceAnalyzer:
             negative_emotion_score = sum(emotion_breakdown.get(e, 0) for e in self.negative_emotions)
             
             # Weighted confidence score
-            emotion_score = positive_emotion_score - (negative_emotion_score * 0.5)
+            # (CONFIDENCE_WEIGHTS is shared with behavior_timeline.score_many for re-scoring)
+            weights = CONFIDENCE_WEIGHTS
+            emotion_score = positive_emotion_score - (negative_emotion_score * weights['negative_penalty'])
             emotion_score = max(0, min(100, emotion_score))
             
             # Final confidence score
             confidence_score = (
-                face_presence * 0.25 +        # Being present
-                avg_eye_contact * 0.35 +       # Eye contact
-                emotion_score * 0.40           # Positive emotions
+                face_presence * weights['presence'] +           # Being present
+                avg_eye_contact * weights['eye_contact'] +      # Eye contact
+                emotion_score * weights['emotion']              # Positive emotions
             )
             
             # Ensure non-zero if face was detected
-            if faces_detected > 0 and confidence_score < 20:
-                confidence_score = max(20, confidence_score)
+            if faces_detected > 0 and confidence_score < weights['floor']:
+                confidence_score = max(weights['floor'], confidence_score)
             
             print(f"\n   ✅ Frames analyzed: {frames_analyzed}")
             print(f"   ✅ Face presence: {face_presence:.1f}%")
@@ -459,6 +940,9 @@ class ConfidenceAnalyzer:
                 'model_loaded': self.emotion_model is not None,
                 'mediapipe_available': MEDIAPIPE_AVAILABLE
             }
+            if stats.head_pose_count:
+                analysis_detail['avg_head_yaw'] = round(stats.head_yaw_sum / stats.head_pose_count, 2)
+                analysis_detail['avg_head_pitch'] = round(stats.head_pitch_sum / stats.head_pose_count, 2)
             
             print(f"\n{'='*50}")
             print(f"✅ [CONFIDENCE_ANALYZER] Analysis complete!")
@@ -491,36 +975,328 @@ class ConfidenceAnalyzer:
 
 
 # Singleton instance
+class AnalyzerPool:
+    """
+    Bounded set of ConfidenceAnalyzer instances, one per concurrent analysis
+    
+    An analyzer is not safe to share between threads: the streaming FaceMesh
+    keeps tracking state between process() calls, and Keras models are not
+    re-entrant. checkout() hands each analysis its own instance, creating
+    up to size of them on demand (each loads its own models); further
+    callers wait until one is returned. Idle instances are reused
+    most-recently-returned first, so a lightly loaded process keeps one warm.
+    """
+    
+    def __init__(self, size: int = ANALYZER_POOL_SIZE, factory=None):
+        self.size = max(1, size)
+        self.factory = factory or ConfidenceAnalyzer
+        self.idle: List[ConfidenceAnalyzer] = []
+        self.created = 0
+        self.cond = threading.Condition()
+        self.stats = {'checkouts': 0, 'waits': 0, 'max_in_use': 0}
+    
+    @property
+    def in_use(self) -> int:
+        return self.created - len(self.idle)
+    
+    def _acquire(self, timeout: Optional[float]) -> 'ConfidenceAnalyzer':
+        with self.cond:
+            if not self.idle and self.created >= self.size:
+                self.stats['waits'] += 1
+                if not self.cond.wait_for(lambda: self.idle or self.created < self.size, timeout):
+                    raise TimeoutError(f'No confidence analyzer free after {timeout}s ({self.size} in use)')
+            self.stats['checkouts'] += 1
+            if self.idle:
+                analyzer = self.idle.pop()
+                self.stats['max_in_use'] = max(self.stats['max_in_use'], self.in_use)
+                return analyzer
+            self.created += 1
+            self.stats['max_in_use'] = max(self.stats['max_in_use'], self.in_use)
+        try:
+            # Outside the lock: loading the models takes a while
+            return self.factory()
+        except Exception:
+            with self.cond:
+                self.created -= 1
+                self.cond.notify()
+            raise
+    
+    def _release(self, analyzer: 'ConfidenceAnalyzer'):
+        with self.cond:
+            self.idle.append(analyzer)
+            self.cond.notify()
+    
+    @contextmanager
+    def checkout(self, timeout: Optional[float] = None):
+        """with pool.checkout() as analyzer: ... - the analyzer is exclusive inside the block"""
+        analyzer = self._acquire(timeout)
+        try:
+            yield analyzer
+        finally:
+            self._release(analyzer)
+    
+    def get_stats(self) -> Dict:
+        with self.cond:
+            return dict(self.stats, size=self.size, created=self.created, in_use=self.in_use)
+
+
 _analyzer_instance = None
+_analyzer_lock = threading.Lock()
+_analyzer_pool = None
+
 
 def get_analyzer():
-    """Get or create singleton analyzer instance"""
+    """
+    Get or create singleton analyzer instance
+    
+    For single-threaded callers (scripts, shard processes). Concurrent
+    analyses must use get_analyzer_pool().checkout().
+    """
     global _analyzer_instance
     if _analyzer_instance is None:
-        _analyzer_instance = ConfidenceAnalyzer()
+        with _analyzer_lock:
+            if _analyzer_instance is None:
+                _analyzer_instance = ConfidenceAnalyzer()
     return _analyzer_instance
 
 
-def analyze_confidence(video_path: str, sample_rate: int = 30) -> Dict:
+def get_analyzer_pool() -> AnalyzerPool:
+    """Process-wide analyzer pool (size from CONFIDENCE_ANALYZER_POOL_SIZE)"""
+    global _analyzer_pool
+    if _analyzer_pool is None:
+        with _analyzer_lock:
+            if _analyzer_pool is None:
+                _analyzer_pool = AnalyzerPool(ANALYZER_POOL_SIZE)
+    return _analyzer_pool
+
+
+def analysis_settings(samples_per_second: Optional[float] = None) -> Dict:
+    """
+    Everything besides the video that changes the confidence result
+    
+    Part of the confidence checkpoint hash (analysis_checkpoints.stage_hashes),
+    so a stored result is not reused after sampling, tracking or landmark
+    settings change.
+    """
+    return {
+        'samples_per_second': DEFAULT_SAMPLES_PER_SECOND if samples_per_second is None else samples_per_second,
+        'adaptive': adaptive_sampler.ADAPTIVE_SAMPLING and [
+            adaptive_sampler.DEDUP_DISTANCE, adaptive_sampler.MOTION_DISTANCE,
+            adaptive_sampler.BURST_SAMPLES_PER_SECOND, adaptive_sampler.BURST_SECONDS,
+            adaptive_sampler.MAX_FRAMES_PER_MINUTE, adaptive_sampler.REFRESH_SECONDS
+        ],
+        'tracking': [face_tracker.DETECTION_WIDTH, face_tracker.REDETECT_EVERY, face_tracker.MIN_TRACK_SCORE,
+                     face_tracker.LANDMARK_BOX_SCALE],
+        # Range boundaries reset tracking and adaptive sampling
+        'shards': [SHARD_WORKERS, MIN_SHARD_SECONDS],
+        'landmarks': 'tasks' if MEDIAPIPE_TASKS_API else ('solutions' if MEDIAPIPE_AVAILABLE else None)
+    }
+
+
+def probe_duration(video_path: str, fallback: float = 0.0) -> float:
+    """Container duration (ffprobe when available; browser webm headers often lack frame counts)"""
+    try:
+        import media_pipeline
+        if media_pipeline.find_ffmpeg() is not None:
+            duration = media_pipeline.probe(video_path).get('duration') or 0.0
+            if duration > 0:
+                return duration
+    except Exception as e:
+        print(f"   ⚠️ [CONFIDENCE_ANALYZER] Could not probe duration: {e}")
+    return fallback if fallback and fallback > 0 else 0.0
+
+
+def plan_shards(duration: float, samples_per_second: float, workers: int = SHARD_WORKERS,
+                min_seconds: float = MIN_SHARD_SECONDS) -> List[Tuple[float, Optional[float]]]:
+    """
+    Time ranges [(start, end), ...] for parallel analysis; one range means serial
+    
+    Each range is at least min_seconds long, so short interviews don't pay
+    for process hand-off. Boundaries sit on the sampling grid (multiples of
+    1 / samples_per_second) so the shards sample the same frames as one pass;
+    the last range is open-ended in case the container under-reports.
+    """
+    if workers <= 1 or not duration or samples_per_second <= 0:
+        return [(0.0, None)]
+    count = min(workers, int(duration // min_seconds))
+    if count <= 1:
+        return [(0.0, None)]
+    interval = 1.0 / samples_per_second
+    bounds = [round(duration * i / count / interval) * interval for i in range(1, count)]
+    return list(zip([0.0] + bounds, bounds + [None]))
+
+
+def _analyze_shard(video_path: str, start: float, end: Optional[float], samples_per_second: float,
+                   analyzer: Optional['ConfidenceAnalyzer'] = None, cancel: Optional[threading.Event] = None) -> Dict:
+    """
+    One time range, run inside a shard process (or by analyzer, in this process)
+    
+    Each process has its own analyzer (FaceMesh, cascade, emotion model),
+    created on its first shard and reused for later ones. cancel only works
+    in this process; shard processes are terminated instead.
+    """
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise RuntimeError(f'Could not open {video_path}')
+    try:
+        sampler = TimeSampler(cap, samples_per_second, start=start, end=end)
+        stats = (analyzer or get_analyzer()).collect_stats(sampler, cancel=cancel)
+        # Durations are summed on merge: a shard covers its whole range unless the video ended inside it
+        covered = end if sampler.reached_end else sampler.duration
+        stats.duration = max(0.0, covered - start) if sampler.samples else 0.0
+        return {'stats': stats.to_dict(), 'timeline': stats.timeline,
+                'samples': sampler.samples, 'grabbed': sampler.grabbed}
+    finally:
+        cap.release()
+
+
+_shard_pool = None
+_shard_pool_lock = threading.Lock()
+
+
+def get_shard_pool(workers: int = SHARD_WORKERS) -> ProcessPoolExecutor:
+    """
+    Process pool shared by all analyses in this process (workers kept warm)
+    
+    Spawned rather than forked: the app and queue worker run threads
+    (ffmpeg readers, the LLM scheduler) that must not be copied mid-flight.
+    """
+    global _shard_pool
+    if _shard_pool is None:
+        with _shard_pool_lock:
+            if _shard_pool is None:
+                size = max(workers, SHARD_WORKERS, 1)
+                _shard_pool = ProcessPoolExecutor(max_workers=size, mp_context=multiprocessing.get_context('spawn'))
+                print(f"[CONFIDENCE_ANALYZER] Shard pool started with {size} processes")
+    return _shard_pool
+
+
+def reset_shard_pool(terminate: bool = False):
+    """
+    Drop a broken pool (e.g. a worker was OOM-killed); the next call starts a new one
+    
+    terminate=True also kills the worker processes mid-shard (a cancelled
+    analysis). Other analyses sharing the pool then fail over to serial.
+    """
+    global _shard_pool
+    with _shard_pool_lock:
+        pool, _shard_pool = _shard_pool, None
+    if pool is not None:
+        # ProcessPoolExecutor has no public way to stop running tasks before Python 3.14
+        processes = list((getattr(pool, '_processes', None) or {}).values()) if terminate else []
+        pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+
+
+def analyze_confidence(video_path: str, sample_rate: int = 30, samples_per_second: Optional[float] = None,
+                       cancel: Optional[threading.Event] = None) -> Dict:
     """
     Convenience function for confidence analysis
     
     Args:
         video_path: Path to video file
-        sample_rate: Analyze every Nth frame
+        sample_rate: Analyze every Nth frame (legacy mode, samples_per_second=0)
+        samples_per_second: Frames analyzed per second of video (default CONFIDENCE_SAMPLES_PER_SECOND)
+        cancel: Event that stops the analysis early (AnalysisCancelled), see analysis_pipeline
     
     Returns:
         dict with 'score', 'status', 'face_presence', 'eye_contact', 'emotion_breakdown', 'error'
     """
-    analyzer = get_analyzer()
-    return analyzer.analyze(video_path, sample_rate)
+    with get_analyzer_pool().checkout() as analyzer:
+        return analyzer.analyze(video_path, sample_rate, samples_per_second, cancel=cancel)
+
+
+def analyze_confidence_stream(stream, base_stats: Optional[ConfidenceStats] = None,
+                              cancel: Optional[threading.Event] = None) -> Dict:
+    """
+    Convenience function for confidence analysis on a shared MediaStream
+    (media_pipeline.py), so the video is decoded once for audio and frames.
+    base_stats are counters for earlier parts of the video (incremental uploads).
+    """
+    with get_analyzer_pool().checkout() as analyzer:
+        return analyzer.analyze_stream(stream, base_stats, cancel=cancel)
 
 
 if __name__ == "__main__":
+    import sys
+    
     print("Confidence Analyzer Module - Test")
     print("="*50)
     print(f"OpenCV Available: {cv2 is not None}")
     print(f"MediaPipe Available: {MEDIAPIPE_AVAILABLE}")
-    print(f"TensorFlow Available: {_load_tensorflow()}")
     print(f"Emotion Model Exists: {os.path.exists(MODEL_PATH)}")
+    
+    demo = get_analyzer()
+    print(f"Emotion Backend: {backend_name(demo.emotion_model)}")
+    if demo.emotion_model is not None and np is not None:
+        import time
+        crops = [np.random.randint(0, 255, (96, 96), dtype=np.uint8) for _ in range(256)]
+        started = time.perf_counter()
+        for crop in crops:
+            demo.detect_emotion(crop)
+        single = time.perf_counter() - started
+        batcher = EmotionBatcher(demo)
+        started = time.perf_counter()
+        for crop in crops:
+            batcher.add(crop, {})
+        batcher.flush()
+        batched = time.perf_counter() - started
+        print(f"Emotion inference on {len(crops)} faces: {single:.2f}s one-by-one, "
+              f"{batched:.2f}s in batches of {EMOTION_BATCH_SIZE} ({single / batched:.1f}x)")
+    
+    if '--stress' in sys.argv:
+        # python confidence_analyzer.py --stress [threads] [analyses]
+        # Concurrent analyses through the pool must match a serial run exactly
+        import time
+        import tempfile
+        from concurrent.futures import ThreadPoolExecutor
+        args = sys.argv[sys.argv.index('--stress') + 1:]
+        threads = int(args[0]) if len(args) > 0 else 8
+        analyses = int(args[1]) if len(args) > 1 else 16
+        
+        def draw_face(frame, cx, cy, size):
+            """Flat cartoon face the Haar cascade detects: skin oval, dark eyes and brows, nose, mouth"""
+            cv2.ellipse(frame, (cx, cy), (int(size * 0.40), int(size * 0.52)), 0, 0, 360, (150, 170, 205), -1)
+            for side in (-1, 1):
+                ex, ey = cx + side * int(size * 0.17), cy - int(size * 0.07)
+                cv2.ellipse(frame, (ex, ey), (int(size * 0.11), int(size * 0.06)), 0, 0, 360, (50, 50, 60), -1)
+                cv2.ellipse(frame, (ex, ey - int(size * 0.1)), (int(size * 0.11), int(size * 0.03)), 0, 0, 360,
+                            (60, 60, 70), -1)
+            cv2.ellipse(frame, (cx, cy + int(size * 0.12)), (int(size * 0.06), int(size * 0.03)), 0, 0, 360,
+                        (110, 125, 160), -1)
+            cv2.ellipse(frame, (cx, cy + int(size * 0.27)), (int(size * 0.15), int(size * 0.045)), 0, 0, 360,
+                        (60, 60, 120), -1)
+        
+        # A face drifting over a moving, noisy background: detection, tracking and adaptive
+        # sampling all have work to do (a clip without a face scores 0 everywhere)
+        video_path = os.path.join(tempfile.mkdtemp(prefix='confidence_stress_'), 'stress.avi')
+        writer = cv2.VideoWriter(video_path, cv2.VideoWriter_fourcc(*'MJPG'), 30, (320, 240))
+        rng = np.random.default_rng(0)
+        background = (60 + rng.random((240, 320, 3)) * 50).astype(np.uint8)
+        for i in range(20 * 30):
+            frame = np.roll(background, (i // 15) * 4, axis=1).copy()
+            if (i // 30) % 10 != 9:  # Candidate looks away for one second in ten
+                draw_face(frame, 160 + int(30 * np.sin(i / 45)), 125, 120)
+            writer.write(frame)
+        writer.release()
+        
+        keys = ('score', 'face_presence', 'eye_contact', 'emotion_breakdown', 'analysis_detail')
+        reference = analyze_confidence(video_path)
+        if not reference.get('face_presence'):
+            os.remove(video_path)
+            print(f"\nNo face detected in the synthetic clip ({reference.get('error') or 'face_presence 0'}); "
+                  f"comparing all-zero results would prove nothing")
+            sys.exit(1)
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            results = list(executor.map(lambda _: analyze_confidence(video_path), range(analyses)))
+        elapsed = time.perf_counter() - started
+        mismatched = sum(1 for r in results if any(r.get(k) != reference.get(k) for k in keys))
+        pool_stats = get_analyzer_pool().get_stats()
+        os.remove(video_path)
+        print(f"\n{analyses} analyses on {threads} threads in {elapsed:.2f}s; pool {pool_stats}")
+        print(f"{'All results match the serial run' if not mismatched else f'{mismatched} results differ from the serial run'}")
+        if mismatched or pool_stats['max_in_use'] > pool_stats['size']:
+            sys.exit(1)
     print("\nModule loaded successfully.")
@@ -39,14 +39,52 @@ class Config:
     # AI/ML API Keys
     GROQ_API_KEY = os.environ.get('GROQ_API_KEY') or 'your-groq-api-key'
     # Using llama-3.3-70b-versatile (llama3-70b-8192 was decommissioned)
-    GROQ_MODEL = 'llama-3.3-70b-versatile'
+    # Used by every LLM call (the default model of llm_gateway.get_gateway)
+    GROQ_MODEL = os.environ.get('GROQ_MODEL') or 'llama-3.3-70b-versatile'
+    # Endpoint, timeouts, rate limits, retries/circuit breaker and the response cache are read from the
+    # environment (GROQ_BASE_URL, LLM_*) by llm_gateway.py, llm_scheduler.py, llm_breaker.py and
+    # llm_cache.py, which also hold the defaults; KNOWLEDGE_BATCH_EVALUATION by answer_analyzer.py
     
     # Interview Settings
     SHORTLIST_THRESHOLD = 70  # Minimum resume score to shortlist
     QUESTIONS_PER_INTERVIEW = 10
     OTP_EXPIRY_HOURS = 48
     MAX_ANSWER_TIME_SECONDS = 120  # 2 minutes per question
-    
+
+    # Analysis Queue Settings (background workers - see worker.py)
+    # When disabled, interviews are analyzed inline in the upload request
+    ANALYSIS_QUEUE_ENABLED = os.environ.get('ANALYSIS_QUEUE_ENABLED', 'true').lower() == 'true'
+    ANALYSIS_JOB_MAX_ATTEMPTS = int(os.environ.get('ANALYSIS_JOB_MAX_ATTEMPTS') or 3)
+    ANALYSIS_LEASE_SECONDS = int(os.environ.get('ANALYSIS_LEASE_SECONDS') or 120)  # Renewed by heartbeat
+    ANALYSIS_RETRY_BASE_SECONDS = int(os.environ.get('ANALYSIS_RETRY_BASE_SECONDS') or 30)  # Doubles per attempt
+    ANALYSIS_WORKER_POLL_SECONDS = float(os.environ.get('ANALYSIS_WORKER_POLL_SECONDS') or 2)
+    # Incremental processing of chunked uploads (incremental_analysis.py)
+    ANALYSIS_PARTIAL_WINDOW_SECONDS = int(os.environ.get('ANALYSIS_PARTIAL_WINDOW_SECONDS') or 30)
+    ANALYSIS_PARTIAL_SAFETY_SECONDS = int(os.environ.get('ANALYSIS_PARTIAL_SAFETY_SECONDS') or 3)  # Newest data may be an incomplete cluster
+    # Progress for completed.html / HR pages (/api/analysis-status/<id>[/stream]); updates come less often
+    # while the job waits in the queue, and the HR page stops if it stays queued this long
+    ANALYSIS_PROGRESS_POLL_SECONDS = float(os.environ.get('ANALYSIS_PROGRESS_POLL_SECONDS') or 3)
+    ANALYSIS_PROGRESS_QUEUED_POLL_SECONDS = float(os.environ.get('ANALYSIS_PROGRESS_QUEUED_POLL_SECONDS') or 15)
+    ANALYSIS_PROGRESS_STREAM_SECONDS = int(os.environ.get('ANALYSIS_PROGRESS_STREAM_SECONDS') or 20)  # Client reconnects after
+    ANALYSIS_PROGRESS_HR_QUEUED_TIMEOUT_SECONDS = int(os.environ.get('ANALYSIS_PROGRESS_HR_QUEUED_TIMEOUT_SECONDS') or 300)
+    # Threads per interview for the pillar DAG (analysis_pipeline.py); None = one per node
+    ANALYSIS_PIPELINE_WORKERS = int(os.environ['ANALYSIS_PIPELINE_WORKERS']) if os.environ.get('ANALYSIS_PIPELINE_WORKERS') else None
+    # Video analysis tuning (CONFIDENCE_*, EMOTION_*) is read from the environment, with its defaults, by
+    # confidence_analyzer.py, face_tracker.py, adaptive_sampler.py, behavior_timeline.py and emotion_runtime.py
+    # Latency budgets (seconds) - a stage past its budget is scored as timed out and the
+    # overall score is renormalized over the pillars that finished (0 = no limit)
+    ANALYSIS_SLO_SECONDS = int(os.environ.get('ANALYSIS_SLO_SECONDS') or 900)
+    ANALYSIS_STAGE_BUDGETS = {
+        'media': int(os.environ.get('ANALYSIS_BUDGET_MEDIA_SECONDS') or 60),
+        'audio': int(os.environ.get('ANALYSIS_BUDGET_AUDIO_SECONDS') or 180),
+        'transcript': int(os.environ.get('ANALYSIS_BUDGET_TRANSCRIPT_SECONDS') or 480),
+        'confidence': int(os.environ.get('ANALYSIS_BUDGET_CONFIDENCE_SECONDS') or 480),
+        'communication': int(os.environ.get('ANALYSIS_BUDGET_COMMUNICATION_SECONDS') or 60),
+        'knowledge': int(os.environ.get('ANALYSIS_BUDGET_KNOWLEDGE_SECONDS') or 240),
+    }
+    # Reuse stage outputs on re-analysis while the video/questions are unchanged (analysis_checkpoints.py)
+    ANALYSIS_CHECKPOINTS_ENABLED = os.environ.get('ANALYSIS_CHECKPOINTS_ENABLED', 'true').lower() == 'true'
+
     # Session Settings
     PERMANENT_SESSION_LIFETIME = timedelta(hours=24)
     
@@ -0,0 +1,165 @@
+"""
+Convert Emotion Model
+Exports emotion_model.h5 to ONNX (and optionally int8) for emotion_runtime.py
+Handles: Keras → ONNX export, Static int8 quantization, Accuracy parity check against Keras
+
+Needs the conversion-only packages (not required at runtime):
+
+    pip install tensorflow-cpu tf2onnx onnx onnxruntime
+
+Usage:
+
+    python convert_emotion_model.py                                  # emotion_model.onnx
+    python convert_emotion_model.py --int8 --calibration-dir faces/  # + emotion_model.int8.onnx
+    python convert_emotion_model.py --check-only --calibration-dir faces/
+
+Calibration/parity inputs are face crops (any size, colour or grayscale) in
+--calibration-dir; without one, random images are used, which is enough to
+catch a broken export but not representative for int8 calibration. The
+script exits non-zero if a converted model's top-1 agreement with Keras is
+below the threshold.
+"""
+import os
+import sys
+import argparse
+
+import numpy as np
+
+import emotion_runtime
+
+
+def load_samples(directory: str, height: int, width: int, limit: int):
+    """(N, H, W, 1) float32 inputs, preprocessed exactly like ConfidenceAnalyzer"""
+    if directory:
+        import cv2
+        names = sorted(n for n in os.listdir(directory) if n.lower().endswith(('.png', '.jpg', '.jpeg', '.bmp')))
+        samples = []
+        for name in names[:limit]:
+            image = cv2.imread(os.path.join(directory, name), cv2.IMREAD_GRAYSCALE)
+            if image is not None:
+                samples.append(cv2.resize(image, (width, height)).astype(np.float32) / 255.0)
+        if samples:
+            print(f"[CONVERT] {len(samples)} calibration faces from {directory}")
+            return np.stack(samples)[..., np.newaxis]
+        print(f"[CONVERT] No images found in {directory}")
+    print("[CONVERT] Using random inputs (pass --calibration-dir for representative int8 calibration)")
+    rng = np.random.default_rng(0)
+    return rng.random((limit, height, width, 1), dtype=np.float32)
+
+
+def export_onnx(model, output_path: str, opset: int):
+    import tensorflow as tf
+    import tf2onnx
+
+    _, height, width, channels = model.input_shape
+    spec = [tf.TensorSpec((None, height, width, channels), tf.float32, name='input')]
+    tf2onnx.convert.from_keras(model, input_signature=spec, opset=opset, output_path=output_path)
+    print(f"[CONVERT] Wrote {output_path} ({os.path.getsize(output_path) / 1024:.0f} KB)")
+
+
+class _CalibrationReader:
+    """Feeds calibration faces to onnxruntime's static quantizer one batch at a time"""
+
+    def __init__(self, input_name: str, samples, batch_size: int = 16):
+        self.batches = iter([{input_name: samples[i:i + batch_size]} for i in range(0, len(samples), batch_size)])
+
+    def get_next(self):
+        return next(self.batches, None)
+
+
+def quantize_int8(onnx_path: str, output_path: str, samples):
+    import onnxruntime
+    from onnxruntime.quantization import quantize_static, QuantFormat, QuantType, CalibrationDataReader
+
+    reader_class = type('CalibrationReader', (_CalibrationReader, CalibrationDataReader), {})
+    input_name = onnxruntime.InferenceSession(onnx_path, providers=['CPUExecutionProvider']).get_inputs()[0].name
+    source = onnx_path
+    try:
+        # Shape inference + graph cleanup before quantization (recommended by onnxruntime)
+        from onnxruntime.quantization.shape_inference import quant_pre_process
+        source = onnx_path.replace('.onnx', '.pre.onnx')
+        quant_pre_process(onnx_path, source)
+    except Exception as e:
+        print(f"[CONVERT] Skipping pre-processing: {e}")
+        source = onnx_path
+    try:
+        quantize_static(source, output_path, reader_class(input_name, samples),
+                        quant_format=QuantFormat.QDQ, per_channel=True,
+                        activation_type=QuantType.QUInt8, weight_type=QuantType.QInt8)
+    finally:
+        if source != onnx_path and os.path.exists(source):
+            os.remove(source)
+    print(f"[CONVERT] Wrote {output_path} ({os.path.getsize(output_path) / 1024:.0f} KB)")
+
+
+def parity(reference, candidate) -> dict:
+    """Top-1 agreement and largest probability difference vs. the Keras outputs"""
+    reference = np.asarray(reference).reshape(len(reference), -1)
+    candidate = np.asarray(candidate).reshape(len(candidate), -1)
+    return {
+        'top1_agreement': float(np.mean(reference.argmax(1) == candidate.argmax(1))),
+        'max_abs_diff': float(np.max(np.abs(reference - candidate))),
+        'mean_abs_diff': float(np.mean(np.abs(reference - candidate)))
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Convert emotion_model.h5 for the TensorFlow-free runtime')
+    parser.add_argument('--keras', default=emotion_runtime.KERAS_MODEL_PATH, help='Source Keras model')
+    parser.add_argument('--output', default=emotion_runtime.ONNX_MODEL_PATH, help='ONNX output path')
+    parser.add_argument('--int8', action='store_true', help='Also write a statically quantized int8 model')
+    parser.add_argument('--int8-output', default=emotion_runtime.ONNX_INT8_MODEL_PATH)
+    parser.add_argument('--calibration-dir', default=None, help='Face crops for calibration and parity')
+    parser.add_argument('--samples', type=int, default=500, help='Max calibration/parity inputs')
+    parser.add_argument('--opset', type=int, default=13)
+    parser.add_argument('--check-only', action='store_true', help='Only compare existing ONNX files with Keras')
+    parser.add_argument('--min-agreement', type=float, default=0.99, help='Required top-1 agreement (fp32)')
+    parser.add_argument('--min-agreement-int8', type=float, default=0.95, help='Required top-1 agreement (int8)')
+    args = parser.parse_args(argv)
+
+    keras_model = emotion_runtime._load_keras(args.keras)
+    if keras_model is None:
+        print(f"[CONVERT] Could not load {args.keras} with TensorFlow")
+        return 2
+    _, height, width, _ = keras_model.input_shape
+    samples = load_samples(args.calibration_dir, height, width, args.samples)
+
+    if not args.check_only:
+        export_onnx(keras_model, args.output, args.opset)
+        if args.int8:
+            quantize_int8(args.output, args.int8_output, samples)
+
+    reference = keras_model.predict(samples, batch_size=64, verbose=0)
+    checks = [(args.output, args.min_agreement)]
+    if args.int8 or (args.check_only and os.path.exists(args.int8_output)):
+        checks.append((args.int8_output, args.min_agreement_int8))
+
+    failed = False
+    print(f"\n{'model':<28} {'backend':<12} {'top-1':>7} {'max diff':>9} {'mean diff':>10}")
+    for path, threshold in checks:
+        if not os.path.exists(path):
+            print(f"{os.path.basename(path):<28} missing")
+            failed = True
+            continue
+        for backend_class in (emotion_runtime.OnnxRuntimeEmotionModel, emotion_runtime.OpenCVEmotionModel):
+            try:
+                runtime_model = backend_class(path)
+                result = parity(reference, runtime_model.predict_on_batch(samples))
+            except Exception as e:
+                print(f"{os.path.basename(path):<28} {backend_class.backend:<12} unavailable ({e})")
+                continue
+            ok = result['top1_agreement'] >= threshold
+            failed = failed or not ok
+            print(f"{os.path.basename(path):<28} {backend_class.backend:<12} {result['top1_agreement']:>7.2%} "
+                  f"{result['max_abs_diff']:>9.4f} {result['mean_abs_diff']:>10.5f}{'' if ok else '  FAIL'}")
+
+    if failed:
+        print("\n[CONVERT] Parity check failed - keep EMOTION_BACKEND=keras until resolved")
+        return 1
+    print("\n[CONVERT] Parity check passed - set EMOTION_BACKEND=onnxruntime (or opencv), "
+          "EMOTION_QUANTIZED=true for int8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""
+Emotion Runtime Module
+Runs the emotion classifier without importing TensorFlow
+Handles: ONNX Runtime backend, OpenCV DNN backend, Optional int8 model, Keras fallback
+
+confidence_analyzer.py only needs forward passes of the small
+emotion_model.h5 CNN, but loading it through Keras imports all of
+TensorFlow (hundreds of MB per worker, seconds of cold start). Convert the
+model once with convert_emotion_model.py and this module serves it through
+ONNX Runtime or cv2.dnn instead:
+
+    python convert_emotion_model.py --int8 --calibration-dir samples/faces/
+
+Backend choice comes from the EMOTION_BACKEND environment variable:
+auto | onnxruntime | opencv | keras. "auto" uses the ONNX file when one
+exists (ONNX Runtime, else OpenCV) and falls back to Keras.
+EMOTION_QUANTIZED=true selects emotion_model.int8.onnx.
+
+Every backend exposes what ConfidenceAnalyzer uses from a Keras model:
+input_shape, predict(x, verbose=0) and predict_on_batch(x), with x a
+float32 (N, H, W, 1) array scaled to 0..1.
+"""
+import os
+from typing import Optional
+
+np = None
+try:
+    import numpy as np_module
+    np = np_module
+except ImportError:
+    print("[EMOTION_RUNTIME] NumPy not available")
+
+cv2 = None
+try:
+    import cv2 as cv2_module
+    cv2 = cv2_module
+except ImportError:
+    pass
+
+ort = None
+try:
+    import onnxruntime as ort_module
+    ort = ort_module
+except ImportError:
+    pass
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+KERAS_MODEL_PATH = os.path.join(BASE_DIR, 'emotion_model.h5')
+ONNX_MODEL_PATH = os.path.join(BASE_DIR, 'emotion_model.onnx')
+ONNX_INT8_MODEL_PATH = os.path.join(BASE_DIR, 'emotion_model.int8.onnx')
+DEFAULT_INPUT_SHAPE = (None, 48, 48, 1)
+
+
+class OnnxRuntimeEmotionModel:
+    """ONNX Runtime session behind the Keras predict interface"""
+
+    backend = 'onnxruntime'
+
+    def __init__(self, path: str, threads: int = 0):
+        options = ort.SessionOptions()
+        if threads > 0:
+            # Workers run several analyses side by side; don't let each grab every core
+            options.intra_op_num_threads = threads
+            options.inter_op_num_threads = 1
+        self.path = path
+        self.session = ort.InferenceSession(path, sess_options=options, providers=['CPUExecutionProvider'])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        self.input_shape = tuple(d if isinstance(d, int) else None for d in model_input.shape)
+
+    def predict_on_batch(self, x):
+        return self.session.run(None, {self.input_name: np.ascontiguousarray(x, dtype=np.float32)})[0]
+
+    def predict(self, x, verbose=0):
+        return self.predict_on_batch(x)
+
+
+class OpenCVEmotionModel:
+    """cv2.dnn network behind the Keras predict interface"""
+
+    backend = 'opencv'
+
+    def __init__(self, path: str, threads: int = 0):
+        if threads > 0:
+            cv2.setNumThreads(threads)
+        self.path = path
+        self.net = cv2.dnn.readNetFromONNX(path)
+        self.input_shape = DEFAULT_INPUT_SHAPE
+        self.batched = True
+
+    def predict_on_batch(self, x):
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        if self.batched:
+            try:
+                self.net.setInput(x)
+                return np.asarray(self.net.forward()).reshape(len(x), -1)
+            except cv2.error:
+                # Some exported graphs have a fixed batch of 1 in OpenCV's importer
+                self.batched = False
+        outputs = []
+        for i in range(len(x)):
+            self.net.setInput(x[i:i + 1])
+            outputs.append(np.asarray(self.net.forward()).reshape(-1))
+        return np.stack(outputs) if outputs else np.zeros((0, 0), dtype=np.float32)
+
+    def predict(self, x, verbose=0):
+        return self.predict_on_batch(x)
+
+
+def _load_keras(path: str):
+    """Original path: TensorFlow/Keras (slow import, large memory footprint)"""
+    try:
+        try:
+            from tensorflow.keras.models import load_model
+        except ImportError:
+            from keras.models import load_model
+    except Exception as e:
+        print(f"[EMOTION_RUNTIME] TensorFlow not available: {e}")
+        return None
+    return load_model(path, compile=False)
+
+
+def backend_name(model) -> Optional[str]:
+    if model is None:
+        return None
+    return model.backend if isinstance(model, (OnnxRuntimeEmotionModel, OpenCVEmotionModel)) else 'keras'
+
+
+def onnx_model_path(quantized: Optional[bool] = None) -> str:
+    if quantized is None:
+        quantized = os.environ.get('EMOTION_QUANTIZED', 'false').lower() == 'true'
+    if quantized:
+        return os.environ.get('EMOTION_ONNX_INT8_PATH') or ONNX_INT8_MODEL_PATH
+    return os.environ.get('EMOTION_ONNX_PATH') or ONNX_MODEL_PATH
+
+
+def load_emotion_model(keras_path: str = KERAS_MODEL_PATH, backend: Optional[str] = None,
+                       quantized: Optional[bool] = None):
+    """
+    Emotion classifier for the configured backend, or None if none can load.
+
+    backend_name(model) tells which backend was chosen.
+    """
+    backend = (backend or os.environ.get('EMOTION_BACKEND') or 'auto').lower()
+    threads = int(os.environ.get('EMOTION_RUNTIME_THREADS') or 0)
+    onnx_path = onnx_model_path(quantized)
+    has_onnx = os.path.exists(onnx_path)
+
+    candidates = [backend] if backend != 'auto' else ['onnxruntime', 'opencv', 'keras']
+    for name in candidates:
+        try:
+            if name == 'onnxruntime' and ort is not None and np is not None and has_onnx:
+                return OnnxRuntimeEmotionModel(onnx_path, threads)
+            if name == 'opencv' and cv2 is not None and np is not None and has_onnx:
+                return OpenCVEmotionModel(onnx_path, threads)
+            if name == 'keras' and os.path.exists(keras_path):
+                return _load_keras(keras_path)
+        except Exception as e:
+            print(f"[EMOTION_RUNTIME] {name} backend failed to load: {e}")
+
+    if backend != 'auto':
+        print(f"[EMOTION_RUNTIME] Backend '{backend}' unavailable "
+              f"(model {onnx_path if backend != 'keras' else keras_path})")
+    return None
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    print("Emotion Runtime Module - Test")
+    print("=" * 50)
+    print(f"ONNX Runtime Available: {ort is not None}")
+    print(f"OpenCV DNN Available: {cv2 is not None}")
+    print(f"ONNX model: {onnx_model_path(False)} ({'found' if os.path.exists(onnx_model_path(False)) else 'missing'})")
+    print(f"int8 model: {onnx_model_path(True)} ({'found' if os.path.exists(onnx_model_path(True)) else 'missing'})")
+
+    requested = sys.argv[1] if len(sys.argv) > 1 else None
+    started = time.perf_counter()
+    model = load_emotion_model(backend=requested)
+    if model is None:
+        print("No emotion model could be loaded")
+    else:
+        print(f"Loaded {backend_name(model)} backend in {time.perf_counter() - started:.2f}s")
+        shape = model.input_shape
+        batch = np.random.rand(32, shape[1] or 48, shape[2] or 48, 1).astype(np.float32)
+        started = time.perf_counter()
+        for _ in range(10):
+            model.predict_on_batch(batch)
+        print(f"10 batches of 32: {time.perf_counter() - started:.3f}s")
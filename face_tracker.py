@@ -0,0 +1,153 @@
+"""
+Face Tracker Module
+Finds the face in sampled interview frames with as little work per frame as possible
+Handles: Downscaled frame buffers, Haar detection on the small frame, Template tracking between detections
+
+ConfidenceAnalyzer.analyze_frame used to run MediaPipe FaceMesh on a full
+resolution RGB copy and then a full resolution Haar detectMultiScale on a
+grayscale copy of every sampled frame. Now each frame is downscaled once
+into reused buffers (FrameBuffers); face landmarks, when available,
+give the face box directly, and otherwise the Haar cascade runs on the
+small frame only when the tracker loses the face.
+
+Tracking is normalized cross-correlation of the last detected face patch in
+a window around its previous position: cheap, and good enough for a
+candidate sitting in front of a webcam. A weak match, or every
+redetect_every frames, triggers a fresh detection so the box cannot drift.
+"""
+import os
+from typing import Optional, Tuple
+
+np = None
+try:
+    import numpy as np_module
+    np = np_module
+except ImportError:
+    pass
+
+cv2 = None
+try:
+    import cv2 as cv2_module
+    cv2 = cv2_module
+except ImportError:
+    pass
+
+DETECTION_WIDTH = int(os.environ.get('CONFIDENCE_DETECTION_WIDTH') or 320)
+REDETECT_EVERY = int(os.environ.get('CONFIDENCE_REDETECT_EVERY') or 10)
+MIN_TRACK_SCORE = float(os.environ.get('CONFIDENCE_MIN_TRACK_SCORE') or 0.6)
+# Landmark boxes are padded to a square this much larger than their longer side, close to the
+# Haar frontal-face boxes the emotion model was used with (FaceMesh points hug the face outline)
+LANDMARK_BOX_SCALE = float(os.environ.get('CONFIDENCE_LANDMARK_BOX_SCALE') or 1.1)
+
+Box = Tuple[int, int, int, int]  # x, y, w, h in small-frame pixels
+
+
+class FrameBuffers:
+    """
+    Downscaled BGR, grayscale and RGB views of the current frame.
+
+    Arrays are allocated once per frame size and written in place by
+    cv2.resize / cv2.cvtColor (dst=...), so sampling a long video does not
+    allocate three full-size images per frame.
+    """
+
+    def __init__(self, max_width: int = DETECTION_WIDTH):
+        self.max_width = max_width
+        self.small = None
+        self.gray = None
+        self.rgb = None
+        self.source_shape = None
+
+    def prepare(self, frame, need_rgb: bool = True):
+        height, width = frame.shape[:2]
+        if self.source_shape != (height, width):
+            scale = min(1.0, self.max_width / float(width)) if width else 1.0
+            small_w, small_h = max(1, int(round(width * scale))), max(1, int(round(height * scale)))
+            self.small = None if scale >= 1.0 else np.empty((small_h, small_w, 3), dtype=np.uint8)
+            self.gray = np.empty((small_h, small_w), dtype=np.uint8)
+            self.rgb = np.empty((small_h, small_w, 3), dtype=np.uint8)
+            self.source_shape = (height, width)
+
+        if self.small is not None:
+            cv2.resize(frame, (self.small.shape[1], self.small.shape[0]), dst=self.small, interpolation=cv2.INTER_AREA)
+            small = self.small
+        else:
+            small = frame
+        cv2.cvtColor(small, cv2.COLOR_BGR2GRAY, dst=self.gray)
+        if need_rgb:
+            cv2.cvtColor(small, cv2.COLOR_BGR2RGB, dst=self.rgb)
+        return self
+
+
+class FaceTracker:
+    """Face box for consecutive frames of one video: detect, then track until the match weakens"""
+
+    def __init__(self, cascade=None, redetect_every: int = REDETECT_EVERY, min_score: float = MIN_TRACK_SCORE):
+        self.cascade = cascade
+        self.redetect_every = redetect_every
+        self.min_score = min_score
+        self.box: Optional[Box] = None
+        self.template = None
+        self.since_detect = 0
+        self.stats = {'detections': 0, 'tracked': 0, 'lost': 0}
+
+    def reset(self):
+        self.box = None
+        self.template = None
+
+    def _remember(self, gray, box: Optional[Box]) -> Optional[Box]:
+        self.box = box
+        self.since_detect = 0
+        self.template = gray[box[1]:box[1] + box[3], box[0]:box[0] + box[2]].copy() if box else None
+        return box
+
+    def from_landmarks(self, points, gray) -> Optional[Box]:
+        """Haar-like square face box from normalized (N, 3) landmarks (landmark_engine; no extra detector pass)"""
+        height, width = gray.shape[:2]
+        low, high = points[:, :2].min(axis=0), points[:, :2].max(axis=0)
+        center_x, center_y = (low[0] + high[0]) / 2 * width, (low[1] + high[1]) / 2 * height
+        half = max((high[0] - low[0]) * width, (high[1] - low[1]) * height) * LANDMARK_BOX_SCALE / 2
+        x0, x1 = max(0, int(center_x - half)), min(width, int(center_x + half) + 1)
+        y0, y1 = max(0, int(center_y - half)), min(height, int(center_y + half) + 1)
+        if x1 - x0 < 8 or y1 - y0 < 8:
+            return None
+        self.stats['detections'] += 1
+        return self._remember(gray, (x0, y0, x1 - x0, y1 - y0))
+
+    def detect(self, gray) -> Optional[Box]:
+        if self.cascade is None:
+            return None
+        self.stats['detections'] += 1
+        faces = self.cascade.detectMultiScale(gray, 1.3, 5)
+        if len(faces) == 0:
+            return self._remember(gray, None)
+        x, y, w, h = (int(v) for v in faces[0])
+        return self._remember(gray, (x, y, w, h))
+
+    def track(self, gray) -> Optional[Box]:
+        """Best match of the last face patch near its previous position, or None if too weak"""
+        if self.box is None or self.template is None:
+            return None
+        x, y, w, h = self.box
+        pad_x, pad_y = w // 2, h // 2
+        x0, y0 = max(0, x - pad_x), max(0, y - pad_y)
+        region = gray[y0:y + h + pad_y, x0:x + w + pad_x]
+        if region.shape[0] < h or region.shape[1] < w:
+            return None
+        scores = cv2.matchTemplate(region, self.template, cv2.TM_CCOEFF_NORMED)
+        _, best, _, (dx, dy) = cv2.minMaxLoc(scores)
+        if best < self.min_score:
+            self.stats['lost'] += 1
+            return None
+        self.stats['tracked'] += 1
+        self.since_detect += 1
+        self.box = (x0 + dx, y0 + dy, w, h)
+        return self.box
+
+    def locate(self, gray) -> Optional[Box]:
+        """Tracked box while the match holds, otherwise a fresh detection"""
+        if self.box is not None and self.since_detect < self.redetect_every:
+            box = self.track(gray)
+            if box is not None:
+                return box
+        return self.detect(gray)
@@ -0,0 +1,273 @@
+"""
+Groq Stub Server
+Local stand-in for the Groq (OpenAI-compatible) chat completions API
+Handles: Deterministic JSON for every prompt the app sends, Latency distributions, 429/5xx injection, Token accounting
+
+Used for benchmarks and load tests of the LLM paths without the real
+provider. Start it and point the app at it:
+
+    python groq_stub.py --port 8089 --latency lognormal:800:0.5 --rate-429 0.05 --rate-5xx 0.02
+    GROQ_BASE_URL=http://127.0.0.1:8089 GROQ_API_KEY=stub python app.py
+
+Responses are derived from a hash of the prompt, so the same request always
+gets the same answer (cache and coalescing behaviour stay measurable).
+GET /stats returns request counts, injected errors and token totals.
+"""
+import re
+import json
+import time
+import random
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional
+
+CHARS_PER_TOKEN = 4
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """
+    Latency distribution in milliseconds, returned as a sampler of seconds:
+      fixed:MS | uniform:LOW:HIGH | normal:MEAN:STDDEV | lognormal:MEDIAN:SIGMA
+    """
+    kind, _, args = spec.partition(':')
+    values = [float(v) for v in args.split(':') if v]
+    if kind == 'fixed':
+        return lambda rng: values[0] / 1000
+    if kind == 'uniform':
+        return lambda rng: rng.uniform(values[0], values[1]) / 1000
+    if kind == 'normal':
+        return lambda rng: max(0.0, rng.gauss(values[0], values[1])) / 1000
+    if kind == 'lognormal':
+        import math
+        mu = math.log(values[0])
+        return lambda rng: rng.lognormvariate(mu, values[1]) / 1000
+    raise ValueError(f'Unknown latency distribution: {spec}')
+
+
+def _seed(text: str) -> int:
+    return int(hashlib.sha256(text.encode('utf-8')).hexdigest()[:12], 16)
+
+
+def _score(text: str, low: int = 40, high: int = 95) -> int:
+    return low + _seed(text) % (high - low + 1)
+
+
+def _questions(user_prompt: str) -> Dict:
+    match = re.search(r'Create exactly (\d+) interview questions', user_prompt)
+    count = int(match.group(1)) if match else 10
+    kinds = ['Technical', 'Technical', 'Behavioral', 'Situational']
+    return {'questions': [
+        {
+            'question': f'Stub question {i + 1}: explain how you would approach task {_seed(user_prompt + str(i)) % 1000}.',
+            'type': kinds[i % len(kinds)],
+            'difficulty': ['Easy', 'Medium', 'Hard'][i % 3],
+            'expected_keywords': ['design', 'testing', 'performance', 'trade-offs', 'python'],
+            'evaluation_criteria': 'Covers the approach, trade-offs and verification'
+        }
+        for i in range(count)
+    ]}
+
+
+def _evaluation(seed_text: str) -> Dict:
+    score = _score(seed_text)
+    return {
+        'score': score,
+        'correctness': _score(seed_text + 'c'),
+        'relevance': _score(seed_text + 'r'),
+        'completeness': _score(seed_text + 'p'),
+        'technical_depth': _score(seed_text + 't'),
+        'feedback': f'Stub evaluation ({score}/100).',
+        'key_points_covered': ['approach'],
+        'missing_points': ['edge cases']
+    }
+
+
+def build_completion(system_prompt: str, user_prompt: str) -> Dict:
+    """Deterministic JSON shaped like the app expects for each prompt type"""
+    if 'Create exactly' in user_prompt and 'interview questions' in user_prompt:
+        return _questions(user_prompt)
+    if '"evaluations"' in system_prompt:
+        count = len(re.findall(r'^Question \d+:', user_prompt, re.M))
+        return {'evaluations': [dict(_evaluation(f'{user_prompt}#{i}'), index=i) for i in range(1, count + 1)]}
+    if 'MATCH PERCENTAGE' in system_prompt:
+        score = _score(user_prompt)
+        return {
+            'overall_score': score,
+            'breakdown': {'skills_match': score * 40 // 100, 'requirements_fit': score * 30 // 100,
+                          'responsibilities_alignment': score * 20 // 100, 'overall_impression': score * 10 // 100},
+            'matched_skills': ['python', 'sql'],
+            'missing_skills': ['kubernetes'],
+            'strengths': ['Relevant experience'],
+            'concerns': ['Limited cloud exposure'],
+            'recommendation': 'Stub recommendation.'
+        }
+    if 'evaluation summary' in user_prompt.lower() or 'OVERALL SCORE' in user_prompt:
+        return {
+            'summary': 'Stub summary of the interview.',
+            'recommendation': 'Consider',
+            'top_strengths': ['Communication'],
+            'areas_of_concern': ['Depth'],
+            'interview_highlights': 'Stub highlight.'
+        }
+    if 'match_percentage' in user_prompt:
+        return {'match_percentage': _score(user_prompt), 'strengths': ['Stub strength'], 'gaps': ['Stub gap'],
+                'recommendations': ['Stub recommendation'], 'summary': 'Stub resume feedback.'}
+    evaluation = _evaluation(user_prompt)
+    evaluation.update({'keywords_matched': [], 'keywords_missed': [], 'strengths': [], 'improvements': []})
+    return evaluation
+
+
+class StubState:
+    """Injection settings and counters shared by all handler threads"""
+
+    def __init__(self, latency: Callable[[random.Random], float], rate_429: float = 0.0,
+                 rate_5xx: float = 0.0, seed: Optional[int] = None):
+        self.latency = latency
+        self.rate_429 = rate_429
+        self.rate_5xx = rate_5xx
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'ok': 0, 'injected_429': 0, 'injected_5xx': 0,
+                      'prompt_tokens': 0, 'completion_tokens': 0}
+
+    def draw(self):
+        """(latency seconds, injected status or None) for one request"""
+        with self.lock:
+            self.stats['requests'] += 1
+            delay = self.latency(self.rng)
+            roll = self.rng.random()
+        if roll < self.rate_429:
+            return delay, 429
+        if roll < self.rate_429 + self.rate_5xx:
+            return delay, 503
+        return delay, None
+
+    def count(self, **amounts):
+        with self.lock:
+            for name, amount in amounts.items():
+                self.stats[name] += amount
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    server_version = 'GroqStub/1.0'
+    state: StubState = None  # Set by make_server
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status: int, payload: Dict, headers: Optional[Dict] = None):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.rstrip('/') == '/stats':
+            with self.state.lock:
+                self._send(200, dict(self.state.stats))
+        elif self.path.rstrip('/').endswith('/models'):
+            self._send(200, {'object': 'list', 'data': [{'id': 'llama-3.3-70b-versatile', 'object': 'model'}]})
+        else:
+            self._send(404, {'error': {'message': 'Not found', 'type': 'invalid_request_error'}})
+
+    def do_POST(self):
+        if not self.path.rstrip('/').endswith('/chat/completions'):
+            self._send(404, {'error': {'message': 'Not found', 'type': 'invalid_request_error'}})
+            return
+
+        length = int(self.headers.get('Content-Length') or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            self._send(400, {'error': {'message': 'Invalid JSON body', 'type': 'invalid_request_error'}})
+            return
+
+        delay, injected = self.state.draw()
+        time.sleep(delay)
+        if injected == 429:
+            self.state.count(injected_429=1)
+            self._send(429, {'error': {'message': 'Rate limit reached (stub)', 'type': 'tokens',
+                                       'code': 'rate_limit_exceeded'}}, {'retry-after': '1'})
+            return
+        if injected:
+            self.state.count(injected_5xx=1)
+            self._send(injected, {'error': {'message': 'Service unavailable (stub)', 'type': 'internal_server_error'}})
+            return
+
+        messages = request.get('messages') or []
+        system_prompt = ' '.join(m.get('content', '') for m in messages if m.get('role') == 'system')
+        user_prompt = ' '.join(m.get('content', '') for m in messages if m.get('role') == 'user')
+        content = json.dumps(build_completion(system_prompt, user_prompt), indent=2)
+
+        prompt_tokens = max(1, (len(system_prompt) + len(user_prompt)) // CHARS_PER_TOKEN)
+        completion_tokens = min(max(1, len(content) // CHARS_PER_TOKEN), int(request.get('max_tokens') or 10 ** 6))
+        self.state.count(ok=1, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+
+        created = int(time.time())
+        self._send(200, {
+            'id': f'chatcmpl-stub-{_seed(user_prompt + str(created)):x}',
+            'object': 'chat.completion',
+            'created': created,
+            'model': request.get('model', 'llama-3.3-70b-versatile'),
+            'choices': [{
+                'index': 0,
+                'message': {'role': 'assistant', 'content': content},
+                'logprobs': None,
+                'finish_reason': 'stop'
+            }],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens,
+                'queue_time': 0.0,
+                'prompt_time': 0.0,
+                'completion_time': round(delay, 3),
+                'total_time': round(delay, 3)
+            },
+            'system_fingerprint': 'stub'
+        }, {'x-ratelimit-remaining-requests': '1000', 'x-ratelimit-remaining-tokens': '1000000'})
+
+
+def make_server(host: str = '127.0.0.1', port: int = 8089, latency: str = 'fixed:0',
+                rate_429: float = 0.0, rate_5xx: float = 0.0, seed: Optional[int] = None) -> ThreadingHTTPServer:
+    """Build (but don't start) a stub server; port 0 picks a free port"""
+    state = StubState(parse_latency(latency), rate_429, rate_5xx, seed)
+    handler = type('BoundStubHandler', (StubHandler,), {'state': state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_in_background(**kwargs) -> ThreadingHTTPServer:
+    """Start a stub server on a daemon thread (for benchmarks); base URL is http://host:server_port"""
+    server = make_server(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True, name='groq-stub').start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Local Groq-compatible stub server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8089)
+    parser.add_argument('--latency', default='fixed:0',
+                        help='fixed:MS | uniform:LOW:HIGH | normal:MEAN:STDDEV | lognormal:MEDIAN:SIGMA (ms)')
+    parser.add_argument('--rate-429', type=float, default=0.0, help='Fraction of requests answered with 429')
+    parser.add_argument('--rate-5xx', type=float, default=0.0, help='Fraction of requests answered with 503')
+    parser.add_argument('--seed', type=int, default=None, help='Seed for latency/error draws')
+    cli = parser.parse_args()
+
+    stub = make_server(cli.host, cli.port, cli.latency, cli.rate_429, cli.rate_5xx, cli.seed)
+    print(f"[GROQ_STUB] Listening on http://{cli.host}:{stub.server_port} "
+          f"(latency {cli.latency}, 429 {cli.rate_429:.0%}, 5xx {cli.rate_5xx:.0%})")
+    try:
+        stub.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.server_close()
@@ -0,0 +1,183 @@
+"""
+Incremental Analysis Module
+Processes a chunk-uploaded interview recording while it is still arriving
+Handles: Fixed time windows, Transcript + confidence counters per window, Sidecar state
+
+As chunks land (/api/upload-chunk) partial jobs are queued. Each partial job
+cuts the safely-decodable part of the growing recording into fixed windows.
+For each window it transcribes the audio and collects mergeable confidence
+counters, then appends the result to <video>.partial.json. At finish the
+full analysis (analysis_pipeline.py) only decodes the tail after the last
+processed window and merges it with the stored windows.
+"""
+import os
+import json
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+import media_pipeline
+
+PARTIAL_SUFFIX = '.partial.json'
+STATE_VERSION = 1
+
+
+def partial_path(video_path: str) -> str:
+    return video_path + PARTIAL_SUFFIX
+
+
+def load_partial(video_path: str) -> Optional[Dict]:
+    """Load incremental state for a recording, or None if nothing was processed yet"""
+    path = partial_path(video_path)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r') as f:
+            state = json.load(f)
+        if state.get('version') != STATE_VERSION or not state.get('windows'):
+            return None
+        return state
+    except (OSError, ValueError) as e:
+        print(f"   ⚠️ [INCREMENTAL] Ignoring unreadable partial state {path}: {e}")
+        return None
+
+
+def save_partial(video_path: str, state: Dict):
+    """Write state atomically so a crashed worker never leaves a half-written file"""
+    path = partial_path(video_path)
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(prefix='.partial_', suffix='.json', dir=directory)
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def remove_partial(video_path: str):
+    path = partial_path(video_path)
+    if os.path.exists(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def process_window(video_path: str, start: float, end: float, sample_rate: int = 30) -> Dict:
+    """
+    Decode one time window once and run the per-window work on it:
+    transcription (audio) and confidence counters (frames).
+    """
+    from video_processor import get_processor
+    from confidence_analyzer import get_analyzer_pool, DEFAULT_SAMPLES_PER_SECOND
+    from face_tracker import DETECTION_WIDTH
+
+    fd, audio_path = tempfile.mkstemp(prefix='window_', suffix='.wav')
+    os.close(fd)
+    stream = media_pipeline.MediaStream(
+        video_path, sample_rate=sample_rate, samples_per_second=DEFAULT_SAMPLES_PER_SECOND,
+        frame_width=DETECTION_WIDTH, audio_path=audio_path, start_seconds=start, duration_seconds=end - start
+    )
+    try:
+        stream.start()
+        with get_analyzer_pool().checkout() as analyzer:
+            stats = analyzer.collect_stats(stream.frames())
+        audio = stream.wait()
+        stats.duration = end - start
+
+        transcript, segments = '', []
+        if audio['status'] == 'success' and audio['duration'] >= 0.5:
+            result = get_processor().transcribe_audio(audio['audio_path'])
+            if result['status'] != 'success':
+                raise RuntimeError(result.get('error') or 'Transcription failed')
+            transcript = result['transcript']
+            # Window-relative timestamps → recording timestamps
+            segments = [
+                {'start': round(seg.get('start', 0) + start, 3),
+                 'end': round(seg.get('end', 0) + start, 3),
+                 'text': seg.get('text', '')}
+                for seg in result.get('segments', [])
+            ]
+        elif stream.want_audio and audio.get('error'):
+            raise RuntimeError(audio['error'])
+
+        return {
+            'start': start,
+            'end': end,
+            'transcript': transcript,
+            'segments': segments,
+            'confidence_stats': stats.to_dict()
+        }
+    finally:
+        stream.close(remove_audio=True)
+
+
+def process_pending_windows(video_path: str, safe_until: float, window_seconds: float = 30,
+                            sample_rate: int = 30) -> Dict:
+    """
+    Process every complete window that ends before safe_until.
+
+    State is saved after each window, so a retried job resumes where the last
+    attempt stopped.
+    """
+    state = load_partial(video_path) or {'version': STATE_VERSION, 'processed_until': 0.0, 'windows': []}
+
+    while state['processed_until'] + window_seconds <= safe_until:
+        start = state['processed_until']
+        end = start + window_seconds
+        print(f"   🧩 [INCREMENTAL] Processing window {start:.0f}s-{end:.0f}s of {os.path.basename(video_path)}")
+        window = process_window(video_path, start, end, sample_rate)
+        state['windows'].append(window)
+        state['processed_until'] = end
+        save_partial(video_path, state)
+
+    return state
+
+
+def merged_transcript(state: Dict) -> Tuple[str, List[Dict]]:
+    """Concatenate window transcripts and their (already absolute) segments"""
+    texts = [w['transcript'].strip() for w in state.get('windows', []) if w.get('transcript', '').strip()]
+    segments = [seg for w in state.get('windows', []) for seg in w.get('segments', [])]
+    return ' '.join(texts), segments
+
+
+def merged_confidence_stats(state: Dict):
+    """Sum confidence counters over all processed windows"""
+    from confidence_analyzer import ConfidenceStats
+
+    total = ConfidenceStats()
+    for window in state.get('windows', []):
+        total.merge(ConfidenceStats.from_dict(window.get('confidence_stats', {})))
+    return total
+
+
+def process_partial_interview(interview_id: int) -> Dict:
+    """
+    Worker entry point for 'partial' jobs: process windows of the recording
+    received so far. Runs inside an app context (worker.py).
+    """
+    from flask import current_app
+    from models import InterviewUpload
+    from video_processor import WHISPER_AVAILABLE
+
+    upload = InterviewUpload.query.filter_by(interview_id=interview_id).first()
+    if upload is None:
+        return {'success': False, 'error': 'No chunked upload for this interview'}
+    if upload.is_complete:
+        # The full analysis job covers everything that is left
+        return {'success': True, 'skipped': True}
+    if not media_pipeline.is_available() or not WHISPER_AVAILABLE:
+        # Nothing to gain: the full analysis falls back to its own decoding
+        return {'success': True, 'skipped': True, 'reason': 'ffmpeg or Whisper not available'}
+
+    # The newest cluster may still be incomplete on disk
+    margin = current_app.config.get('ANALYSIS_PARTIAL_SAFETY_SECONDS', 3)
+    window_seconds = current_app.config.get('ANALYSIS_PARTIAL_WINDOW_SECONDS', 30)
+    safe_until = (upload.recorded_seconds or 0) - margin
+
+    state = process_pending_windows(upload.file_path, safe_until, window_seconds)
+    print(f"   ✅ [INCREMENTAL] Interview {interview_id}: processed {state['processed_until']:.0f}s "
+          f"of {upload.recorded_seconds or 0:.0f}s received")
+    return {'success': True, 'processed_until': state['processed_until']}
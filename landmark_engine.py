@@ -0,0 +1,231 @@
+# pyright: reportOptionalMemberAccess=false
+# pyright: reportAttributeAccessIssue=false
+# pyright: reportMissingImports=false
+"""
+Landmark Engine Module
+Face landmarks and gaze/head-pose metrics for ConfidenceAnalyzer
+Handles: MediaPipe solutions FaceMesh, MediaPipe Tasks FaceLandmarker (VIDEO mode), Vectorized gaze + head pose
+
+Both MediaPipe APIs are wrapped behind one detect(rgb, timestamp) call that
+returns the face's landmarks as a single (N, 3) float32 array of normalized
+x, y, z. With MediaPipe >= 0.10 only the Tasks API exists; its
+FaceLandmarker runs in VIDEO mode, tracking the face between frames instead
+of searching every frame from scratch. It needs the face_landmarker.task
+model bundle (FACE_LANDMARKER_MODEL, default next to this file), which
+startup.sh downloads when it is missing:
+
+    https://storage.googleapis.com/mediapipe-models/face_landmarker/face_landmarker/float16/1/face_landmarker.task
+
+gaze_metrics() computes iris deviation, eye contact and head pose (yaw,
+pitch, roll) with array operations on one frame (N, 3) or a stack of
+frames (F, N, 3).
+"""
+import os
+from typing import Dict, Optional
+
+np = None
+try:
+    import numpy as np_module
+    np = np_module
+except ImportError:
+    print("[LANDMARK_ENGINE] NumPy not available")
+
+# MediaPipe for face analysis
+mp = None
+mp_face_mesh = None
+mp_tasks = None
+mp_vision = None
+MEDIAPIPE_AVAILABLE = False
+MEDIAPIPE_TASKS_API = False
+
+try:
+    import mediapipe as mp_module
+    mp = mp_module
+
+    # Try old solutions API first (MediaPipe < 0.10.x)
+    if hasattr(mp, 'solutions') and hasattr(mp.solutions, 'face_mesh'):
+        mp_face_mesh = mp.solutions.face_mesh
+        MEDIAPIPE_AVAILABLE = True
+        print("[LANDMARK_ENGINE] MediaPipe (solutions API) loaded successfully")
+    # Try new Tasks API (MediaPipe >= 0.10.x)
+    elif hasattr(mp, 'tasks'):
+        try:
+            from mediapipe.tasks import python as mp_tasks_module
+            from mediapipe.tasks.python import vision as mp_vision_module
+            mp_tasks = mp_tasks_module
+            mp_vision = mp_vision_module
+            MEDIAPIPE_AVAILABLE = True
+            MEDIAPIPE_TASKS_API = True
+            print("[LANDMARK_ENGINE] MediaPipe (Tasks API) loaded successfully")
+        except Exception as e:
+            print(f"[LANDMARK_ENGINE] MediaPipe Tasks API not available: {e}")
+    else:
+        print("[LANDMARK_ENGINE] MediaPipe loaded but face_mesh not available - using OpenCV fallback")
+
+except (ImportError, AttributeError, Exception) as e:
+    print(f"[LANDMARK_ENGINE] MediaPipe not available: {e}")
+
+FACE_LANDMARKER_MODEL = os.environ.get('FACE_LANDMARKER_MODEL') or os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'face_landmarker.task')
+
+# Landmark indices (MediaPipe face mesh topology; 468+ are the refined iris points)
+LEFT_EYE = [33, 7, 163, 144, 145, 153, 154, 155, 133, 173, 157, 158, 159, 160, 161, 246]
+RIGHT_EYE = [362, 382, 381, 380, 374, 373, 390, 249, 263, 466, 388, 387, 386, 385, 384, 398]
+LEFT_IRIS_CENTER = 468
+RIGHT_IRIS_CENTER = 473
+LEFT_EYE_OUTER, RIGHT_EYE_OUTER = 33, 263
+FOREHEAD, CHIN = 10, 152
+
+
+def landmarks_to_array(landmarks) -> 'np.ndarray':
+    """(N, 3) float32 array from a sequence of landmark objects with x, y, z"""
+    return np.array([(p.x, p.y, p.z) for p in landmarks], dtype=np.float32)
+
+
+def gaze_metrics(points, width: float = 1.0, height: float = 1.0) -> Dict:
+    """
+    Eye contact and head pose from normalized landmarks.
+
+    points is (N, 3) for one frame or (F, N, 3) for F frames; every value in
+    the result has the leading shape (a float for one frame, an array of F).
+    width/height undo the per-axis normalization for the pose angles.
+
+    eye_contact is the original score: 100 - 1000 * mean horizontal offset
+    of the iris centres from their eye centres, clipped to 0..100 (100 when
+    the landmarks have no iris points).
+    """
+    points = np.asarray(points, dtype=np.float32)
+    left_eye = points[..., LEFT_EYE, 0].mean(axis=-1)
+    right_eye = points[..., RIGHT_EYE, 0].mean(axis=-1)
+    if points.shape[-2] > RIGHT_IRIS_CENTER:
+        deviation = (np.abs(points[..., LEFT_IRIS_CENTER, 0] - left_eye)
+                     + np.abs(points[..., RIGHT_IRIS_CENTER, 0] - right_eye)) / 2
+    else:
+        deviation = np.zeros_like(left_eye)
+    eye_contact = np.clip(100 - deviation * 1000, 0, 100)
+
+    # z is in the same units as normalized x, so scale x and z by width, y by height
+    scaled = points * np.array([width, height, width], dtype=np.float32)
+    across = scaled[..., RIGHT_EYE_OUTER, :] - scaled[..., LEFT_EYE_OUTER, :]
+    down = scaled[..., CHIN, :] - scaled[..., FOREHEAD, :]
+    metrics = {
+        'eye_contact': eye_contact,
+        'iris_deviation': deviation,
+        'yaw': np.degrees(np.arctan2(across[..., 2], across[..., 0])),
+        'pitch': np.degrees(np.arctan2(down[..., 2], down[..., 1])),
+        'roll': np.degrees(np.arctan2(across[..., 1], across[..., 0]))
+    }
+    if points.ndim == 2:
+        return {key: float(value) for key, value in metrics.items()}
+    return metrics
+
+
+class FaceMeshEngine:
+    """solutions.FaceMesh (MediaPipe < 0.10); tracks internally in streaming mode"""
+
+    api = 'solutions'
+
+    def __init__(self, face_mesh):
+        self.face_mesh = face_mesh
+
+    def detect(self, rgb, timestamp: Optional[float] = None):
+        results = self.face_mesh.process(rgb)
+        if not results.multi_face_landmarks:
+            return None
+        return landmarks_to_array(results.multi_face_landmarks[0].landmark)
+
+    def close(self):
+        pass  # Shared with the analyzer
+
+
+class FaceLandmarkerEngine:
+    """
+    Tasks API FaceLandmarker in VIDEO running mode.
+
+    VIDEO mode requires strictly increasing timestamps; use one engine per
+    video (frame timestamps in seconds, or a sample counter when the source
+    has none).
+    """
+
+    api = 'tasks'
+
+    def __init__(self, model_path: str = FACE_LANDMARKER_MODEL):
+        options = mp_vision.FaceLandmarkerOptions(
+            base_options=mp_tasks.BaseOptions(model_asset_path=model_path),
+            running_mode=mp_vision.RunningMode.VIDEO,
+            num_faces=1,
+            min_face_detection_confidence=0.5,
+            min_face_presence_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
+        self.landmarker = mp_vision.FaceLandmarker.create_from_options(options)
+        self.last_ms = -1
+
+    def detect(self, rgb, timestamp: Optional[float] = None):
+        ms = int(timestamp * 1000) if timestamp is not None else self.last_ms + 1000
+        ms = max(ms, self.last_ms + 1)
+        self.last_ms = ms
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=np.ascontiguousarray(rgb))
+        results = self.landmarker.detect_for_video(image, ms)
+        if not results.face_landmarks:
+            return None
+        return landmarks_to_array(results.face_landmarks[0])
+
+    def close(self):
+        self.landmarker.close()
+
+
+_missing_model_reported = False
+
+
+def create_engine(face_mesh=None):
+    """
+    Landmark engine for the installed MediaPipe, or None.
+
+    face_mesh is the analyzer's shared solutions.FaceMesh; with the Tasks
+    API a new FaceLandmarker is created (one per video, see
+    FaceLandmarkerEngine).
+    """
+    global _missing_model_reported
+    if face_mesh is not None:
+        return FaceMeshEngine(face_mesh)
+    if not MEDIAPIPE_TASKS_API:
+        return None
+    if not os.path.exists(FACE_LANDMARKER_MODEL):
+        if not _missing_model_reported:
+            _missing_model_reported = True
+            print(f"   ⚠️ [LANDMARK_ENGINE] MediaPipe Tasks API needs {FACE_LANDMARKER_MODEL} "
+                  f"(set FACE_LANDMARKER_MODEL) - eye contact will not be measured")
+        return None
+    try:
+        return FaceLandmarkerEngine(FACE_LANDMARKER_MODEL)
+    except Exception as e:
+        print(f"   ⚠️ [LANDMARK_ENGINE] FaceLandmarker init failed: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    import time
+
+    print("Landmark Engine Module - Test")
+    print("=" * 50)
+    print(f"MediaPipe Available: {MEDIAPIPE_AVAILABLE} (Tasks API: {MEDIAPIPE_TASKS_API})")
+    print(f"FaceLandmarker model: {FACE_LANDMARKER_MODEL} "
+          f"({'found' if os.path.exists(FACE_LANDMARKER_MODEL) else 'missing'})")
+
+    class Point:
+        def __init__(self, x, y, z):
+            self.x, self.y, self.z = x, y, z
+
+    rng = np.random.default_rng(0)
+    frames = rng.random((1000, 478, 3)).astype(np.float32)
+    started = time.perf_counter()
+    batch = gaze_metrics(frames, 640, 480)
+    vectorized = time.perf_counter() - started
+    objects = [[Point(*p) for p in frame] for frame in frames[:100]]
+    started = time.perf_counter()
+    for frame in objects:
+        gaze_metrics(landmarks_to_array(frame), 640, 480)
+    per_frame = (time.perf_counter() - started) * 10
+    print(f"1000 frames: {vectorized * 1000:.1f} ms stacked, ~{per_frame * 1000:.1f} ms one by one from landmark objects")
+    print(f"Mean eye contact {batch['eye_contact'].mean():.1f}, mean |yaw| {np.abs(batch['yaw']).mean():.1f}°")
@@ -0,0 +1,301 @@
+"""
+LLM Breaker Module
+Keeps a degraded Groq endpoint from slowing down every analysis
+Handles: Retry with exponential backoff + jitter, Per-endpoint circuit breaker, Latency/error-rate trip policy
+
+LLMGateway runs every provider attempt through here. Transient failures
+(429, 5xx, timeouts, dropped connections) are retried with full-jitter
+backoff. Each endpoint (base URL + model) has a CircuitBreaker watching a
+rolling window of attempts: when the error rate or the p95 latency crosses
+its threshold the breaker opens and calls fail immediately with
+CircuitOpenError, so callers go straight to their local paths
+(analyze_fallback, _generate_fallback_questions, keyword scoring) instead
+of each paying the full timeout. After a cooldown one probe request is let
+through (half-open); success closes the breaker again.
+
+Cached completions are still served while a breaker is open - the check
+happens only when a request would go upstream.
+"""
+import os
+import time
+import random
+import threading
+from collections import deque
+from typing import Callable, Dict, Optional, TypeVar
+
+T = TypeVar('T')
+
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+
+def _env_number(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an endpoint whose breaker is open"""
+
+
+def percentile(values, fraction: float) -> float:
+    """Nearest-rank percentile of values (0.0 when empty)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+class CircuitBreaker:
+    """
+    Closed → open → half-open breaker over a rolling window of attempts.
+
+    The breaker trips once the window holds at least min_calls attempts and
+    either the error rate reaches error_rate or the p95 latency of those
+    attempts reaches p95_seconds. It stays open for cooldown_seconds.
+    """
+
+    def __init__(self, name: str, window: int = 20, min_calls: int = 5, error_rate: float = 0.5,
+                 p95_seconds: float = 20.0, cooldown_seconds: float = 30.0):
+        self.name = name
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.p95_seconds = p95_seconds
+        self.cooldown_seconds = cooldown_seconds
+        self.lock = threading.Lock()
+        self.window = deque(maxlen=window)  # (seconds, failed)
+        self.state = STATE_CLOSED
+        self.opened_at = 0.0
+        self.probe_in_flight = False
+        self.last_trip_reason = None
+        self.stats = {'rejected': 0, 'trips': 0, 'successes': 0, 'failures': 0}
+
+    def allow(self) -> bool:
+        """May a request go upstream now? In half-open state only one probe at a time"""
+        with self.lock:
+            if self.state == STATE_OPEN:
+                if time.monotonic() - self.opened_at < self.cooldown_seconds:
+                    self.stats['rejected'] += 1
+                    return False
+                self.state = STATE_HALF_OPEN
+                self.probe_in_flight = False
+            if self.state == STATE_HALF_OPEN:
+                if self.probe_in_flight:
+                    self.stats['rejected'] += 1
+                    return False
+                self.probe_in_flight = True
+            return True
+
+    def release_probe(self):
+        """Hand back a half-open probe slot whose request never reached the endpoint"""
+        with self.lock:
+            self.probe_in_flight = False
+
+    @property
+    def is_open(self) -> bool:
+        return self.state == STATE_OPEN
+
+    def record(self, seconds: float, failed: bool):
+        with self.lock:
+            self.stats['failures' if failed else 'successes'] += 1
+            if self.state == STATE_HALF_OPEN:
+                self.probe_in_flight = False
+                if failed:
+                    self._trip('probe failed')
+                else:
+                    self.state = STATE_CLOSED
+                    self.window.clear()
+                    print(f"[LLM_BREAKER] {self.name} closed (probe succeeded)")
+                return
+
+            self.window.append((seconds, failed))
+            if self.state != STATE_CLOSED or len(self.window) < self.min_calls:
+                return
+            errors = sum(1 for _, f in self.window if f) / len(self.window)
+            p95 = percentile([s for s, _ in self.window], 0.95)
+            if errors >= self.error_rate:
+                self._trip(f'error rate {errors:.0%}')
+            elif self.p95_seconds and p95 >= self.p95_seconds:
+                self._trip(f'p95 latency {p95:.1f}s')
+
+    def _trip(self, reason: str):
+        self.state = STATE_OPEN
+        self.opened_at = time.monotonic()
+        self.last_trip_reason = reason
+        self.stats['trips'] += 1
+        self.window.clear()
+        print(f"[LLM_BREAKER] {self.name} opened ({reason}), local fallbacks for {self.cooldown_seconds:g}s")
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            window = list(self.window)
+            state = self.state
+            if state == STATE_OPEN and time.monotonic() - self.opened_at >= self.cooldown_seconds:
+                state = STATE_HALF_OPEN  # Next allow() will probe
+            stats = dict(self.stats)
+        stats.update({
+            'state': state,
+            'last_trip_reason': self.last_trip_reason,
+            'window_calls': len(window),
+            'window_error_rate': round(sum(1 for _, f in window if f) / len(window), 3) if window else 0.0,
+            'window_p95_seconds': round(percentile([s for s, _ in window], 0.95), 3)
+        })
+        return stats
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(error: BaseException) -> bool:
+    """429/5xx responses, timeouts and connection errors; not 4xx request errors"""
+    status = _status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    name = type(error).__name__
+    return isinstance(error, (TimeoutError, ConnectionError)) or 'Timeout' in name or 'Connection' in name
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds requested by the provider's retry-after header, if any"""
+    headers = getattr(getattr(error, 'response', None), 'headers', None)
+    try:
+        value = headers.get('retry-after') if headers is not None else None
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base_seconds: float, max_seconds: float) -> float:
+    """Full jitter: uniform in [0, min(max, base * 2^attempt)]"""
+    return random.uniform(0, min(max_seconds, base_seconds * (2 ** attempt)))
+
+
+def call_with_retries(call: Callable[[], T], breaker: CircuitBreaker, max_retries: Optional[int] = None,
+                      base_seconds: Optional[float] = None, max_seconds: Optional[float] = None,
+                      before_attempt: Optional[Callable[[], None]] = None) -> T:
+    """
+    Run call() under the breaker, retrying transient failures.
+
+    Every attempt counts toward the breaker window; if the breaker opens
+    while retrying, the remaining attempts are abandoned. before_attempt
+    (e.g. waiting on our own rate limiter) runs before each attempt and is
+    not timed, so local queueing cannot trip the latency threshold; if it
+    raises, a half-open probe slot taken by allow() is released.
+    Non-retryable errors (4xx request errors) mean the endpoint answered:
+    they are raised but recorded as healthy attempts.
+    """
+    max_retries = int(_env_number('LLM_MAX_RETRIES', 2)) if max_retries is None else max_retries
+    base_seconds = _env_number('LLM_RETRY_BASE_SECONDS', 0.5) if base_seconds is None else base_seconds
+    max_seconds = _env_number('LLM_RETRY_MAX_SECONDS', 8) if max_seconds is None else max_seconds
+
+    attempt = 0
+    while True:
+        if not breaker.allow():
+            raise CircuitOpenError(f'Circuit open for {breaker.name}: {breaker.last_trip_reason}')
+        if before_attempt is not None:
+            try:
+                before_attempt()
+            except BaseException:
+                # Nothing was sent, so record() will never run for this probe
+                breaker.release_probe()
+                raise
+        started = time.perf_counter()
+        try:
+            result = call()
+        except Exception as e:
+            retryable = is_retryable(e)
+            breaker.record(time.perf_counter() - started, failed=retryable)
+            # A trip caused by this attempt ends the retries with the provider's error
+            if attempt >= max_retries or not retryable or breaker.is_open:
+                raise
+            delay = max(retry_after(e) or 0.0, backoff_delay(attempt, base_seconds, max_seconds))
+            delay = min(delay, max_seconds)
+            print(f"[LLM_BREAKER] {breaker.name} attempt {attempt + 1} failed ({type(e).__name__}), "
+                  f"retrying in {delay:.2f}s")
+            time.sleep(delay)
+            attempt += 1
+            continue
+        breaker.record(time.perf_counter() - started, failed=False)
+        return result
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(endpoint: str) -> CircuitBreaker:
+    """Process-wide breaker per endpoint (thresholds from the LLM_BREAKER_* environment variables)"""
+    breaker = _breakers.get(endpoint)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(endpoint)
+            if breaker is None:
+                breaker = _breakers[endpoint] = CircuitBreaker(
+                    endpoint,
+                    window=int(_env_number('LLM_BREAKER_WINDOW', 20)),
+                    min_calls=int(_env_number('LLM_BREAKER_MIN_CALLS', 5)),
+                    error_rate=_env_number('LLM_BREAKER_ERROR_RATE', 0.5),
+                    p95_seconds=_env_number('LLM_BREAKER_P95_SECONDS', 20),
+                    cooldown_seconds=_env_number('LLM_BREAKER_COOLDOWN_SECONDS', 30)
+                )
+    return breaker
+
+
+def breaker_stats() -> Dict:
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {endpoint: breaker.get_stats() for endpoint, breaker in breakers.items()}
+
+
+if __name__ == "__main__":
+    print("LLM Breaker Module - Test")
+    print("=" * 50)
+
+    demo = CircuitBreaker('demo:model', window=10, min_calls=4, cooldown_seconds=0.5)
+
+    class FakeUnavailable(Exception):
+        status_code = 503
+
+    def failing():
+        raise FakeUnavailable('Service unavailable')
+
+    for i in range(3):
+        try:
+            call_with_retries(failing, demo, max_retries=1, base_seconds=0.01, max_seconds=0.05)
+        except Exception as e:
+            print(f"Call {i + 1}: {type(e).__name__}: {e}")
+    print(f"State after failures: {demo.get_stats()['state']}")
+
+    class FakeBadRequest(Exception):
+        status_code = 400
+
+    def bad_request():
+        raise FakeBadRequest('Invalid request')
+
+    healthy = CircuitBreaker('demo:4xx', window=10, min_calls=4, p95_seconds=0.05)
+    for _ in range(6):
+        try:
+            # A slow rate-limiter wait before each attempt is not counted as endpoint latency
+            call_with_retries(bad_request, healthy, before_attempt=lambda: time.sleep(0.1))
+        except FakeBadRequest:
+            pass
+    print(f"After 6 slow-queued 400s: {healthy.get_stats()['state']} (4xx and local waits do not trip)")
+    time.sleep(0.6)
+
+    def limiter_gives_up():
+        raise TimeoutError('rate limiter wait exceeded')
+
+    try:
+        call_with_retries(lambda: 'ok', demo, before_attempt=limiter_gives_up)
+    except TimeoutError as e:
+        print(f"Half-open probe aborted before sending: {e}")
+    assert not demo.probe_in_flight, 'aborted probe must release the half-open slot'
+    print(f"Probe after cooldown: {call_with_retries(lambda: 'ok', demo)}")
+    print(f"Stats: {demo.get_stats()}")
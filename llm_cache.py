@@ -0,0 +1,260 @@
+"""
+LLM Cache Module
+Content-addressed cache for Groq responses shared by every analyzer
+Handles: sha256 keys, SQLite-backed LRU + TTL, In-flight request coalescing, Hit/miss stats
+
+The key is a hash of (model, system prompt, user prompt, request params), so
+re-scoring the same resume against the same job, re-analyzing an interview
+or retrying question generation returns the stored completion instead of
+paying provider latency again. Only responses that parse as JSON are
+stored, so a garbled answer is never replayed on retry.
+
+Concurrent identical requests (e.g. two workers re-analyzing the same
+interview) are coalesced: the first caller goes upstream, the rest wait
+for its result.
+"""
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Optional
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'llm_cache.sqlite3')
+
+
+def make_key(model: str, system_prompt: str, user_prompt: str, **params: Any) -> str:
+    """sha256 over everything that determines the completion"""
+    payload = json.dumps(
+        {'model': model, 'system': system_prompt, 'user': user_prompt, 'params': params},
+        sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def is_json_response(text: Optional[str]) -> bool:
+    """True if the completion contains a parseable JSON object (what every call site expects)"""
+    if not text:
+        return False
+    match = re.search(r'\{[\s\S]*\}', text)
+    if not match:
+        return False
+    try:
+        json.loads(match.group())
+        return True
+    except ValueError:
+        return False
+
+
+class _InFlight:
+    """Result slot for one upstream request that other callers can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+class LLMCache:
+    """
+    Disk-backed LRU cache with TTL.
+
+    SQLite keeps entries across restarts and lets web and worker processes
+    share them. Entries expire after ttl_seconds; past max_entries the least
+    recently used rows are evicted.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_entries: int = 5000,
+                 ttl_seconds: float = 7 * 24 * 3600, enabled: bool = True):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.inflight: Dict[str, _InFlight] = {}
+        self.stats = {'hits': 0, 'misses': 0, 'coalesced': 0, 'stores': 0, 'evictions': 0, 'errors': 0}
+        self.conn = None
+
+        if self.enabled:
+            try:
+                os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+                self.conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+                self.conn.execute('PRAGMA journal_mode=WAL')
+                self.conn.execute(
+                    'CREATE TABLE IF NOT EXISTS llm_cache ('
+                    'key TEXT PRIMARY KEY, value TEXT NOT NULL, '
+                    'created_at REAL NOT NULL, accessed_at REAL NOT NULL)'
+                )
+                self.conn.execute('CREATE INDEX IF NOT EXISTS ix_llm_cache_accessed ON llm_cache (accessed_at)')
+                self.conn.commit()
+            except sqlite3.Error as e:
+                print(f"[LLM_CACHE] Disabled, could not open {path}: {e}")
+                self.conn = None
+                self.enabled = False
+
+    def _count(self, stat: str, amount: int = 1):
+        with self.lock:
+            self.stats[stat] += amount
+
+    def get(self, key: str) -> Optional[str]:
+        if not self.conn:
+            return None
+        now = time.time()
+        try:
+            with self.lock:
+                row = self.conn.execute('SELECT value, created_at FROM llm_cache WHERE key = ?', (key,)).fetchone()
+                if row is None:
+                    return None
+                if now - row[1] > self.ttl_seconds:
+                    self.conn.execute('DELETE FROM llm_cache WHERE key = ?', (key,))
+                    self.conn.commit()
+                    return None
+                self.conn.execute('UPDATE llm_cache SET accessed_at = ? WHERE key = ?', (now, key))
+                self.conn.commit()
+                return row[0]
+        except sqlite3.Error as e:
+            print(f"[LLM_CACHE] Read error: {e}")
+            self._count('errors')
+            return None
+
+    def set(self, key: str, value: str):
+        if not self.conn:
+            return
+        now = time.time()
+        try:
+            with self.lock:
+                self.conn.execute(
+                    'INSERT OR REPLACE INTO llm_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)',
+                    (key, value, now, now)
+                )
+                evicted = self.conn.execute(
+                    'DELETE FROM llm_cache WHERE created_at < ? OR key IN ('
+                    'SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)',
+                    (now - self.ttl_seconds, self.max_entries)
+                ).rowcount
+                self.conn.commit()
+                self.stats['stores'] += 1
+                self.stats['evictions'] += max(0, evicted)
+        except sqlite3.Error as e:
+            print(f"[LLM_CACHE] Write error: {e}")
+            self._count('errors')
+
+    def get_or_compute(self, key: str, compute: Callable[[], Optional[str]],
+                       validate: Callable[[Optional[str]], bool] = is_json_response) -> Optional[str]:
+        """
+        Return the cached completion for key, or run compute() once.
+
+        Callers that arrive while the same key is already being computed wait
+        for that result instead of issuing their own request. Exceptions from
+        compute() propagate to every waiting caller. Only values accepted by
+        validate are stored.
+        """
+        if not self.enabled:
+            return compute()
+
+        cached = self.get(key)
+        if cached is not None:
+            self._count('hits')
+            return cached
+
+        with self.lock:
+            slot = self.inflight.get(key)
+            leader = slot is None
+            if leader:
+                slot = self.inflight[key] = _InFlight()
+                self.stats['misses'] += 1
+            else:
+                self.stats['coalesced'] += 1
+
+        if not leader:
+            slot.done.wait()
+            if slot.error is not None:
+                raise slot.error
+            return slot.value
+
+        try:
+            slot.value = compute()
+            if validate(slot.value):
+                self.set(key, slot.value)
+            return slot.value
+        except BaseException as e:
+            slot.error = e
+            raise
+        finally:
+            with self.lock:
+                self.inflight.pop(key, None)
+            slot.done.set()
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            stats = dict(self.stats)
+            entries = 0
+            if self.conn:
+                try:
+                    entries = self.conn.execute('SELECT COUNT(*) FROM llm_cache').fetchone()[0]
+                except sqlite3.Error:
+                    pass
+        lookups = stats['hits'] + stats['misses'] + stats['coalesced']
+        stats.update({
+            'enabled': self.enabled,
+            'entries': entries,
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            # Coalesced callers did not go upstream either
+            'hit_rate': round((stats['hits'] + stats['coalesced']) / lookups, 4) if lookups else 0.0
+        })
+        return stats
+
+    def clear(self):
+        if not self.conn:
+            return
+        with self.lock:
+            self.conn.execute('DELETE FROM llm_cache')
+            self.conn.commit()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> LLMCache:
+    """Process-wide cache (settings from the LLM_CACHE_* environment variables)"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = LLMCache(
+                    path=os.environ.get('LLM_CACHE_PATH') or DEFAULT_CACHE_PATH,
+                    max_entries=int(os.environ.get('LLM_CACHE_MAX_ENTRIES') or 5000),
+                    ttl_seconds=float(os.environ.get('LLM_CACHE_TTL_SECONDS') or 7 * 24 * 3600),
+                    enabled=os.environ.get('LLM_CACHE_ENABLED', 'true').lower() == 'true'
+                )
+    return _cache
+
+
+if __name__ == "__main__":
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+
+    print("LLM Cache Module - Test")
+    print("=" * 50)
+
+    demo = LLMCache(path=os.path.join(tempfile.mkdtemp(), 'llm_cache.sqlite3'), max_entries=2)
+    upstream_calls = []
+
+    def slow_completion():
+        upstream_calls.append(1)
+        time.sleep(0.3)
+        return '{"score": 80}'
+
+    demo_key = make_key('demo-model', 'system', 'user', max_tokens=100)
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        results = list(pool.map(lambda _: demo.get_or_compute(demo_key, slow_completion), range(5)))
+    print(f"5 concurrent identical requests -> {len(upstream_calls)} upstream call(s): {set(results)}")
+    demo.get_or_compute(demo_key, slow_completion)
+    print(f"Repeat request -> {len(upstream_calls)} upstream call(s) total")
+    for n in range(3):
+        demo.get_or_compute(make_key('demo-model', 'system', f'user {n}'), lambda: '{"ok": true}')
+    print(f"Stats: {demo.get_stats()}")
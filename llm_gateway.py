@@ -0,0 +1,179 @@
+"""
+LLM Gateway Module
+Single process-wide entry point for Groq chat completions
+Handles: Pooled keep-alive client, Model selection, Timeouts, Rate limiting + cache, Retries + circuit breaker, Latency/token accounting
+
+ai_engine.py, answer_analyzer.py and resume_analyzer.py used to build their
+own Groq client (and AIEngine was rebuilt per loop iteration), so TLS and
+connection setup were paid again and again. All of them now call
+get_gateway().complete(): one httpx connection pool per API key, the model
+from Config.GROQ_MODEL, and every request goes through the shared response
+cache (llm_cache.py) and rate limiter (llm_scheduler.py). Upstream attempts
+are retried and guarded by a per-endpoint circuit breaker (llm_breaker.py).
+"""
+import os
+import time
+import threading
+from collections import deque
+from typing import Dict, Optional
+
+from config import Config
+from llm_cache import get_cache, make_key
+from llm_scheduler import get_rate_limiter, estimate_tokens, usage_tokens
+from llm_breaker import get_breaker, call_with_retries, percentile
+
+try:
+    import httpx
+    from groq import Groq
+    GROQ_AVAILABLE = True
+except ImportError:
+    GROQ_AVAILABLE = False
+    print("[LLM_GATEWAY] groq not installed, LLM features disabled")
+
+LATENCY_WINDOW = 500  # Recent calls kept for percentiles
+
+
+class LLMGateway:
+    """
+    Thread-safe wrapper around one Groq client.
+
+    The client keeps a pooled httpx session alive between calls. complete()
+    returns the completion text and raises on provider errors; each caller
+    keeps its own fallback behaviour.
+    """
+
+    def __init__(self, api_key: str, model: str, timeout: float = 60,
+                 max_connections: int = 20, base_url: Optional[str] = None):
+        self.api_key = api_key
+        self.base_url = base_url  # None = Groq's public API; set for groq_stub.py benchmarks
+        self.model = model
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.lock = threading.Lock()
+        self._client = None
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.stats = {'calls': 0, 'errors': 0, 'prompt_tokens': 0, 'completion_tokens': 0, 'total_seconds': 0.0}
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self.lock:
+                if self._client is None:
+                    http_client = httpx.Client(
+                        timeout=self.timeout,
+                        limits=httpx.Limits(max_connections=self.max_connections,
+                                            max_keepalive_connections=self.max_connections,
+                                            keepalive_expiry=120)
+                    )
+                    # Retries happen in call_with_retries, where the breaker sees every attempt
+                    self._client = Groq(api_key=self.api_key, base_url=self.base_url, max_retries=0,
+                                        timeout=self.timeout, http_client=http_client)
+        return self._client
+
+    def complete(self, system_prompt: str, user_prompt: str, max_tokens: int = 1500,
+                 temperature: float = 0.3, model: Optional[str] = None, use_cache: bool = True) -> str:
+        """Chat completion text for a system + user prompt"""
+        model = model or self.model
+        if not use_cache:
+            return self._request(system_prompt, user_prompt, max_tokens, temperature, model)
+        key = make_key(model, system_prompt, user_prompt, max_tokens=max_tokens, temperature=temperature)
+        return get_cache().get_or_compute(
+            key, lambda: self._request(system_prompt, user_prompt, max_tokens, temperature, model)
+        )
+
+    def endpoint(self, model: Optional[str] = None) -> str:
+        """Breaker key: provider URL + model (models are rate limited and degrade independently)"""
+        return f"{self.base_url or 'groq'}:{model or self.model}"
+
+    def _request(self, system_prompt: str, user_prompt: str, max_tokens: int, temperature: float, model: str) -> str:
+        limiter = get_rate_limiter()
+        reserved = estimate_tokens(system_prompt, user_prompt, max_tokens=max_tokens)
+        # The rate-limiter wait happens outside the breaker's timing: it is our queue, not provider latency
+        return call_with_retries(
+            lambda: self._attempt(system_prompt, user_prompt, max_tokens, temperature, model, limiter, reserved),
+            get_breaker(self.endpoint(model)),
+            before_attempt=lambda: limiter.acquire(reserved)
+        )
+
+    def _attempt(self, system_prompt: str, user_prompt: str, max_tokens: int, temperature: float, model: str,
+                 limiter, reserved: int) -> str:
+        started = time.perf_counter()
+        try:
+            response = self.client.chat.completions.create(
+                model=model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt}
+                ],
+                max_tokens=max_tokens,
+                temperature=temperature
+            )
+        except Exception:
+            self._record(time.perf_counter() - started, None, error=True)
+            raise
+
+        self._record(time.perf_counter() - started, getattr(response, 'usage', None))
+        limiter.record_usage(reserved, usage_tokens(response))
+        return response.choices[0].message.content or ''
+
+    def _record(self, seconds: float, usage, error: bool = False):
+        with self.lock:
+            self.stats['calls'] += 1
+            self.stats['total_seconds'] += seconds
+            self.latencies.append(seconds)
+            if error:
+                self.stats['errors'] += 1
+            if usage is not None:
+                self.stats['prompt_tokens'] += getattr(usage, 'prompt_tokens', 0) or 0
+                self.stats['completion_tokens'] += getattr(usage, 'completion_tokens', 0) or 0
+
+    def get_stats(self) -> Dict:
+        with self.lock:
+            stats = dict(self.stats)
+            latencies = list(self.latencies)
+        stats.update({
+            'model': self.model,
+            'avg_seconds': round(stats['total_seconds'] / stats['calls'], 3) if stats['calls'] else 0.0,
+            'p50_seconds': round(percentile(latencies, 0.50), 3),
+            'p95_seconds': round(percentile(latencies, 0.95), 3),
+            'total_seconds': round(stats['total_seconds'], 3)
+        })
+        return stats
+
+
+_gateways: Dict[str, LLMGateway] = {}
+_gateways_lock = threading.Lock()
+
+
+def get_gateway(api_key: Optional[str] = None, model: Optional[str] = None) -> Optional[LLMGateway]:
+    """
+    Shared gateway for an API key (default: GROQ_API_KEY); None when no key or no groq package
+
+    model (default Config.GROQ_MODEL) applies when the key's gateway is first created;
+    complete(model=...) overrides it per call.
+    """
+    api_key = api_key or os.environ.get('GROQ_API_KEY')
+    if not api_key or not GROQ_AVAILABLE:
+        return None
+    gateway = _gateways.get(api_key)
+    if gateway is None:
+        with _gateways_lock:
+            gateway = _gateways.get(api_key)
+            if gateway is None:
+                gateway = _gateways[api_key] = LLMGateway(
+                    api_key,
+                    model or Config.GROQ_MODEL,
+                    timeout=float(os.environ.get('LLM_TIMEOUT_SECONDS') or 60),
+                    max_connections=int(os.environ.get('LLM_MAX_CONNECTIONS') or 20),
+                    base_url=os.environ.get('GROQ_BASE_URL') or None
+                )
+                print(f"[LLM_GATEWAY] Groq client initialized (model: {gateway.model}"
+                      f"{', base URL: ' + gateway.base_url if gateway.base_url else ''})")
+    return gateway
+
+
+def gateway_stats() -> Dict:
+    """Per-gateway call counts and latency percentiles (keys masked)"""
+    with _gateways_lock:
+        gateways = dict(_gateways)
+    return {f'...{key[-4:]}': gateway.get_stats() for key, gateway in gateways.items()}
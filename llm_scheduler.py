@@ -0,0 +1,300 @@
+"""
+LLM Scheduler Module
+Paces and fans out Groq requests for the whole process
+Handles: Requests-per-minute + tokens-per-minute token buckets, Bounded async fan-out
+
+Every LLM call site (GroqAIEngine._make_request, AnswerAnalyzer._call_groq,
+ResumeAnalyzer.analyze_with_groq) takes a permit from the shared limiter
+before it talks to the provider. Request threads, queue workers and the
+fan-out below therefore share one RPM/TPM budget and wait their turn
+instead of all firing at once and triggering a burst of 429s.
+
+The provider's limits are per API key, not per process, so the bucket
+balances live in a small SQLite file (like llm_cache.py) that every
+gunicorn worker and worker.py process updates in one transaction per
+reservation. If the file cannot be opened the limiter falls back to an
+in-process bucket.
+
+Independent calls (one per question, one per candidate) go through
+run_concurrently(), which runs them on an asyncio loop with at most
+LLM_MAX_CONCURRENCY in flight.
+"""
+import os
+import time
+import asyncio
+import sqlite3
+import threading
+from typing import Any, Callable, List, Optional, Sequence
+
+# Rough prompt size estimate: ~4 characters per token for English text
+CHARS_PER_TOKEN = 4
+DEFAULT_BUCKET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'instance', 'llm_rate_limit.sqlite3')
+
+
+def _env_number(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+def estimate_tokens(*texts: str, max_tokens: int = 0) -> int:
+    """Tokens a request may consume: prompt estimate plus the completion budget"""
+    chars = sum(len(t or '') for t in texts)
+    return max(1, chars // CHARS_PER_TOKEN) + max(0, max_tokens)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled continuously at rate_per_minute.
+
+    reserve() never blocks: it takes the tokens (the balance may go negative)
+    and returns how long the caller must wait before the reservation is
+    covered. Callers sleep outside the lock, so waiters queue up in order.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount: float) -> float:
+        """Take amount tokens; return seconds to wait before using them"""
+        if self.rate <= 0:
+            return 0.0
+        # A single request larger than the bucket can never be covered - cap it
+        amount = min(amount, self.capacity)
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens -= amount
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def adjust(self, delta: float):
+        """Correct an earlier reservation (estimate vs. actual usage)"""
+        if self.rate <= 0 or not delta:
+            return
+        with self.lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.capacity, self.tokens - delta)
+
+
+class SharedTokenBucket(TokenBucket):
+    """
+    TokenBucket whose balance is stored in SQLite, shared by every process.
+
+    Each reserve()/adjust() reads, refills and writes the row inside one
+    BEGIN IMMEDIATE transaction, so concurrent processes are serialized by
+    SQLite's write lock. Wall-clock time is used for refills because
+    monotonic clocks are not comparable between processes.
+    """
+
+    def __init__(self, name: str, path: str, rate_per_minute: float, capacity: Optional[float] = None):
+        super().__init__(rate_per_minute, capacity)
+        self.name = name
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=10, check_same_thread=False, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute(
+            'CREATE TABLE IF NOT EXISTS llm_rate_buckets ('
+            'name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)'
+        )
+
+    def _update(self, delta: float) -> float:
+        """Refill, subtract delta and store; returns the new balance"""
+        with self.lock:
+            now = time.time()
+            self.conn.execute('BEGIN IMMEDIATE')
+            try:
+                row = self.conn.execute('SELECT tokens, updated FROM llm_rate_buckets WHERE name = ?',
+                                        (self.name,)).fetchone()
+                tokens, updated = row if row else (self.capacity, now)
+                tokens = min(self.capacity, min(self.capacity, tokens + max(0.0, now - updated) * self.rate) - delta)
+                self.conn.execute('INSERT OR REPLACE INTO llm_rate_buckets (name, tokens, updated) VALUES (?, ?, ?)',
+                                  (self.name, tokens, now))
+                self.conn.execute('COMMIT')
+            except BaseException:
+                self.conn.execute('ROLLBACK')
+                raise
+            self.tokens = tokens
+            return tokens
+
+    def reserve(self, amount: float) -> float:
+        if self.rate <= 0:
+            return 0.0
+        try:
+            tokens = self._update(min(amount, self.capacity))
+        except sqlite3.Error as e:
+            # A locked/broken file must not fail the LLM call: pace this process on its own
+            print(f"[LLM_SCHEDULER] Shared {self.name} bucket unavailable ({e}), using local balance")
+            return super().reserve(amount)
+        return 0.0 if tokens >= 0 else -tokens / self.rate
+
+    def adjust(self, delta: float):
+        if self.rate <= 0 or not delta:
+            return
+        try:
+            self._update(delta)
+        except sqlite3.Error:
+            super().adjust(delta)
+
+
+class LLMRateLimiter:
+    """Combined requests-per-minute and tokens-per-minute limit (shared across processes when path is set)"""
+
+    def __init__(self, requests_per_minute: float = 30, tokens_per_minute: float = 12000,
+                 path: Optional[str] = None):
+        self.shared = False
+        if path:
+            try:
+                self.requests = SharedTokenBucket('requests', path, requests_per_minute)
+                self.tokens = SharedTokenBucket('tokens', path, tokens_per_minute)
+                self.shared = True
+            except sqlite3.Error as e:
+                print(f"[LLM_SCHEDULER] Per-process rate limit, could not open {path}: {e}")
+        if not self.shared:
+            self.requests = TokenBucket(requests_per_minute)
+            self.tokens = TokenBucket(tokens_per_minute)
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'tokens_reserved': 0, 'tokens_used': 0, 'wait_seconds': 0.0}
+
+    def _reserve(self, tokens: int) -> float:
+        delay = max(self.requests.reserve(1), self.tokens.reserve(tokens))
+        with self.lock:
+            self.stats['requests'] += 1
+            self.stats['tokens_reserved'] += tokens
+            self.stats['wait_seconds'] += delay
+        return delay
+
+    def acquire(self, tokens: int) -> float:
+        """Block the calling thread until one request of ~tokens may be sent"""
+        delay = self._reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+    async def acquire_async(self, tokens: int) -> float:
+        delay = self._reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return delay
+
+    def record_usage(self, reserved: int, used: Optional[int]):
+        """Give back (or charge) the difference once the response reports real usage"""
+        if used is None:
+            return
+        self.tokens.adjust(used - reserved)
+        with self.lock:
+            self.stats['tokens_used'] += used
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            return dict(self.stats, wait_seconds=round(self.stats['wait_seconds'], 3), shared=self.shared)
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> LLMRateLimiter:
+    """Limiter for this process, drawing on the budget shared by all processes (LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE)"""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                shared = os.environ.get('LLM_RATE_LIMIT_SHARED', 'true').lower() == 'true'
+                _limiter = LLMRateLimiter(
+                    _env_number('LLM_REQUESTS_PER_MINUTE', 30),
+                    _env_number('LLM_TOKENS_PER_MINUTE', 12000),
+                    path=(os.environ.get('LLM_RATE_LIMIT_PATH') or DEFAULT_BUCKET_PATH) if shared else None
+                )
+    return _limiter
+
+
+def usage_tokens(response) -> Optional[int]:
+    """total_tokens from an OpenAI-style completion response, if present"""
+    usage = getattr(response, 'usage', None)
+    total = getattr(usage, 'total_tokens', None)
+    return total if isinstance(total, int) else None
+
+
+def max_concurrency() -> int:
+    return max(1, int(_env_number('LLM_MAX_CONCURRENCY', 4)))
+
+
+async def _gather_limited(calls: Sequence[Callable[[], Any]], limit: int) -> List[Any]:
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(call):
+        async with semaphore:
+            # The Groq SDK clients are synchronous; each call gets a thread
+            return await asyncio.to_thread(call)
+
+    return await asyncio.gather(*(run(call) for call in calls), return_exceptions=True)
+
+
+def run_concurrently(calls: Sequence[Callable[[], Any]], limit: Optional[int] = None) -> List[Any]:
+    """
+    Run independent zero-argument callables with at most `limit` in flight.
+
+    Results come back in input order. A call that raised yields its exception
+    object instead of a result, so one failure never cancels the others.
+    Rate limiting happens inside each call (the call sites acquire permits),
+    so the fan-out never outruns the provider limits.
+    """
+    calls = list(calls)
+    if not calls:
+        return []
+    limit = limit or max_concurrency()
+    if limit == 1 or len(calls) == 1:
+        results = []
+        for call in calls:
+            try:
+                results.append(call())
+            except Exception as e:
+                results.append(e)
+        return results
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(_gather_limited(calls, limit))
+
+    # Already inside an event loop: run ours on a helper thread
+    holder = {}
+    thread = threading.Thread(target=lambda: holder.update(result=asyncio.run(_gather_limited(calls, limit))))
+    thread.start()
+    thread.join()
+    return holder['result']
+
+
+if __name__ == "__main__":
+    print("LLM Scheduler Module - Test")
+    print("=" * 50)
+
+    os.environ.setdefault('LLM_REQUESTS_PER_MINUTE', '120')
+    limiter = get_rate_limiter()
+
+    def fake_call(i):
+        def call():
+            limiter.acquire(estimate_tokens('prompt ' * 50, max_tokens=100))
+            time.sleep(0.2)  # Simulated provider latency
+            return i
+        return call
+
+    started = time.perf_counter()
+    out = run_concurrently([fake_call(i) for i in range(8)], limit=4)
+    print(f"Results: {out}")
+    print(f"Elapsed: {time.perf_counter() - started:.2f}s (serial would be ~1.6s)")
+    print(f"Limiter: {limiter.get_stats()}")
+
+    # Two limiters on one file stand in for two processes: they draw on one budget
+    import tempfile
+    shared_path = os.path.join(tempfile.mkdtemp(), 'llm_rate_limit.sqlite3')
+    web, worker = LLMRateLimiter(60, 0, path=shared_path), LLMRateLimiter(60, 0, path=shared_path)
+    for _ in range(60):
+        web._reserve(1)
+    print(f"Worker wait after web used the minute's 60 requests: {worker._reserve(1):.2f}s (separate buckets: 0.00s)")
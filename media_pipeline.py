@@ -0,0 +1,335 @@
+# pyright: reportOptionalMemberAccess=false
+"""
+Media Pipeline Module
+Single-decode demux stage shared by VideoProcessor and ConfidenceAnalyzer
+Handles: Container probing, One ffmpeg decode → downsampled BGR frames + 16 kHz mono PCM
+
+The interview video is read and decoded exactly once. ffmpeg writes the audio
+track to a WAV file and streams the downsampled frames over a pipe. A reader
+thread spools those frames to a temp file. Audio extraction therefore finishes
+at decode speed, even while a slower consumer (emotion/face analysis) is still
+working through the frames.
+"""
+import os
+import re
+import json
+import wave
+import shutil
+import tempfile
+import threading
+import subprocess
+from typing import Dict, Iterator, Optional
+
+# NumPy (frames are handed out as arrays)
+np = None
+try:
+    import numpy as np_module
+    np = np_module
+except ImportError:
+    print("[MEDIA_PIPELINE] NumPy not available")
+
+AUDIO_SAMPLE_RATE = 16000  # Whisper's native rate
+DEFAULT_FRAME_WIDTH = 640  # Callers that analyze frames pass their working width (face_tracker.DETECTION_WIDTH)
+DEFAULT_SOURCE_FPS = 30.0  # Browser webm often has no usable frame rate in the header
+
+
+def find_ffmpeg() -> Optional[str]:
+    """Locate ffmpeg: system binary first, then the one bundled with imageio-ffmpeg"""
+    path = shutil.which('ffmpeg')
+    if path:
+        return path
+    try:
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        return None
+
+
+def is_available() -> bool:
+    return np is not None and find_ffmpeg() is not None
+
+
+def _parse_rate(rate: str) -> float:
+    try:
+        if '/' in rate:
+            num, den = rate.split('/', 1)
+            return float(num) / float(den) if float(den) else 0.0
+        return float(rate)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def probe(video_path: str) -> Dict:
+    """
+    Read container/stream headers (no decoding).
+
+    Returns: {'width', 'height', 'fps', 'has_video', 'has_audio', 'duration'}
+    Uses ffprobe when installed, otherwise parses `ffmpeg -i` output.
+    """
+    info = {'width': 0, 'height': 0, 'fps': 0.0, 'has_video': False, 'has_audio': False, 'duration': 0.0}
+
+    ffprobe = shutil.which('ffprobe')
+    if ffprobe:
+        result = subprocess.run(
+            [ffprobe, '-v', 'error', '-show_entries',
+             'stream=codec_type,width,height,avg_frame_rate,r_frame_rate:format=duration',
+             '-of', 'json', video_path],
+            capture_output=True, text=True, timeout=30
+        )
+        if result.returncode == 0:
+            data = json.loads(result.stdout or '{}')
+            for stream in data.get('streams', []):
+                if stream.get('codec_type') == 'video' and not info['has_video']:
+                    info['has_video'] = True
+                    info['width'] = int(stream.get('width') or 0)
+                    info['height'] = int(stream.get('height') or 0)
+                    info['fps'] = _parse_rate(stream.get('avg_frame_rate')) or _parse_rate(stream.get('r_frame_rate'))
+                elif stream.get('codec_type') == 'audio':
+                    info['has_audio'] = True
+            info['duration'] = _parse_rate(data.get('format', {}).get('duration') or '0')
+            return info
+
+    ffmpeg = find_ffmpeg()
+    if ffmpeg is None:
+        raise RuntimeError('ffmpeg not available')
+
+    # `ffmpeg -i` with no output exits non-zero but prints the stream headers
+    stderr = subprocess.run([ffmpeg, '-hide_banner', '-i', video_path],
+                            capture_output=True, text=True, timeout=30).stderr
+    video_line = re.search(r'Stream #\S+.*?: Video: (.*)', stderr)
+    if video_line:
+        info['has_video'] = True
+        size = re.search(r'\b(\d{2,5})x(\d{2,5})\b', video_line.group(1))
+        if size:
+            info['width'], info['height'] = int(size.group(1)), int(size.group(2))
+        fps = re.search(r'([\d.]+) fps', video_line.group(1))
+        if fps:
+            info['fps'] = float(fps.group(1))
+    info['has_audio'] = re.search(r'Stream #\S+.*?: Audio:', stderr) is not None
+    duration = re.search(r'Duration: (\d+):(\d+):([\d.]+)', stderr)
+    if duration:
+        h, m, s = duration.groups()
+        info['duration'] = int(h) * 3600 + int(m) * 60 + float(s)
+    return info
+
+
+class MediaStream:
+    """
+    One decode of an interview video, fanned out to two consumers.
+
+    Usage:
+        stream = MediaStream(video_path, samples_per_second=1.0).start()
+        for frame in stream.frames():      # BGR uint8 arrays (consumer 1)
+            ...
+        audio = stream.wait()              # {'audio_path', 'duration', ...} (consumer 2)
+        stream.close()
+
+    frames() and wait() may be called from different threads.
+
+    samples_per_second sets the output frame rate in video time (capped at
+    the source rate); without it every sample_rate-th source frame is kept.
+    """
+
+    def __init__(self, video_path: str, sample_rate: int = 30, frame_width: int = DEFAULT_FRAME_WIDTH,
+                 audio_path: Optional[str] = None, want_frames: bool = True, want_audio: bool = True,
+                 start_seconds: float = 0.0, duration_seconds: Optional[float] = None,
+                 samples_per_second: Optional[float] = None):
+        self.video_path = video_path
+        self.start_seconds = max(0.0, float(start_seconds or 0))
+        self.duration_seconds = duration_seconds
+        self.sample_rate = max(1, int(sample_rate))
+        self.samples_per_second = samples_per_second
+        self.frame_width = frame_width
+        self.want_frames = want_frames
+        self.want_audio = want_audio
+
+        if audio_path is None:
+            video_dir = os.path.dirname(video_path)
+            video_name = os.path.splitext(os.path.basename(video_path))[0]
+            audio_path = os.path.join(video_dir, f"{video_name}_audio.wav")
+        self.audio_path = audio_path
+
+        self.info: Dict = {}
+        self.width = 0
+        self.height = 0
+        self.source_fps = 0.0
+        self.output_fps = 0.0
+        self.frame_bytes = 0
+
+        self._process = None
+        self._stderr = None
+        self._spool_path = None
+        self._reader = None
+        self._cond = threading.Condition()
+        self._frames_written = 0
+        self._done = False
+        self._error = None
+
+    def _output_size(self):
+        """Downscale to frame_width (never upscale), keeping both sides even"""
+        src_w, src_h = self.info['width'], self.info['height']
+        if src_w <= 0 or src_h <= 0:
+            raise RuntimeError('Could not read video dimensions')
+        width = min(self.frame_width, src_w)
+        height = int(round(src_h * width / src_w))
+        return width - width % 2, max(2, height - height % 2)
+
+    def start(self) -> 'MediaStream':
+        ffmpeg = find_ffmpeg()
+        if ffmpeg is None or np is None:
+            raise RuntimeError('ffmpeg and NumPy are required for the media pipeline')
+        if not os.path.exists(self.video_path):
+            raise FileNotFoundError(f'Video file not found: {self.video_path}')
+
+        self.info = probe(self.video_path)
+        self.want_frames = self.want_frames and self.info['has_video']
+        self.want_audio = self.want_audio and self.info['has_audio']
+        if not self.want_frames and not self.want_audio:
+            raise RuntimeError('Video has no decodable audio or video stream')
+
+        cmd = [ffmpeg, '-v', 'error', '-nostdin', '-y']
+        # Window of a (possibly still growing) recording - used by incremental processing
+        if self.start_seconds > 0:
+            cmd += ['-ss', f'{self.start_seconds:.3f}']
+        if self.duration_seconds is not None:
+            cmd += ['-t', f'{self.duration_seconds:.3f}']
+        cmd += ['-i', self.video_path]
+
+        if self.want_audio:
+            cmd += ['-map', '0:a:0', '-vn', '-ac', '1', '-ar', str(AUDIO_SAMPLE_RATE),
+                    '-c:a', 'pcm_s16le', self.audio_path]
+
+        if self.want_frames:
+            fps = self.info['fps']
+            self.source_fps = fps if 0 < fps <= 120 else DEFAULT_SOURCE_FPS
+            if self.samples_per_second and self.samples_per_second > 0:
+                self.output_fps = min(self.source_fps, self.samples_per_second)
+            else:
+                self.output_fps = self.source_fps / self.sample_rate
+            self.width, self.height = self._output_size()
+            self.frame_bytes = self.width * self.height * 3
+            cmd += ['-map', '0:v:0', '-an',
+                    '-vf', f'fps={self.output_fps:.6f},scale={self.width}:{self.height}',
+                    '-pix_fmt', 'bgr24', '-f', 'rawvideo', 'pipe:1']
+            spool = tempfile.NamedTemporaryFile(prefix='frames_', suffix='.bgr', delete=False)
+            spool.close()
+            self._spool_path = spool.name
+
+        self._stderr = tempfile.TemporaryFile()
+        self._process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE if self.want_frames else subprocess.DEVNULL,
+            stderr=self._stderr
+        )
+        print(f"   🎞️ [MEDIA_PIPELINE] Decoding once: {os.path.basename(self.video_path)} "
+              f"(frames={'%dx%d@%.2ffps' % (self.width, self.height, self.output_fps) if self.want_frames else 'off'}, "
+              f"audio={'16kHz mono' if self.want_audio else 'off'})")
+
+        self._reader = threading.Thread(target=self._drain, daemon=True, name='media-reader')
+        self._reader.start()
+        return self
+
+    def _drain(self):
+        """Copy frames from ffmpeg's pipe to the spool file, then reap the process"""
+        try:
+            if self.want_frames:
+                with open(self._spool_path, 'wb') as spool:
+                    while True:
+                        chunk = self._process.stdout.read(self.frame_bytes)
+                        if not chunk or len(chunk) < self.frame_bytes:
+                            break
+                        spool.write(chunk)
+                        spool.flush()
+                        with self._cond:
+                            self._frames_written += 1
+                            self._cond.notify_all()
+            returncode = self._process.wait()
+            if returncode != 0:
+                self._stderr.seek(0)
+                message = self._stderr.read().decode('utf-8', 'replace').strip()
+                self._error = f'ffmpeg exited with {returncode}: {message[-500:]}'
+        except Exception as e:
+            self._error = str(e)
+        finally:
+            with self._cond:
+                self._done = True
+                self._cond.notify_all()
+
+    def frames(self) -> Iterator:
+        """Yield downsampled BGR frames as they are decoded"""
+        if not self.want_frames:
+            return
+        index = 0
+        with open(self._spool_path, 'rb') as spool:
+            while True:
+                with self._cond:
+                    while index >= self._frames_written and not self._done:
+                        self._cond.wait()
+                    if index >= self._frames_written:
+                        return
+                raw = spool.read(self.frame_bytes)
+                if len(raw) < self.frame_bytes:
+                    return
+                index += 1
+                yield np.frombuffer(raw, dtype=np.uint8).reshape(self.height, self.width, 3)
+
+    def wait(self, timeout: Optional[float] = None) -> Dict:
+        """Block until the decode finishes; returns the audio result"""
+        with self._cond:
+            self._cond.wait_for(lambda: self._done, timeout=timeout)
+            if not self._done:
+                raise TimeoutError('Media decode did not finish in time')
+
+        audio_ok = self.want_audio and os.path.exists(self.audio_path) and self._error is None
+        duration = 0.0
+        if audio_ok:
+            # Duration from the decoded PCM: MediaRecorder webm headers usually have none
+            with wave.open(self.audio_path, 'rb') as wav:
+                duration = wav.getnframes() / float(wav.getframerate() or AUDIO_SAMPLE_RATE)
+        elif self.output_fps > 0:
+            duration = self._frames_written / self.output_fps
+
+        return {
+            'status': 'success' if audio_ok else 'error',
+            'audio_path': self.audio_path if audio_ok else None,
+            'duration': duration or (self.info.get('duration', 0.0) if self._is_whole_file else 0.0),
+            'frames_decoded': self._frames_written,
+            'error': None if audio_ok else (self._error or 'Video has no audio track')
+        }
+
+    @property
+    def _is_whole_file(self) -> bool:
+        return self.start_seconds == 0 and self.duration_seconds is None
+
+    @property
+    def frame_count(self) -> int:
+        return self._frames_written
+
+    def close(self, remove_audio: bool = False):
+        """Stop ffmpeg if still running and delete temp files"""
+        if self._process is not None and self._process.poll() is None:
+            self._process.kill()
+            self._process.wait()
+        if self._reader is not None:
+            self._reader.join(timeout=5)
+        for path in [self._spool_path] + ([self.audio_path] if remove_audio else []):
+            if path and os.path.exists(path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        if self._stderr is not None:
+            self._stderr.close()
+            self._stderr = None
+
+
+if __name__ == "__main__":
+    import sys
+    print("Media Pipeline Module - Test")
+    print("=" * 50)
+    print(f"ffmpeg: {find_ffmpeg()}")
+    if len(sys.argv) > 1:
+        test_stream = MediaStream(sys.argv[1]).start()
+        count = sum(1 for _ in test_stream.frames())
+        print(f"Frames: {count}, Audio: {test_stream.wait()}")
+        test_stream.close(remove_audio=True)
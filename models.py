@@ -6,6 +6,7 @@ Database Models for AI Job Application System
 Normalized to 3NF with SQLAlchemy ORM
 """
 from __future__ import annotations
+import json
 from datetime import datetime
 from typing import Any, Optional
 from flask_sqlalchemy import SQLAlchemy
@@ -223,6 +224,8 @@ class Interview(db.Model):  # type: ignore
     # Relationships
     questions = db.relationship('InterviewQuestion', backref='interview', lazy='dynamic', cascade='all, delete-orphan', order_by='InterviewQuestion.question_order')
     result = db.relationship('CandidateResult', backref='interview', uselist=False, cascade='all, delete-orphan')
+    analysis_jobs = db.relationship('AnalysisJob', backref='interview', lazy='dynamic', cascade='all, delete-orphan')
+    upload = db.relationship('InterviewUpload', backref='interview', uselist=False, cascade='all, delete-orphan')
     
     @staticmethod
     def generate_interview_code() -> str:
@@ -269,6 +272,9 @@ class InterviewQuestion(db.Model):  # type: ignore
     answer_transcript = db.Column(db.Text)
     answer_score = db.Column(db.Float)
     answered_at = db.Column(db.DateTime)
+    # Position of this answer in the single interview recording (from the room page)
+    answer_start_seconds = db.Column(db.Float)
+    answer_end_seconds = db.Column(db.Float)
     
     def __init__(self, interview_id: int = 0, question_text: str = '', question_type: str = 'Technical',
                  expected_keywords: Optional[str] = None, difficulty: str = 'Medium',
@@ -304,6 +310,7 @@ class CandidateResult(db.Model):  # type: ignore
     # Final scores
     overall_score = db.Column(db.Float, default=0.0)
     overall_percentile = db.Column(db.Float, default=0.0)
+    pillar_status = db.Column(db.Text)  # JSON {pillar: complete|partial|timed_out|failed}
     
     # HR Decision
     hr_decision = db.Column(db.String(20), default='Pending')  # Pending, Selected, Rejected, On-Hold
@@ -314,8 +321,21 @@ class CandidateResult(db.Model):  # type: ignore
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    def get_pillar_status(self) -> dict:
+        if not self.pillar_status:
+            return {}
+        try:
+            return json.loads(self.pillar_status)
+        except ValueError:
+            return {}
+    
     def calculate_overall_score(self, weights: Optional[dict] = None) -> float:
-        """Calculate weighted overall score from 4 pillars"""
+        """
+        Calculate weighted overall score from 4 pillars
+        
+        Pillars that ran out of their latency budget have no score; the
+        remaining weights are scaled up so the total keeps the same range.
+        """
         if weights is None:
             weights = {
                 'resume': 0.25,
@@ -324,18 +344,148 @@ class CandidateResult(db.Model):  # type: ignore
                 'knowledge': 0.30
             }
         
-        self.overall_score = (
-            self.resume_score * weights['resume'] +
-            self.confidence_score * weights['confidence'] +
-            self.communication_score * weights['communication'] +
-            self.knowledge_score * weights['knowledge']
-        )
+        scores = {
+            'resume': self.resume_score,
+            'confidence': self.confidence_score,
+            'communication': self.communication_score,
+            'knowledge': self.knowledge_score
+        }
+        statuses = self.get_pillar_status()
+        finished = {p: w for p, w in weights.items() if statuses.get(p) != 'timed_out'}
+        finished_weight = sum(finished.values())
+        if finished_weight <= 0:
+            self.overall_score = 0.0
+            return self.overall_score
+        
+        weighted = sum((scores[p] or 0) * w for p, w in finished.items())
+        self.overall_score = weighted * sum(weights.values()) / finished_weight
         return self.overall_score
     
     def __repr__(self) -> str:
         return f'<Result {self.result_id} - Score: {self.overall_score}>'
 
 
+class AnalysisJob(db.Model):  # type: ignore
+    """Durable queue entry for background interview analysis (see analysis_queue.py)"""
+    __tablename__ = 'analysis_jobs'
+
+    job_id = db.Column(db.Integer, primary_key=True)
+    interview_id = db.Column(db.Integer, db.ForeignKey('interviews.interview_id', ondelete='CASCADE'), nullable=False, index=True)
+    status = db.Column(db.String(20), default='queued', nullable=False, index=True)  # queued, leased, done, dead
+    job_type = db.Column(db.String(20), default='full', nullable=False)  # full, partial (chunks received so far)
+    attempts = db.Column(db.Integer, default=0)
+    max_attempts = db.Column(db.Integer, default=3)
+
+    # Lease held by the worker currently processing the job
+    lease_owner = db.Column(db.String(100))
+    lease_expires_at = db.Column(db.DateTime)
+    available_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)  # Retry backoff
+    last_error = db.Column(db.Text)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+    def __init__(self, interview_id: int = 0, max_attempts: int = 3, **kwargs: Any) -> None:
+        super().__init__(interview_id=interview_id, max_attempts=max_attempts, **kwargs)
+
+    @property
+    def is_active(self) -> bool:
+        return self.status in ('queued', 'leased')
+
+    def __repr__(self) -> str:
+        return f'<AnalysisJob {self.job_id} - Interview {self.interview_id}: {self.status}>'
+
+
+class InterviewUpload(db.Model):  # type: ignore
+    """Chunked, resumable upload of the interview recording (see /api/upload-chunk)"""
+    __tablename__ = 'interview_uploads'
+
+    upload_id = db.Column(db.Integer, primary_key=True)
+    interview_id = db.Column(db.Integer, db.ForeignKey('interviews.interview_id', ondelete='CASCADE'), unique=True, nullable=False)
+    file_path = db.Column(db.String(300), nullable=False)
+    bytes_received = db.Column(db.BigInteger, default=0, nullable=False)  # Next expected offset
+    next_seq = db.Column(db.Integer, default=0, nullable=False)  # Next expected chunk sequence number
+    recorded_seconds = db.Column(db.Float, default=0.0)  # Recording time covered by received chunks
+    is_complete = db.Column(db.Boolean, default=False)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __init__(self, interview_id: int = 0, file_path: str = '', **kwargs: Any) -> None:
+        super().__init__(interview_id=interview_id, file_path=file_path, **kwargs)
+
+    def to_status(self) -> dict:
+        return {
+            'interview_id': self.interview_id,
+            'bytes_received': self.bytes_received or 0,
+            'next_seq': self.next_seq or 0,
+            'recorded_seconds': self.recorded_seconds or 0,
+            'is_complete': bool(self.is_complete)
+        }
+
+    def __repr__(self) -> str:
+        return f'<InterviewUpload Interview {self.interview_id}: {self.bytes_received} bytes>'
+
+
+class AnalysisProgress(db.Model):  # type: ignore
+    """Stage-level progress of an interview's analysis (see analysis_progress.py)"""
+    __tablename__ = 'analysis_progress'
+
+    progress_id = db.Column(db.Integer, primary_key=True)
+    interview_id = db.Column(db.Integer, db.ForeignKey('interviews.interview_id', ondelete='CASCADE'), unique=True, nullable=False)
+    status = db.Column(db.String(20), default='queued', nullable=False)  # queued, running, done, failed
+    stage = db.Column(db.String(40), default='queued', nullable=False)  # e.g. transcribing, scoring, saving
+    percent = db.Column(db.Integer, default=0, nullable=False)
+    running_nodes = db.Column(db.Text)  # JSON list of pipeline nodes in flight
+    stage_timings = db.Column(db.Text)  # JSON {node: seconds}
+    error = db.Column(db.Text)
+
+    started_at = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = db.Column(db.DateTime)
+
+    def __init__(self, interview_id: int = 0, **kwargs: Any) -> None:
+        super().__init__(interview_id=interview_id, **kwargs)
+
+    def to_status(self) -> dict:
+        return {
+            'interview_id': self.interview_id,
+            'status': self.status,
+            'stage': self.stage,
+            'percent': self.percent or 0,
+            'running': json.loads(self.running_nodes) if self.running_nodes else [],
+            'timings': json.loads(self.stage_timings) if self.stage_timings else {},
+            'error': self.error,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+    def __repr__(self) -> str:
+        return f'<AnalysisProgress Interview {self.interview_id}: {self.stage} {self.percent}%>'
+
+
+class AnalysisCheckpoint(db.Model):  # type: ignore
+    """Stored output of one analysis stage, reused while its inputs are unchanged (see analysis_checkpoints.py)"""
+    __tablename__ = 'analysis_checkpoints'
+    __table_args__ = (db.UniqueConstraint('interview_id', 'stage', name='uq_analysis_checkpoint_stage'),)
+
+    checkpoint_id = db.Column(db.Integer, primary_key=True)
+    interview_id = db.Column(db.Integer, db.ForeignKey('interviews.interview_id', ondelete='CASCADE'), nullable=False, index=True)
+    stage = db.Column(db.String(40), nullable=False)  # transcript, confidence, communication, knowledge
+    input_hash = db.Column(db.String(64), nullable=False)
+    output = db.Column(db.Text, nullable=False)  # JSON stage result
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __init__(self, interview_id: int = 0, stage: str = '', input_hash: str = '', output: str = '', **kwargs: Any) -> None:
+        super().__init__(interview_id=interview_id, stage=stage, input_hash=input_hash, output=output, **kwargs)
+
+    def __repr__(self) -> str:
+        return f'<AnalysisCheckpoint Interview {self.interview_id}: {self.stage}>'
+
+
 class ActivityLog(db.Model):
     """System activity logging for audit trail"""
     __tablename__ = 'activity_logs'
@@ -411,10 +561,48 @@ class Notification(db.Model):
         return f'<Notification {self.notification_id}: {self.title}>'
 
 
+# Columns added to tables that existing deployments already have. db.create_all() only
+# creates missing tables, so upgrade_schema() adds these with ALTER TABLE after it.
+ADDED_COLUMNS = [
+    ('interview_questions', 'answer_start_seconds', db.Float()),
+    ('interview_questions', 'answer_end_seconds', db.Float()),
+    ('candidate_results', 'pillar_status', db.Text()),
+]
+
+
+def upgrade_schema() -> list:
+    """Add any ADDED_COLUMNS missing from the database (idempotent; needs an app context)"""
+    from sqlalchemy import inspect
+    
+    engine = db.engine
+    tables = set(inspect(engine).get_table_names())
+    added = []
+    for table, column, column_type in ADDED_COLUMNS:
+        if table not in tables:
+            continue  # create_all() makes it with every column
+        if column in {c['name'] for c in inspect(engine).get_columns(table)}:
+            continue
+        type_sql = column_type.compile(dialect=engine.dialect)
+        try:
+            with engine.begin() as conn:
+                # "ADD" without "COLUMN" is accepted by both SQLite and SQL Server
+                conn.execute(db.text(f'ALTER TABLE {table} ADD {column} {type_sql}'))
+            added.append(f'{table}.{column}')
+        except Exception as e:
+            # Another process (gunicorn worker, analysis worker) may have added it first
+            if column not in {c['name'] for c in inspect(engine).get_columns(table)}:
+                raise
+            print(f"[DB] {table}.{column} added concurrently: {e}")
+    if added:
+        print(f"[DB] Added columns: {', '.join(added)}")
+    return added
+
+
 # Helper function to initialize database
 def init_db(app):
     """Initialize database with app context"""
     db.init_app(app)
     with app.app_context():
         db.create_all()
+        upgrade_schema()
         print("Database tables created successfully!")
@@ -15,14 +15,11 @@ import json
 import fitz  # PyMuPDF
 from typing import Optional, Dict, List, Any
 
-# GROQ API
-groq_client = None
-GROQ_AVAILABLE = False
+# GROQ API (shared pooled client, see llm_gateway.py)
+from llm_gateway import get_gateway, GROQ_AVAILABLE
+from text_matcher import get_matcher, normalize_term
 
-try:
-    from groq import Groq
-    GROQ_AVAILABLE = True
-except ImportError:
+if not GROQ_AVAILABLE:
     print("[RESUME_ANALYZER] GROQ not available, using fallback scoring")
 
 # Fallback imports for non-AI scoring
@@ -43,13 +40,7 @@ class ResumeAnalyzer:
     
     def __init__(self, groq_api_key: Optional[str] = None):
         self.groq_api_key = groq_api_key or os.environ.get('GROQ_API_KEY')
-        self.groq_client = None
-        
-        if GROQ_AVAILABLE and self.groq_api_key:
-            try:
-                self.groq_client = Groq(api_key=self.groq_api_key)
-            except Exception as e:
-                print(f"[RESUME_ANALYZER] GROQ client init failed: {e}")
+        self.gateway = get_gateway(self.groq_api_key)
         
         # Fallback TF-IDF vectorizer
         if SKLEARN_AVAILABLE:
@@ -112,7 +103,7 @@ class ResumeAnalyzer:
         Use GROQ LLM for intelligent HR-style resume evaluation
         Evaluates against 4 sections: Description, Requirements, Responsibilities, Skills
         """
-        if not self.groq_client:
+        if not self.gateway:
             return {'error': 'GROQ client not available'}
         
         system_prompt = """You are an expert HR Recruiter evaluating resumes for job fit. 
@@ -183,17 +174,8 @@ RETURN ONLY THIS JSON FORMAT:
 Analyze and return JSON with match percentage."""
 
         try:
-            response = self.groq_client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.3,
-                max_tokens=2000
-            )
-            
-            response_text = response.choices[0].message.content.strip()
+            # Same resume + same posting → served from the shared LLM cache
+            response_text = self.gateway.complete(system_prompt, user_prompt, max_tokens=2000, temperature=0.3).strip()
             
             # Extract JSON from response
             json_match = re.search(r'\{[\s\S]*\}', response_text)
@@ -239,14 +221,14 @@ Analyze and return JSON with match percentage."""
                 similarity = cosine_similarity(tfidf_matrix[0:1], tfidf_matrix[1:2])
                 similarity_score = float(similarity[0][0]) * 100
             
-            # Extract skills
-            resume_lower = resume_text.lower()
+            # Extract skills (whole words, one pass over the resume for both lists)
             all_skills = self.skill_keywords + additional_skills
-            found_skills = [s for s in all_skills if s.lower() in resume_lower]
+            resume_skills = get_matcher(all_skills).found(resume_text)
+            found_skills = [s for s in all_skills if normalize_term(s) in resume_skills]
             
             # Skills match
             if additional_skills:
-                matched_skills = [s for s in additional_skills if s in resume_lower]
+                matched_skills = [s for s in additional_skills if normalize_term(s) in resume_skills]
                 skills_match_pct = (len(matched_skills) / len(additional_skills)) * 100
             else:
                 skills_match_pct = min(len(found_skills) * 8, 100)
@@ -281,7 +263,7 @@ Analyze and return JSON with match percentage."""
                     'experience': {'score': min(experience * 3, 20), 'details': f'{experience} years detected'}
                 },
                 'matched_skills': found_skills[:15],
-                'missing_skills': [s for s in additional_skills if s not in resume_lower][:10],
+                'missing_skills': [s for s in additional_skills if normalize_term(s) not in resume_skills][:10],
                 'ai_powered': False
             }
             
@@ -344,7 +326,7 @@ Analyze and return JSON with match percentage."""
                 job_context = self.build_job_context(job_data)
             
             # Try GROQ analysis first
-            if self.groq_client:
+            if self.gateway:
                 print(f"   🤖 Using GROQ AI for intelligent analysis...")
                 groq_result = self.analyze_with_groq(resume_text, job_context, job_data)
                 
@@ -5,23 +5,28 @@ Flask Routes and Authentication for AI Job Application System
 # pyright: reportCallIssue=false
 import os
 import json
+import time
 import secrets
 from datetime import datetime, timedelta
 from functools import wraps
 
-from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app, session
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, current_app, session, Response, stream_with_context
 from flask_login import LoginManager, login_user, logout_user, login_required, current_user
 from werkzeug.utils import secure_filename
+from sqlalchemy.exc import IntegrityError
 
-from models import db, User, Company, Candidate, Job, Application, Interview, InterviewQuestion, CandidateResult, ActivityLog, Notification
-from ai_engine import AIEngine, ResumeParser
+from models import db, User, Company, Candidate, Job, Application, Interview, InterviewQuestion, CandidateResult, ActivityLog, Notification, InterviewUpload, AnalysisProgress
+from ai_engine import get_ai_engine, ResumeParser
 
 # Import independent analyzer modules
+# (the video/answer analyzers are imported by analysis_pipeline only when an analysis runs)
 from resume_analyzer import analyze_resume
-from video_processor import process_interview_video
-from answer_analyzer import evaluate_knowledge
-from communication_analyzer import analyze_communication
-from confidence_analyzer import analyze_confidence
+from analysis_queue import enqueue_analysis, JOB_PARTIAL
+from analysis_pipeline import build_interview_pipeline
+from incremental_analysis import load_partial, remove_partial
+from llm_scheduler import run_concurrently
+from analysis_progress import record_progress, mark_queued, mark_failed, PipelineProgress, STATUS_QUEUED, STATUS_RUNNING, STATUS_DONE, STATUS_FAILED
+from analysis_checkpoints import stage_hashes, load_checkpoints, CheckpointRecorder
 
 # Create Blueprints
 auth_bp = Blueprint('auth', __name__)
@@ -104,6 +109,54 @@ def log_activity(action, entity_type=None, entity_id=None, details=None):
         print(f"Logging error: {e}")
 
 
+def _dashboard_job_context(job):
+    """Full job posting text used for dashboard question generation"""
+    return f"""
+📋 JOB TITLE: {job.title}
+
+📝 JOB DESCRIPTION:
+{job.description or 'Not specified'}
+
+✅ REQUIREMENTS:
+{job.requirements or 'Not specified'}
+
+💼 RESPONSIBILITIES:
+{job.responsibilities or 'Not specified'}
+
+🛠️ SKILLS REQUIRED:
+{job.skills_required or 'Not specified'}
+
+📚 EDUCATION REQUIRED:
+{job.education_required or 'Not specified'}
+
+⏰ EXPERIENCE REQUIRED:
+{job.experience_required or 'Not specified'}
+"""
+
+
+def prefetch_interview_questions(ai_engine, question_requests, num_questions):
+    """
+    Generate interview questions for several applications concurrently.
+    
+    question_requests maps app_id -> (resume_path, job_context, job_requirements).
+    Each item (resume text extraction + one LLM call) touches no database state,
+    so they run through llm_scheduler.run_concurrently: bounded concurrency,
+    paced by the shared RPM/TPM limiter. Returns app_id -> question list, or
+    the exception generation raised for that application.
+    """
+    def generate(resume_path, job_context, job_requirements):
+        resume_text = ""
+        if resume_path and resume_path != "no_resume_uploaded":
+            resume_text = ResumeParser.extract_text_from_pdf(resume_path)
+        return ai_engine.prepare_interview(resume_text, job_context, job_requirements, num_questions)
+    
+    app_ids = list(question_requests)
+    results = run_concurrently([
+        (lambda request_args=question_requests[app_id]: generate(*request_args)) for app_id in app_ids
+    ])
+    return dict(zip(app_ids, results))
+
+
 # ==================== AUTH ROUTES ====================
 
 @auth_bp.route('/register', methods=['GET', 'POST'])
@@ -491,6 +544,19 @@ def dashboard_bulk_interview():
     error_count = 0
     interview_results = []
     
+    # Generate questions for every eligible candidate up front: the LLM calls are
+    # independent, so they run concurrently instead of one after another
+    ai_engine = get_ai_engine(current_app.config.get('GROQ_API_KEY'))
+    num_questions = current_app.config.get('QUESTIONS_PER_INTERVIEW', 10)
+    question_requests = {}
+    for app_id in selected_app_ids:
+        application = Application.query.get(int(app_id)) if str(app_id).isdigit() else None
+        if application and application.job.company_id == company.company_id and not application.interview:
+            question_requests[application.app_id] = (
+                application.resume_path, _dashboard_job_context(application.job), application.job.requirements or ''
+            )
+    prefetched = prefetch_interview_questions(ai_engine, question_requests, num_questions)
+    
     for app_id in selected_app_ids:
         try:
             application = Application.query.get(int(app_id))
@@ -513,12 +579,6 @@ def dashboard_bulk_interview():
             # Update status to Interview
             application.status = 'Interview'
             
-            # Extract resume text for question generation
-            resume_text = ""
-            if application.resume_path and application.resume_path != "no_resume_uploaded":
-                from ai_engine import ResumeParser
-                resume_text = ResumeParser.extract_text_from_pdf(application.resume_path)
-            
             # Create interview with 1 week validity
             interview_code = Interview.generate_interview_code()
             otp_code = Interview.generate_otp()
@@ -533,40 +593,10 @@ def dashboard_bulk_interview():
             db.session.add(interview)
             db.session.flush()
             
-            # Generate AI interview questions using Grok API
-            ai_engine = AIEngine(current_app.config.get('GROQ_API_KEY'))
-            num_questions = current_app.config.get('QUESTIONS_PER_INTERVIEW', 10)
-            
-            # Build comprehensive job context for question generation
-            job_context = f"""
-📋 JOB TITLE: {job.title}
-
-📝 JOB DESCRIPTION:
-{job.description or 'Not specified'}
-
-✅ REQUIREMENTS:
-{job.requirements or 'Not specified'}
-
-💼 RESPONSIBILITIES:
-{job.responsibilities or 'Not specified'}
-
-🛠️ SKILLS REQUIRED:
-{job.skills_required or 'Not specified'}
-
-📚 EDUCATION REQUIRED:
-{job.education_required or 'Not specified'}
-
-⏰ EXPERIENCE REQUIRED:
-{job.experience_required or 'Not specified'}
-"""
-            
-            # Generate questions using candidate's resume + job description
-            questions = ai_engine.prepare_interview(
-                resume_text,
-                job_context,
-                job.requirements or '',
-                num_questions
-            )
+            # Questions were generated concurrently before the loop
+            questions = prefetched[application.app_id]
+            if isinstance(questions, Exception):
+                raise questions
             
             # Save questions to database
             for i, q in enumerate(questions):
@@ -893,6 +923,32 @@ def bulk_shortlist(job_id):
     shortlisted_count = 0
     interview_codes = []
     
+    # Build comprehensive job context for question generation
+    job_context = f"""
+📋 JOB DESCRIPTION:
+{job.description or ''}
+
+✅ REQUIREMENTS:
+{job.requirements or ''}
+
+💼 RESPONSIBILITIES:
+{job.responsibilities or ''}
+
+🛠️ SKILLS REQUIRED:
+{job.skills_required or ''}
+"""
+    
+    # Generate questions for every eligible candidate up front: the LLM calls are
+    # independent, so they run concurrently instead of one after another
+    ai_engine = get_ai_engine(current_app.config.get('GROQ_API_KEY'))
+    num_questions = current_app.config.get('QUESTIONS_PER_INTERVIEW', 10)
+    question_requests = {}
+    for app_id in selected_app_ids:
+        application = Application.query.get(int(app_id)) if str(app_id).isdigit() else None
+        if application and application.job_id == job_id and not application.interview:
+            question_requests[application.app_id] = (application.resume_path, job_context, job.requirements or '')
+    prefetched = prefetch_interview_questions(ai_engine, question_requests, num_questions)
+    
     for app_id in selected_app_ids:
         try:
             application = Application.query.get(int(app_id))
@@ -907,12 +963,6 @@ def bulk_shortlist(job_id):
             # Update status to Interview
             application.status = 'Interview'
             
-            # Extract resume text for question generation
-            resume_text = ""
-            if application.resume_path and application.resume_path != "no_resume_uploaded":
-                from ai_engine import ResumeParser
-                resume_text = ResumeParser.extract_text_from_pdf(application.resume_path)
-            
             # Create interview with 1 week validity
             interview_code = Interview.generate_interview_code()
             otp_code = Interview.generate_otp()  # Generate unique OTP for legacy compatibility
@@ -927,31 +977,10 @@ def bulk_shortlist(job_id):
             db.session.add(interview)
             db.session.flush()
             
-            # Generate AI interview questions
-            ai_engine = AIEngine(current_app.config.get('GROQ_API_KEY'))
-            num_questions = current_app.config.get('QUESTIONS_PER_INTERVIEW', 10)
-            
-            # Build comprehensive job context for question generation
-            job_context = f"""
-📋 JOB DESCRIPTION:
-{job.description or ''}
-
-✅ REQUIREMENTS:
-{job.requirements or ''}
-
-💼 RESPONSIBILITIES:
-{job.responsibilities or ''}
-
-🛠️ SKILLS REQUIRED:
-{job.skills_required or ''}
-"""
-            
-            questions = ai_engine.prepare_interview(
-                resume_text,
-                job_context,
-                job.requirements or '',
-                num_questions
-            )
+            # Questions were generated concurrently before the loop
+            questions = prefetched[application.app_id]
+            if isinstance(questions, Exception):
+                raise questions
             
             # Save questions to database
             for i, q in enumerate(questions):
@@ -1334,7 +1363,7 @@ def create_interview_for_application(application, resume_text, job):
         db.session.flush()
         
         # Generate questions using AI
-        ai_engine = AIEngine(current_app.config.get('GROQ_API_KEY'))
+        ai_engine = get_ai_engine(current_app.config.get('GROQ_API_KEY'))
         num_questions = current_app.config.get('QUESTIONS_PER_INTERVIEW', 10)
         
         # Build comprehensive job context for question generation
@@ -1479,7 +1508,7 @@ def start():
     if not questions:
         # Generate questions using AI
         try:
-            from ai_engine import ai_engine
+            ai_engine = get_ai_engine(current_app.config.get('GROQ_API_KEY'))
             # Read resume for context
             resume_text = ""
             if application.resume_path and os.path.exists(application.resume_path):
@@ -1609,19 +1638,11 @@ def upload_answer():
             filepath = os.path.join(upload_folder, filename)
             video_file.save(filepath)
             
-            # Store in interview record
-            interview.video_path = filepath
-            interview.is_completed = True
-            interview.completed_at = datetime.utcnow()
-            
-            # Mark all questions as answered
-            for q in interview.questions.all():
-                if not q.answered_at:
-                    q.answered_at = datetime.utcnow()
-            
-            # Trigger analysis
-            process_interview_analysis(interview_id)
-            
+            finalize_interview_recording(
+                interview, filepath,
+                question_timestamps=request.form.get('question_timestamps'),
+                recording_ms=request.form.get('recording_ms', type=int)
+            )
             db.session.commit()
             
             return jsonify({
@@ -1652,7 +1673,7 @@ def upload_answer():
             if interview.current_question_index >= total_questions:
                 interview.is_completed = True
                 interview.completed_at = datetime.utcnow()
-                process_interview_analysis(interview_id)
+                schedule_interview_analysis(interview_id)
             
             db.session.commit()
             
@@ -1665,6 +1686,218 @@ def upload_answer():
     return jsonify({'error': 'Invalid video file'}), 400
 
 
+def _apply_question_timestamps(questions, raw_timestamps, recording_ms):
+    """
+    Store when each question was on screen, relative to the start of the recording.
+    
+    raw_timestamps is the room page's JSON list of {question_id, start_ms}; a
+    question's answer ends where the next one starts (or at recording_ms).
+    """
+    try:
+        marks = json.loads(raw_timestamps) if raw_timestamps else []
+        starts = {int(m['question_id']): max(0.0, float(m['start_ms']) / 1000.0) for m in marks}
+    except (ValueError, TypeError, KeyError):
+        print("   ⚠️ Ignoring malformed question timestamps")
+        return
+    
+    timed = sorted((starts[q.question_id], q) for q in questions if q.question_id in starts)
+    for i, (start, q) in enumerate(timed):
+        q.answer_start_seconds = start
+        if i + 1 < len(timed):
+            q.answer_end_seconds = timed[i + 1][0]
+        elif recording_ms:
+            q.answer_end_seconds = max(start, recording_ms / 1000.0)
+
+
+def finalize_interview_recording(interview, filepath, question_timestamps=None, recording_ms=None):
+    """Attach the complete recording to the interview, mark it completed and queue analysis"""
+    # Store in interview record
+    interview.video_path = filepath
+    interview.is_completed = True
+    interview.completed_at = datetime.utcnow()
+    
+    # Mark all questions as answered
+    questions = interview.questions.all()
+    for q in questions:
+        if not q.answered_at:
+            q.answered_at = datetime.utcnow()
+    
+    if question_timestamps:
+        _apply_question_timestamps(questions, question_timestamps, recording_ms)
+    
+    # Queue analysis for a background worker
+    schedule_interview_analysis(interview.interview_id)
+
+
+def _upload_conflict(upload, message):
+    """409 telling the client where to resume"""
+    status = upload.to_status() if upload else {'bytes_received': 0, 'next_seq': 0, 'recorded_seconds': 0, 'is_complete': False}
+    return jsonify({'error': message, **status}), 409
+
+
+@api_bp.route('/upload-chunk', methods=['POST'])
+def upload_chunk():
+    """
+    Append one MediaRecorder timeslice to the interview recording.
+    
+    Chunks must arrive in order: 'seq' and byte 'offset' have to match what the
+    server has stored, otherwise 409 is returned with the expected position so
+    the client can resume. Re-sending an already stored chunk is acknowledged.
+    """
+    interview_id = request.form.get('interview_id', type=int)
+    seq = request.form.get('seq', type=int)
+    offset = request.form.get('offset', type=int)
+    recorded_ms = request.form.get('recorded_ms', 0, type=int)
+    
+    if interview_id is None or seq is None or offset is None:
+        return jsonify({'error': 'Missing interview_id, seq or offset'}), 400
+    if session.get('interview_id') != interview_id:
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    interview = Interview.query.get_or_404(interview_id)
+    if interview.is_completed:
+        return jsonify({'error': 'Interview already completed'}), 409
+    
+    chunk = request.files.get('chunk')
+    if chunk is None:
+        return jsonify({'error': 'No chunk'}), 400
+    data = chunk.read()
+    
+    upload = interview.upload
+    if upload is None:
+        if seq != 0 or offset != 0:
+            return _upload_conflict(None, 'Upload not started')
+        upload_folder = current_app.config.get('VIDEO_FOLDER', 'uploads/videos')
+        os.makedirs(upload_folder, exist_ok=True)
+        filename = f"interview_{interview_id}_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}.webm"
+        upload = InterviewUpload(interview_id=interview_id, file_path=os.path.join(upload_folder, filename))
+        upload.bytes_received = 0
+        upload.next_seq = 0
+        upload.recorded_seconds = 0.0
+        db.session.add(upload)
+        try:
+            db.session.flush()
+        except IntegrityError:
+            # Another first chunk created the upload row first; tell this one where to resume
+            db.session.rollback()
+            return _upload_conflict(InterviewUpload.query.filter_by(interview_id=interview_id).first(),
+                                    'Concurrent chunk upload')
+    
+    # Retry of a chunk we already stored (response was lost) - acknowledge it
+    if seq < upload.next_seq and offset + len(data) <= upload.bytes_received:
+        return jsonify({'success': True, 'duplicate': True, **upload.to_status()})
+    
+    if seq != upload.next_seq or offset != upload.bytes_received:
+        db.session.rollback()
+        return _upload_conflict(upload, 'Out of order chunk')
+    
+    # Compare-and-set before touching the file, so only the request that wins it writes bytes;
+    # the row stays locked until commit and a racing retry gets 409 instead
+    previous_seconds = upload.recorded_seconds or 0.0
+    new_seconds = max(previous_seconds, recorded_ms / 1000.0)
+    result = db.session.execute(
+        db.update(InterviewUpload)
+        .where(InterviewUpload.upload_id == upload.upload_id,
+               InterviewUpload.bytes_received == offset,
+               InterviewUpload.next_seq == seq)
+        .values(bytes_received=offset + len(data), next_seq=seq + 1,
+                recorded_seconds=new_seconds, updated_at=datetime.utcnow())
+    )
+    if result.rowcount != 1:  # type: ignore
+        db.session.rollback()
+        return _upload_conflict(InterviewUpload.query.filter_by(interview_id=interview_id).first(),
+                                'Concurrent chunk upload')
+    
+    with open(upload.file_path, 'r+b' if os.path.exists(upload.file_path) else 'wb') as f:
+        f.seek(offset)
+        f.write(data)
+        f.truncate()
+    
+    # Start processing each full window of recording as soon as it is safely on disk
+    if current_app.config.get('ANALYSIS_QUEUE_ENABLED', True):
+        window = current_app.config.get('ANALYSIS_PARTIAL_WINDOW_SECONDS', 30)
+        margin = current_app.config.get('ANALYSIS_PARTIAL_SAFETY_SECONDS', 3)
+        if int(max(0, new_seconds - margin) // window) > int(max(0, previous_seconds - margin) // window):
+            enqueue_analysis(
+                interview_id,
+                max_attempts=current_app.config.get('ANALYSIS_JOB_MAX_ATTEMPTS', 3),
+                job_type=JOB_PARTIAL
+            )
+    
+    db.session.commit()
+    db.session.refresh(upload)
+    return jsonify({'success': True, **upload.to_status()})
+
+
+@api_bp.route('/upload-status/<int:interview_id>')
+def upload_status(interview_id):
+    """Resume query: how much of the recording the server has"""
+    if session.get('interview_id') != interview_id:
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    upload = InterviewUpload.query.filter_by(interview_id=interview_id).first()
+    if upload is None:
+        return jsonify({'interview_id': interview_id, 'bytes_received': 0, 'next_seq': 0,
+                        'recorded_seconds': 0, 'is_complete': False})
+    return jsonify(upload.to_status())
+
+
+@api_bp.route('/upload-complete', methods=['POST'])
+def upload_complete():
+    """Finish a chunked upload: verify every byte arrived, then queue the final analysis"""
+    interview_id = request.form.get('interview_id', type=int)
+    total_bytes = request.form.get('total_bytes', type=int)
+    total_chunks = request.form.get('total_chunks', type=int)
+    
+    if interview_id is None or total_bytes is None or total_chunks is None:
+        return jsonify({'error': 'Missing interview_id, total_bytes or total_chunks'}), 400
+    if session.get('interview_id') != interview_id:
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    interview = Interview.query.get_or_404(interview_id)
+    upload = interview.upload
+    if upload is None:
+        return _upload_conflict(None, 'Upload not started')
+    
+    if upload.is_complete:
+        return jsonify({'success': True, 'is_completed': True})
+    
+    if upload.bytes_received != total_bytes or upload.next_seq != total_chunks:
+        return _upload_conflict(upload, 'Upload incomplete')
+    
+    upload.is_complete = True
+    finalize_interview_recording(
+        interview, upload.file_path,
+        question_timestamps=request.form.get('question_timestamps'),
+        recording_ms=request.form.get('recording_ms', type=int)
+    )
+    db.session.commit()
+    
+    return jsonify({
+        'success': True,
+        'is_completed': True
+    })
+
+
+def schedule_interview_analysis(interview_id):
+    """
+    Hand an interview to the analysis workers (worker.py).
+    
+    The job is added to the caller's transaction, so it becomes visible to
+    workers only when the interview completion is committed. With the queue
+    disabled (local development) the analysis runs inline as before.
+    """
+    mark_queued(interview_id)
+    if current_app.config.get('ANALYSIS_QUEUE_ENABLED', True):
+        return enqueue_analysis(
+            interview_id,
+            max_attempts=current_app.config.get('ANALYSIS_JOB_MAX_ATTEMPTS', 3)
+        )
+    
+    db.session.commit()
+    return process_interview_analysis(interview_id)
+
+
 def process_interview_analysis(interview_id):
     """
     Process interview analysis using INDEPENDENT MODULES (all 4 pillars)
@@ -1675,11 +1908,11 @@ def process_interview_analysis(interview_id):
     - Pillar 3: Communication (communication_analyzer.py) - Speech analysis
     - Pillar 4: Knowledge (answer_analyzer.py) - Answer evaluation
     
-    Workflow:
+    Workflow (analysis_pipeline.py runs steps 1-4 as a dependency graph):
     1. Process video → extract audio → get transcript (video_processor.py)
-    2. Analyze video for confidence (confidence_analyzer.py)
+    2. Analyze video for confidence (confidence_analyzer.py) - parallel to 1
     3. Analyze transcript for communication (communication_analyzer.py)
-    4. Evaluate answers for knowledge (answer_analyzer.py)
+    4. Evaluate answers for knowledge (answer_analyzer.py) - parallel to 3
     5. Store all results in database
     """
     try:
@@ -1690,6 +1923,8 @@ def process_interview_analysis(interview_id):
         
         application = interview.application
         job = application.job
+        analysis_started = time.perf_counter()
+        record_progress(interview_id, 'starting', 2, STATUS_RUNNING, running=[], timings={})
         
         print(f"\n{'='*70}")
         print(f"🎯 STARTING MODULAR INTERVIEW ANALYSIS")
@@ -1714,6 +1949,9 @@ def process_interview_analysis(interview_id):
         confidence_detail = {}
         communication_detail = {}
         knowledge_detail = {}
+        pipeline_timings = {}
+        # complete | partial (scored without every input) | timed_out (excluded from overall) | failed
+        pillar_status = {'resume': 'complete', 'confidence': 'failed', 'communication': 'failed', 'knowledge': 'failed'}
         
         # Check for interview video
         video_path = interview.video_path
@@ -1729,144 +1967,158 @@ def process_interview_analysis(interview_id):
             file_size = os.path.getsize(video_path) / (1024 * 1024)
             print(f"   File size: {file_size:.2f} MB")
             
+            # Prepare questions for the knowledge analyzer (ORM objects stay in this thread)
+            question_list = [
+                {
+                    'question_text': q.question_text,
+                    'expected_keywords': q.expected_keywords or '',
+                    'answer_start': q.answer_start_seconds,
+                    'answer_end': q.answer_end_seconds
+                }
+                for q in questions
+            ]
+            
             # ================================================================
-            # MODULE 1: VIDEO PROCESSOR - Extract transcript
+            # RUN ALL PILLARS AS A DEPENDENCY GRAPH
+            # audio → transcript → communication / knowledge, confidence in parallel
             # ================================================================
             print(f"\n{'='*50}")
-            print("📹 MODULE 1: VIDEO PROCESSOR")
+            print("🧩 RUNNING ANALYSIS PIPELINE")
             print(f"{'='*50}")
             
-            try:
-                video_result = process_interview_video(video_path, keep_audio=False)
+            # Windows already processed while a chunked upload was arriving
+            partial = load_partial(video_path)
+            if partial:
+                print(f"   🧩 Reusing incremental results for the first {partial['processed_until']:.0f}s")
+            
+            # Stage outputs from an earlier run with identical inputs (retry / re-analysis)
+            checkpoints = {}
+            progress = PipelineProgress(interview_id)
+            on_event = progress
+            if current_app.config.get('ANALYSIS_CHECKPOINTS_ENABLED', True):
+                hashes = stage_hashes(video_path, question_list, sample_rate=30,
+                                      api_key=current_app.config.get('GROQ_API_KEY'),
+                                      model=current_app.config.get('GROQ_MODEL'))
+                checkpoints = load_checkpoints(interview_id, hashes)
+                if checkpoints:
+                    print(f"   ♻️ Reusing checkpointed stages: {', '.join(sorted(checkpoints))}")
+                recorder = CheckpointRecorder(interview_id, hashes, checkpoints)
                 
-                if video_result['status'] == 'success':
-                    transcript = video_result['transcript']
-                    video_duration = video_result.get('video_duration', 0)
-                    print(f"   ✅ Transcript extracted: {len(transcript)} characters")
-                    print(f"   ✅ Video duration: {video_duration:.1f} seconds")
-                else:
-                    print(f"   ❌ Video processing failed: {video_result.get('error')}")
-                    transcript = ""
-                    
-            except Exception as e:
-                print(f"   ❌ Video processing error: {e}")
-                transcript = ""
+                def on_event(name, event, result):
+                    progress(name, event, result)
+                    recorder(name, event, result)
+            
+            slo_seconds = current_app.config.get('ANALYSIS_SLO_SECONDS')
+            pipeline = build_interview_pipeline(
+                video_path,
+                question_list,
+                current_app.config.get('GROQ_API_KEY'),
+                max_workers=current_app.config.get('ANALYSIS_PIPELINE_WORKERS'),
+                partial=partial,
+                on_event=on_event,
+                checkpoints=checkpoints,
+                budgets=current_app.config.get('ANALYSIS_STAGE_BUDGETS'),
+                # The SLO covers the whole analysis, including the setup above
+                deadline_seconds=max(1.0, slo_seconds - (time.perf_counter() - analysis_started)) if slo_seconds else None
+            )
+            run = pipeline.run()
+            pipeline_timings = run.timing_summary()
+            pipeline_timings['checkpointed'] = sorted(checkpoints)
+            record_progress(interview_id, 'saving', 92, running=[], timings=pipeline_timings['nodes'])
+            print(f"   ⏱️ Pipeline wall time: {pipeline_timings['wall_seconds']}s "
+                  f"(serial {pipeline_timings['serial_seconds']}s, {pipeline_timings['speedup']}x)")
+            if run.timed_out:
+                print(f"   ⌛ Over budget, scored without: {', '.join(run.timed_out)}")
             
             # ================================================================
-            # MODULE 2: CONFIDENCE ANALYZER - Analyze video
+            # MODULE 1: VIDEO PROCESSOR - Transcript
             # ================================================================
-            print(f"\n{'='*50}")
-            print("😊 MODULE 2: CONFIDENCE ANALYZER")
-            print(f"{'='*50}")
+            if run.ok('transcript'):
+                transcript = run.get('transcript')['transcript']
+                video_duration = run.get('transcript').get('video_duration', 0)
+                print(f"   ✅ Transcript extracted: {len(transcript)} characters")
+                print(f"   ✅ Video duration: {video_duration:.1f} seconds")
+            else:
+                error = run.errors.get('audio') or run.errors.get('transcript')
+                print(f"   ❌ Video processing failed: {error}")
+                transcript = ""
             
-            try:
-                conf_result = analyze_confidence(video_path, sample_rate=30)
-                
-                if conf_result['status'] == 'success':
-                    confidence_score = conf_result['score']
-                    confidence_detail = {
-                        'face_presence': conf_result.get('face_presence', 0),
-                        'eye_contact': conf_result.get('eye_contact', 0),
-                        'emotion_breakdown': conf_result.get('emotion_breakdown', {}),
-                        'raw_analysis': conf_result.get('analysis_detail', '')
-                    }
-                    print(f"   ✅ Confidence Score: {confidence_score}%")
-                else:
-                    print(f"   ❌ Confidence analysis failed: {conf_result.get('error')}")
-                    confidence_score = 0
-                    confidence_detail = {'error': conf_result.get('error')}
-                    
-            except Exception as e:
-                print(f"   ❌ Confidence analysis error: {e}")
+            # ================================================================
+            # MODULE 2: CONFIDENCE ANALYZER
+            # ================================================================
+            conf_result = run.get('confidence') or {'status': 'error', 'error': run.errors.get('confidence')}
+            if conf_result['status'] == 'success':
+                confidence_score = conf_result['score']
+                confidence_detail = {
+                    'face_presence': conf_result.get('face_presence', 0),
+                    'eye_contact': conf_result.get('eye_contact', 0),
+                    'emotion_breakdown': conf_result.get('emotion_breakdown', {}),
+                    'raw_analysis': conf_result.get('analysis_detail', '')
+                }
+                pillar_status['confidence'] = 'complete'
+                print(f"   ✅ Confidence Score: {confidence_score}%")
+            else:
+                print(f"   ❌ Confidence analysis failed: {conf_result.get('error')}")
                 confidence_score = 0
-                confidence_detail = {'error': str(e)}
+                confidence_detail = {'error': conf_result.get('error')}
+                if run.is_timed_out('confidence'):
+                    pillar_status['confidence'] = confidence_detail['status'] = 'timed_out'
             
             # ================================================================
-            # MODULE 3: COMMUNICATION ANALYZER - Analyze speech
+            # MODULE 3: COMMUNICATION ANALYZER
             # ================================================================
-            print(f"\n{'='*50}")
-            print("🎙️ MODULE 3: COMMUNICATION ANALYZER")
-            print(f"{'='*50}")
-            
-            if transcript and len(transcript) > 20:
-                try:
-                    comm_result = analyze_communication(transcript, video_duration)
-                    
-                    if comm_result['status'] == 'success':
-                        communication_score = comm_result['score']
-                        communication_detail = {
-                            'clarity': comm_result.get('clarity', {}),
-                            'vocabulary': comm_result.get('vocabulary', {}),
-                            'fluency': comm_result.get('fluency', {}),
-                            'readability': comm_result.get('readability', {}),
-                            'raw_analysis': comm_result.get('analysis_detail', '')
-                        }
-                        print(f"   ✅ Communication Score: {communication_score}%")
-                    else:
-                        print(f"   ❌ Communication analysis failed: {comm_result.get('error')}")
-                        communication_score = 0
-                        communication_detail = {'error': comm_result.get('error')}
-                        
-                except Exception as e:
-                    print(f"   ❌ Communication analysis error: {e}")
-                    communication_score = 0
-                    communication_detail = {'error': str(e)}
+            comm_result = run.get('communication') or {
+                'status': 'error',
+                'error': run.errors.get('communication', 'No transcript available')
+            }
+            if comm_result['status'] == 'success':
+                communication_score = comm_result['score']
+                communication_detail = {
+                    'clarity': comm_result.get('clarity', {}),
+                    'vocabulary': comm_result.get('vocabulary', {}),
+                    'fluency': comm_result.get('fluency', {}),
+                    'readability': comm_result.get('readability', {}),
+                    'raw_analysis': comm_result.get('analysis_detail', '')
+                }
+                pillar_status['communication'] = 'complete'
+                print(f"   ✅ Communication Score: {communication_score}%")
             else:
-                print("   ⚠️ No transcript available for communication analysis")
+                print(f"   ❌ Communication analysis failed: {comm_result.get('error')}")
                 communication_score = 0
-                communication_detail = {'error': 'No transcript available'}
+                communication_detail = {'error': comm_result.get('error')}
+                if run.is_timed_out('communication'):
+                    pillar_status['communication'] = communication_detail['status'] = 'timed_out'
             
             # ================================================================
-            # MODULE 4: ANSWER/KNOWLEDGE ANALYZER - Evaluate answers
+            # MODULE 4: ANSWER/KNOWLEDGE ANALYZER
             # ================================================================
-            print(f"\n{'='*50}")
-            print("💡 MODULE 4: KNOWLEDGE ANALYZER")
-            print(f"{'='*50}")
-            
-            if transcript and len(transcript) > 20 and questions:
-                try:
-                    # Prepare questions for analyzer
-                    question_list = [
-                        {
-                            'question_text': q.question_text,
-                            'expected_keywords': q.expected_keywords or ''
-                        }
-                        for q in questions
-                    ]
-                    
-                    knowledge_result = evaluate_knowledge(
-                        question_list, 
-                        transcript,
-                        current_app.config.get('GROQ_API_KEY')
-                    )
-                    
-                    if knowledge_result['status'] == 'success':
-                        knowledge_score = knowledge_result['score']
-                        knowledge_detail = {
-                            'individual_scores': knowledge_result.get('individual_scores', []),
-                            'raw_analysis': knowledge_result.get('analysis_detail', '')
-                        }
-                        
-                        # Update individual question scores
-                        for i, q in enumerate(questions):
-                            if i < len(knowledge_result.get('individual_scores', [])):
-                                q.answer_transcript = transcript
-                                q.answer_score = knowledge_result['individual_scores'][i].get('score', 0)
-                        
-                        print(f"   ✅ Knowledge Score: {knowledge_score}%")
-                    else:
-                        print(f"   ❌ Knowledge analysis failed: {knowledge_result.get('error')}")
-                        knowledge_score = 0
-                        knowledge_detail = {'error': knowledge_result.get('error')}
-                        
-                except Exception as e:
-                    print(f"   ❌ Knowledge analysis error: {e}")
-                    knowledge_score = 0
-                    knowledge_detail = {'error': str(e)}
+            knowledge_result = run.get('knowledge') or {
+                'status': 'error',
+                'error': run.errors.get('knowledge', 'No transcript or questions available')
+            }
+            if knowledge_result['status'] == 'success':
+                knowledge_score = knowledge_result['score']
+                knowledge_detail = {
+                    'individual_scores': knowledge_result.get('individual_scores', []),
+                    'raw_analysis': knowledge_result.get('analysis_detail', '')
+                }
+                
+                # Update individual question scores
+                answers = knowledge_result.get('answers')
+                for i, q in enumerate(questions):
+                    if i < len(knowledge_result.get('individual_scores', [])):
+                        q.answer_transcript = answers[i] if answers else transcript
+                        q.answer_score = knowledge_result['individual_scores'][i].get('score', 0)
+                
+                # Some answers fell back to keyword scoring because the LLM did not answer
+                pillar_status['knowledge'] = 'complete' if knowledge_result.get('ai_complete', True) else 'partial'
+                print(f"   ✅ Knowledge Score: {knowledge_score}% ({pillar_status['knowledge']})")
             else:
-                print("   ⚠️ No transcript or questions for knowledge analysis")
+                print(f"   ❌ Knowledge analysis failed: {knowledge_result.get('error')}")
                 knowledge_score = 0
-                knowledge_detail = {'error': 'No transcript or questions available'}
+                knowledge_detail = {'error': knowledge_result.get('error')}
+                if run.is_timed_out('knowledge'):
+                    pillar_status['knowledge'] = knowledge_detail['status'] = 'timed_out'
         
         # ================================================================
         # STORE RESULTS IN DATABASE
@@ -1926,7 +2178,8 @@ def process_interview_analysis(interview_id):
             result.knowledge_analysis_detail = json.dumps(knowledge_detail)
             db.session.add(result)
         
-        # Calculate overall score with weights
+        # Calculate overall score with weights (timed-out pillars are left out)
+        result.pillar_status = json.dumps(pillar_status)
         weights = {
             'resume': current_app.config.get('WEIGHT_RESUME', 0.25),
             'confidence': current_app.config.get('WEIGHT_CONFIDENCE', 0.20),
@@ -1938,9 +2191,13 @@ def process_interview_analysis(interview_id):
         # Update interview status
         interview.is_analyzed = True
         application.status = 'Interview'
+        record_progress(interview_id, 'done', 100, STATUS_DONE, running=[], commit=False)
         
         db.session.commit()
         
+        if video_path:
+            remove_partial(video_path)
+        
         print(f"\n{'='*70}")
         print(f"✅ MODULAR ANALYSIS COMPLETE!")
         print(f"   Overall Score: {result.overall_score}%")
@@ -1952,7 +2209,9 @@ def process_interview_analysis(interview_id):
             'confidence_score': confidence_score,
             'communication_score': communication_score,
             'knowledge_score': knowledge_score,
-            'overall_score': result.overall_score
+            'overall_score': result.overall_score,
+            'pillar_status': pillar_status,
+            'pipeline_timings': pipeline_timings
         }
         
     except Exception as e:
@@ -1960,6 +2219,92 @@ def process_interview_analysis(interview_id):
         import traceback
         traceback.print_exc()
         db.session.rollback()
+        mark_failed(interview_id, str(e))
+        return {'success': False, 'error': str(e)}
+
+
+def _can_view_analysis(interview):
+    """The candidate in the interview session, the candidate who applied, or the hiring company"""
+    if session.get('interview_id') == interview.interview_id:
+        return True
+    if not current_user.is_authenticated:
+        return False
+    application = interview.application
+    if current_user.role == 'Company':
+        return current_user.company is not None and application.job.company_id == current_user.company.company_id
+    return application.candidate is not None and application.candidate.user_id == current_user.user_id
+
+
+def _analysis_status(interview):
+    """Progress row as JSON-ready dict; interviews analyzed before progress tracking report done"""
+    progress = AnalysisProgress.query.filter_by(interview_id=interview.interview_id).first()
+    if progress is not None:
+        status = progress.to_status()
+    elif interview.is_analyzed:
+        status = {'interview_id': interview.interview_id, 'status': STATUS_DONE, 'stage': 'done', 'percent': 100}
+    else:
+        status = {'interview_id': interview.interview_id, 'status': 'pending',
+                  'stage': 'submitted' if interview.is_completed else 'not_submitted', 'percent': 0}
+    status['is_analyzed'] = bool(interview.is_analyzed)
+    return status
+
+
+@api_bp.route('/analysis-status/<int:interview_id>')
+def analysis_status(interview_id):
+    """
+    Current analysis stage, percent and per-node timings (JSON)
+    
+    Fallback for browsers without EventSource; polled every
+    ANALYSIS_PROGRESS_POLL_SECONDS.
+    """
+    interview = Interview.query.get_or_404(interview_id)
+    if not _can_view_analysis(interview):
+        return jsonify({'error': 'Unauthorized'}), 403
+    return jsonify(_analysis_status(interview))
+
+
+@api_bp.route('/analysis-status/<int:interview_id>/stream')
+def analysis_status_stream(interview_id):
+    """
+    Server-sent events: one 'progress' event whenever the status changes.
+    
+    Streams are short-lived so they don't pin the sync gunicorn threads: a
+    stream ends after ANALYSIS_PROGRESS_STREAM_SECONDS, right after the first
+    event while the job is queued/pending, or when analysis is done/failed.
+    Each event carries a retry: hint (ANALYSIS_PROGRESS_POLL_SECONDS, or
+    ANALYSIS_PROGRESS_QUEUED_POLL_SECONDS while queued) that EventSource
+    waits before reconnecting. The DB session is released between checks.
+    """
+    interview = Interview.query.get_or_404(interview_id)
+    if not _can_view_analysis(interview):
+        return jsonify({'error': 'Unauthorized'}), 403
+    
+    poll_seconds = current_app.config.get('ANALYSIS_PROGRESS_POLL_SECONDS', 3)
+    queued_poll_seconds = current_app.config.get('ANALYSIS_PROGRESS_QUEUED_POLL_SECONDS', 15)
+    max_seconds = current_app.config.get('ANALYSIS_PROGRESS_STREAM_SECONDS', 20)
+    
+    def events():
+        deadline = time.monotonic() + max_seconds
+        last_payload = None
+        while True:
+            current = db.session.get(Interview, interview_id)
+            status = _analysis_status(current) if current is not None else None
+            # Hand the pool connection back while sleeping; the next check sees the worker's latest commit
+            db.session.remove()
+            if status is None:
+                break
+            waiting = status['status'] in (STATUS_QUEUED, 'pending')
+            payload = json.dumps(status)
+            if payload != last_payload:
+                retry_ms = int((queued_poll_seconds if waiting else poll_seconds) * 1000)
+                yield f'retry: {retry_ms}\nevent: progress\ndata: {payload}\n\n'
+                last_payload = payload
+            if waiting or status['status'] in (STATUS_DONE, STATUS_FAILED) or time.monotonic() >= deadline:
+                break
+            time.sleep(poll_seconds)
+    
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 
 @api_bp.route('/job/<int:job_id>/stats')
@@ -1988,6 +2333,24 @@ def job_stats(job_id):
     return jsonify(stats)
 
 
+@api_bp.route('/llm/stats')
+@login_required
+@company_required
+def llm_stats():
+    """LLM call latency/tokens, cache hit/miss rates, rate limiter usage and breaker states for this process (AJAX)"""
+    from llm_cache import get_cache
+    from llm_scheduler import get_rate_limiter
+    from llm_gateway import gateway_stats
+    from llm_breaker import breaker_stats
+    
+    return jsonify({
+        'gateways': gateway_stats(),
+        'breakers': breaker_stats(),
+        'cache': get_cache().get_stats(),
+        'rate_limiter': get_rate_limiter().get_stats()
+    })
+
+
 @api_bp.route('/candidate/<int:candidate_id>/results')
 @login_required
 @company_required
@@ -43,6 +43,22 @@ except Exception as e:
     print(f'NLTK download warning: {e}')
 " || echo "NLTK download skipped"
 
+# Download the MediaPipe FaceLandmarker model (Tasks API needs it for eye contact / head pose)
+FACE_LANDMARKER_MODEL=${FACE_LANDMARKER_MODEL:-$(pwd)/face_landmarker.task}
+FACE_LANDMARKER_URL=${FACE_LANDMARKER_URL:-https://storage.googleapis.com/mediapipe-models/face_landmarker/face_landmarker/float16/1/face_landmarker.task}
+if [ ! -s "$FACE_LANDMARKER_MODEL" ]; then
+    echo "Downloading FaceLandmarker model to $FACE_LANDMARKER_MODEL..."
+    mkdir -p "$(dirname "$FACE_LANDMARKER_MODEL")"
+    # Download to a temp name so an interrupted transfer never leaves a truncated model
+    if curl -fsSL "$FACE_LANDMARKER_URL" -o "$FACE_LANDMARKER_MODEL.part"; then
+        mv "$FACE_LANDMARKER_MODEL.part" "$FACE_LANDMARKER_MODEL"
+    else
+        rm -f "$FACE_LANDMARKER_MODEL.part"
+        echo "FaceLandmarker download failed - eye contact will not be measured with the Tasks API"
+    fi
+fi
+export FACE_LANDMARKER_MODEL
+
 # Create upload directories
 mkdir -p /home/site/wwwroot/uploads/resumes
 mkdir -p /home/site/wwwroot/uploads/videos
@@ -53,9 +69,11 @@ python -c "
 import sys
 try:
     from app import app
-    from models import db, User
+    from models import db, User, upgrade_schema
     with app.app_context():
         db.create_all()
+        # create_all() never alters existing tables: add columns introduced since they were created
+        upgrade_schema()
         print('Database tables created/verified.')
         
         # Auto-seed if database is empty
@@ -74,7 +92,14 @@ except Exception as e:
     print('Continuing without database init - Gunicorn will retry on first request')
 " || echo "Database init will be attempted by the app"
 
+# Start background analysis workers (interview analysis runs outside the web process)
+ANALYSIS_WORKERS=${ANALYSIS_WORKERS:-1}
+echo "Starting $ANALYSIS_WORKERS analysis worker(s)..."
+for i in $(seq 1 $ANALYSIS_WORKERS); do
+    python worker.py &
+done
+
 # Start gunicorn - use Azure's PORT env variable (default 8000)
 PORT=${PORT:-8000}
 echo "Starting Gunicorn on port $PORT..."
-gunicorn --bind=0.0.0.0:$PORT --timeout 600 --workers 2 --threads 4 app:app
+gunicorn --bind=0.0.0.0:$PORT --timeout 120 --workers 2 --threads 4 app:app
@@ -0,0 +1,130 @@
+"""
+Text Matcher Module
+Finds many keywords in a text in one pass
+Handles: Whole-word multi-term regex, Per-vocabulary compile cache, Match counts + positions
+
+Skill extraction, keyword scoring and filler counting used to loop over
+their vocabulary with `term in text.lower()` (or text.count(term)), one
+scan of the text per term, and a plain substring test also hits inside
+other words: "go" in "good", "so" in "also", "java" in "javascript".
+
+get_matcher(terms) compiles the whole vocabulary into a single
+case-insensitive alternation, longest terms first, guarded by word-character
+lookarounds instead of \\b so that terms such as "c++", "c#" and "node.js"
+still match. Spaces inside a term match any run of whitespace. Plurals are
+opt-in (plurals=True allows a trailing "s"/"es"): right for expected answer
+keywords ("deadline" in "deadlines"), wrong for skill names ("go" would
+hit "goes"). Matchers are cached per vocabulary, so the fixed skill and
+filler lists compile once per process and per-question keyword lists once
+per distinct list.
+
+The alternation sits inside a lookahead, so it is tried at every word start
+without consuming text: "learning" is found inside "machine learning".
+Terms that are a whole-word prefix of a longer term matched at the same
+position ("data" in "data structures") are reported with it from a table
+built once per vocabulary.
+"""
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Set
+
+
+def normalize_term(term: str) -> str:
+    """Lowercase, with whitespace collapsed (the key terms are reported under)"""
+    return ' '.join(str(term).lower().split())
+
+
+class TermMatcher:
+    """Compiled whole-word matcher for one vocabulary (build with get_matcher)"""
+
+    def __init__(self, terms: Iterable[str], plurals: bool = False):
+        self.terms = tuple(sorted({normalize_term(t) for t in terms if normalize_term(t)}, key=lambda t: (-len(t), t)))
+        self.plurals = plurals
+        self.pattern = None
+        self.reported: List[tuple] = []
+        if not self.terms:
+            return
+        suffix = r'(?:e?s)?' if plurals else ''
+        bodies = [r'\s+'.join(re.escape(word) for word in term.split()) + suffix for term in self.terms]
+        # One group per term: match.lastindex says which term matched without re-normalizing the text
+        alternatives = '|'.join(f'({body})' for body in bodies)
+        # Cheap first-character test before trying the alternation at each position
+        first = ''.join(sorted({re.escape(term[0]) for term in self.terms}))
+        # Zero-width: every word start is tried, so matches may overlap
+        self.pattern = re.compile(rf'(?<!\w)(?=[{first}])(?=(?:{alternatives})(?!\w))', re.IGNORECASE)
+        # The alternation reports only the longest term at a position; shorter terms that match
+        # the start of it as whole words ("data" in "data structures") are reported along with it
+        whole = [re.compile(rf'{body}(?!\w)', re.IGNORECASE) for body in bodies]
+        self.reported = [
+            (term,) + tuple(other for other, prefix in zip(self.terms, whole)
+                            if other != term and len(other) < len(term) and prefix.match(term))
+            for term in self.terms
+        ]
+
+    def scan(self, text: str) -> Dict[str, List[int]]:
+        """{term: [start offsets]} for every term found in text"""
+        positions: Dict[str, List[int]] = {}
+        if self.pattern is None or not text:
+            return positions
+        reported = self.reported
+        for match in self.pattern.finditer(text):
+            start = match.start()
+            for term in reported[match.lastindex - 1]:
+                positions.setdefault(term, []).append(start)
+        return positions
+
+    def counts(self, text: str) -> Dict[str, int]:
+        return {term: len(starts) for term, starts in self.scan(text).items()}
+
+    def total(self, text: str) -> int:
+        """Occurrences of all terms (a nested term counts separately)"""
+        if self.pattern is None or not text:
+            return 0
+        reported = self.reported
+        return sum(len(reported[match.lastindex - 1]) for match in self.pattern.finditer(text))
+
+    def found(self, text: str) -> Set[str]:
+        """Normalized terms that occur at least once"""
+        return set(self.scan(text))
+
+
+@lru_cache(maxsize=512)
+def _cached_matcher(terms: tuple, plurals: bool) -> TermMatcher:
+    return TermMatcher(terms, plurals)
+
+
+def get_matcher(terms: Iterable[str], plurals: bool = False) -> TermMatcher:
+    """Matcher for a vocabulary, compiled once per distinct set of terms (and plural setting)"""
+    return _cached_matcher(tuple(sorted({normalize_term(t) for t in terms if normalize_term(t)})), plurals)
+
+
+if __name__ == "__main__":
+    import time
+
+    print("Text Matcher Module - Test")
+    print("=" * 50)
+
+    skills = ['python', 'java', 'javascript', 'c++', 'c#', 'node.js', 'go', 'git', 'machine learning', 'learning',
+              'data science', 'rest api', 'sql', 'nosql', 'aws', 'docker', 'kubernetes', 'react']
+    resume = ("Good communicator, everything goes well. Built a REST API in Node.js and JavaScript, some C++ and C#; "
+              "deployed with Docker on AWS. Machine learning with Python. Used GitHub daily. ") * 40
+    matcher = get_matcher(skills)
+    found = matcher.found(resume)
+    print(f"Found: {sorted(found)}")
+    print(f"Substring test would also report: {sorted(s for s in skills if s in resume.lower() and s not in found)}")
+    keywords = get_matcher(['data', 'data structures', 'deadline'], plurals=True)
+    print(f"Keywords (plurals on): {keywords.counts('I know data structures and always meet deadlines.')}")
+
+    # Same answer (whole words, counts, positions) with one regex per term, as the callers would have needed
+    per_term = [(s, re.compile(r'(?<!\w)' + re.escape(s) + r'(?!\w)', re.IGNORECASE)) for s in skills]
+    runs = 200
+    started = time.perf_counter()
+    for _ in range(runs):
+        {s: [m.start() for m in p.finditer(resume)] for s, p in per_term}
+    loop = (time.perf_counter() - started) / runs
+    started = time.perf_counter()
+    for _ in range(runs):
+        get_matcher(skills).scan(resume)
+    single = (time.perf_counter() - started) / runs
+    print(f"{len(resume)} chars, {len(skills)} terms: {loop * 1000:.2f} ms with a regex per term, "
+          f"{single * 1000:.2f} ms in one pass ({loop / single:.1f}x)")
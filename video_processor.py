@@ -10,6 +10,8 @@ import os
 import tempfile
 from typing import Optional, Dict, Any
 
+import media_pipeline
+
 # Optional imports with availability flags
 whisper = None
 VideoFileClip = None
@@ -184,6 +186,42 @@ class VideoProcessor:
                 'error': str(e)
             }
     
+    def extract_audio_single_pass(self, video_path, output_audio_path=None):
+        """
+        Extract 16 kHz mono audio and measure duration with one ffmpeg decode
+        (media_pipeline.py), instead of opening the container once for the
+        duration and again for the audio. Falls back to extract_audio().
+        
+        Returns:
+            dict: {'status': str, 'audio_path': str or None, 'duration': float, 'error': str or None}
+        """
+        if media_pipeline.is_available():
+            stream = media_pipeline.MediaStream(video_path, audio_path=output_audio_path, want_frames=False)
+            try:
+                stream.start()
+                result = stream.wait()
+                if result['status'] == 'success':
+                    print(f"   ✅ Audio extracted (single pass): {result['audio_path']}")
+                    return result
+                print(f"   ⚠️ Single-pass extraction failed: {result['error']}, falling back...")
+            except Exception as e:
+                print(f"   ⚠️ Single-pass extraction failed: {e}, falling back...")
+            finally:
+                stream.close()
+        
+        # Legacy path: separate duration probe + extraction
+        video_duration = 0
+        if MOVIEPY_AVAILABLE:
+            try:
+                video = VideoFileClip(video_path)
+                video_duration = video.duration
+                video.close()
+            except:
+                pass
+        result = self.extract_audio(video_path, output_audio_path)
+        result['duration'] = video_duration
+        return result
+    
     def transcribe_audio(self, audio_path):
         """
         Transcribe audio to text using Whisper
@@ -284,18 +322,9 @@ class VideoProcessor:
                     'error': f'Video file not found: {video_path}'
                 }
             
-            # Get video duration
-            video_duration = 0
-            if MOVIEPY_AVAILABLE:
-                try:
-                    video = VideoFileClip(video_path)
-                    video_duration = video.duration
-                    video.close()
-                except:
-                    pass
-            
-            # Step 1: Extract audio
-            audio_result = self.extract_audio(video_path)
+            # Step 1: Extract audio (+ duration) in a single decode when ffmpeg is available
+            audio_result = self.extract_audio_single_pass(video_path)
+            video_duration = audio_result.get('duration', 0)
             
             if audio_result['status'] == 'error':
                 return {
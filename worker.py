@@ -0,0 +1,148 @@
+"""
+Interview Analysis Worker
+Standalone process that leases analysis jobs from the database queue and runs
+the 4-pillar analysis outside the web process.
+
+Run: python worker.py            (process jobs until stopped)
+     python worker.py --once     (process at most one job, then exit)
+
+Scale analysis throughput by starting more worker processes (on this node or
+others sharing the database and upload storage), not more gunicorn workers.
+"""
+import sys
+import time
+import signal
+import threading
+import traceback
+
+from analysis_queue import (
+    default_worker_id, lease_next_job, heartbeat, complete_job, fail_job, JOB_PARTIAL,
+    STATUS_QUEUED, STATUS_DEAD
+)
+
+
+class LeaseHeartbeat(threading.Thread):
+    """Background thread that keeps a job's lease alive while it is being processed"""
+
+    def __init__(self, app, job_id: int, worker_id: str, lease_seconds: int):
+        super().__init__(daemon=True)
+        self.app = app
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.stop_event = threading.Event()
+        self.lease_lost = False
+
+    def run(self):
+        interval = max(1.0, self.lease_seconds / 3)
+        while not self.stop_event.wait(interval):
+            try:
+                with self.app.app_context():
+                    from models import db
+                    if not heartbeat(self.job_id, self.worker_id, self.lease_seconds):
+                        self.lease_lost = True
+                        print(f"⚠️ [WORKER] Lost lease on job {self.job_id}")
+                        return
+                    db.session.remove()
+            except Exception as e:
+                print(f"⚠️ [WORKER] Heartbeat error for job {self.job_id}: {e}")
+
+    def stop(self):
+        self.stop_event.set()
+        self.join(timeout=5)
+
+
+class AnalysisWorker:
+    """Lease → analyze → complete/fail loop"""
+
+    def __init__(self, app, worker_id=None):
+        self.app = app
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = app.config.get('ANALYSIS_LEASE_SECONDS', 120)
+        self.retry_base_seconds = app.config.get('ANALYSIS_RETRY_BASE_SECONDS', 30)
+        self.poll_seconds = app.config.get('ANALYSIS_WORKER_POLL_SECONDS', 2)
+        self.should_stop = False
+
+    def request_stop(self, *args):
+        """Finish the current job, then exit"""
+        print(f"🛑 [WORKER] {self.worker_id} stopping after current job...")
+        self.should_stop = True
+
+    def run_one(self) -> bool:
+        """Process a single job if one is available. Returns True if a job was processed."""
+        from models import db
+        from routes import process_interview_analysis
+        from incremental_analysis import process_partial_interview
+        from analysis_progress import mark_attempt_failed
+
+        with self.app.app_context():
+            job = lease_next_job(self.worker_id, self.lease_seconds)
+            if job is None:
+                db.session.remove()
+                return False
+
+            job_id, interview_id, job_type = job.job_id, job.interview_id, job.job_type
+            print(f"\n🔧 [WORKER] {self.worker_id} leased {job_type} job {job_id} "
+                  f"(interview {interview_id}, attempt {job.attempts}/{job.max_attempts})")
+
+            beat = LeaseHeartbeat(self.app, job_id, self.worker_id, self.lease_seconds)
+            beat.start()
+            started = time.time()
+
+            try:
+                if job_type == JOB_PARTIAL:
+                    result = process_partial_interview(interview_id)
+                else:
+                    result = process_interview_analysis(interview_id)
+                error = None
+                if not result or not result.get('success'):
+                    error = (result or {}).get('error', 'Analysis returned no result')
+            except Exception as e:
+                traceback.print_exc()
+                db.session.rollback()
+                error = str(e)
+            finally:
+                beat.stop()
+
+            elapsed = time.time() - started
+            if beat.lease_lost:
+                # Another worker owns the job now; don't touch its state
+                print(f"⚠️ [WORKER] Job {job_id} finished after lease was lost ({elapsed:.1f}s)")
+            elif error is None:
+                complete_job(job_id, self.worker_id)
+                print(f"✅ [WORKER] Job {job_id} done in {elapsed:.1f}s")
+            else:
+                status = fail_job(job_id, self.worker_id, error, self.retry_base_seconds)
+                print(f"❌ [WORKER] Job {job_id} failed in {elapsed:.1f}s: {error} → {status}")
+                if job_type != JOB_PARTIAL and status in (STATUS_QUEUED, STATUS_DEAD):
+                    # Show the pending retry (or final failure) on the progress endpoint
+                    mark_attempt_failed(interview_id, error, will_retry=status == STATUS_QUEUED)
+
+            db.session.remove()
+            return True
+
+    def run_forever(self):
+        print(f"🚀 [WORKER] {self.worker_id} polling for analysis jobs every {self.poll_seconds}s")
+        while not self.should_stop:
+            try:
+                processed = self.run_one()
+            except Exception as e:
+                print(f"❌ [WORKER] Queue error: {e}")
+                traceback.print_exc()
+                processed = False
+            if not processed and not self.should_stop:
+                time.sleep(self.poll_seconds)
+        print(f"👋 [WORKER] {self.worker_id} stopped")
+
+
+if __name__ == '__main__':
+    from app import app
+
+    worker = AnalysisWorker(app)
+    signal.signal(signal.SIGTERM, worker.request_stop)
+    signal.signal(signal.SIGINT, worker.request_stop)
+
+    if '--once' in sys.argv:
+        worker.run_one()
+    else:
+        worker.run_forever()